@@ -0,0 +1,30 @@
+"""add trigram search indexes on users nickname and email
+
+Revision ID: 5b2d8f4e6a13
+Revises: 3a7c1e9d2b40
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2d8f4e6a13'
+down_revision: Union[str, None] = '3a7c1e9d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_users_nickname_trgm', 'users', ['nickname'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'nickname': 'gin_trgm_ops'})
+    op.create_index('ix_users_email_trgm', 'users', ['email'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_trgm', table_name='users')
+    op.drop_index('ix_users_nickname_trgm', table_name='users')
@@ -0,0 +1,25 @@
+"""add users updated_at index for list ETags
+
+Revision ID: 9d3f6b1c2e47
+Revises: 7c4e2a9f1b58
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f6b1c2e47'
+down_revision: Union[str, None] = '7c4e2a9f1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_updated_at', 'users', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_updated_at', table_name='users')
@@ -0,0 +1,31 @@
+"""add user_deletions counter for list ETags
+
+Revision ID: b4e8c2d6f1a9
+Revises: 9d3f6b1c2e47
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8c2d6f1a9'
+down_revision: Union[str, None] = '9d3f6b1c2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    user_deletions = op.create_table('user_deletions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('deleted', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(user_deletions, [{'id': 1, 'deleted': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('user_deletions')
@@ -9,6 +9,8 @@ Base = declarative_base()
 # Import all models to ensure they're registered with Base
 from app.models.user_model import User  # noqa
 from app.models.analytics_model import UserAnalytics  # noqa
+from app.models.email_outbox_model import EmailOutbox  # noqa
+from app.models.user_deletions_model import UserDeletions  # noqa
 
 # Create async engine
 engine = create_async_engine(
@@ -1,12 +1,14 @@
+from dataclasses import dataclass
 from typing import AsyncGenerator
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db as database_get_db
 from settings.config import Settings, settings
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
-from app.services.jwt_service import decode_token
+from app.utils.smtp_transport import AsyncSMTPTransport, create_smtp_transport
+from app.services.jwt_service import decode_token_cached
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async for session in database_get_db():
@@ -15,9 +17,28 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 def get_settings() -> Settings:
     return settings
 
-def get_email_service() -> EmailService:
-    template_manager = TemplateManager()
-    return EmailService(template_manager=template_manager)
+@dataclass
+class Services:
+    """App-scoped singletons, created once by the lifespan and kept on `app.state.services`."""
+    template_manager: TemplateManager
+    smtp_transport: AsyncSMTPTransport
+    email_service: EmailService
+
+    @classmethod
+    def create(cls) -> "Services":
+        template_manager = TemplateManager()
+        smtp_transport = create_smtp_transport()
+        email_service = EmailService(template_manager=template_manager, transport=smtp_transport)
+        return cls(template_manager, smtp_transport, email_service)
+
+    async def close(self):
+        await self.smtp_transport.close()
+
+def get_services(request: Request) -> Services:
+    return request.app.state.services
+
+def get_email_service(services: Services = Depends(get_services)) -> EmailService:
+    return services.email_service
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
@@ -27,9 +48,12 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if payload is None:
         raise credentials_exception
+    if payload.get("type") == "refresh":
+        # Refresh tokens can only be exchanged at /token/refresh, never used as bearer tokens
+        raise credentials_exception
     user_id: str = payload.get("sub")
     user_role: str = payload.get("role")
     if user_id is None or user_role is None:
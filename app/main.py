@@ -1,12 +1,49 @@
 from builtins import Exception
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from starlette.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dependencies import get_db, get_settings
+from app.dependencies import Services, get_db, get_settings
 from app.routers import user_routes, analytics_routes
 from app.utils.api_description import getDescription
-from app.database import engine, Base
+from app.database import engine, Base, AsyncSessionLocal
+from app.services.bootstrap_state import bootstrap_state
+from app.services.email_outbox import email_outbox_worker
+from app.services.last_login_buffer import last_login_buffer
+from app.services.nickname_allocator import nickname_allocator
+from app.utils.hashing_executor import shutdown_hashing_executor
+from app.utils.link_generation import user_link_paths
+from app.utils.security import calibrate_password_hash_rounds
+from app.utils.template_manager import TemplateManager
+from settings.config import settings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    # Recompile email templates from the files deployed with this process
+    TemplateManager.clear_cache()
+    if settings.password_hash_target_ms > 0:
+        calibrate_password_hash_rounds(settings.password_hash_target_ms)
+    async with AsyncSessionLocal() as session:
+        await nickname_allocator.warm(session)
+        await bootstrap_state.load(session)
+    # Request handlers and background workers share these instances, caches and SMTP pool
+    services = Services.create()
+    services.template_manager.preload()
+    app.state.services = services
+    # Resolve the HATEOAS route paths once instead of per user
+    user_link_paths(app)
+    last_login_buffer.start(AsyncSessionLocal)
+    email_outbox_worker.start(AsyncSessionLocal, services.email_service)
+    try:
+        yield
+    finally:
+        await last_login_buffer.stop(AsyncSessionLocal)
+        await email_outbox_worker.stop()
+        await services.close()
+        shutdown_hashing_executor()
 
 app = FastAPI(
     title="User Management",
@@ -18,6 +55,7 @@ app = FastAPI(
         "email": "support@example.com",
     },
     license_info={"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
+    lifespan=lifespan,
 )
 
 # CORS middleware configuration
@@ -29,11 +67,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup_event():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
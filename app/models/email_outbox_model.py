@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+from enum import Enum
+import uuid
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+class OutboxStatus(str, Enum):
+    """Delivery state of a queued email."""
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+class EmailOutbox(Base):
+    """
+    An email waiting to be delivered, written in the same transaction as the change
+    that caused it.
+
+    Pending rows are claimed by the outbox workers by pushing `next_attempt_at` forward
+    by a lease; a worker that dies mid-delivery simply lets the lease expire and the
+    row is picked up again, so delivery is at-least-once.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    email_type = Column(String(50), nullable=False)
+    recipient = Column(String(255), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(16), nullable=False, default=OutboxStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    last_error = Column(String(500), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<EmailOutbox {self.email_type} to {self.recipient}, {self.status}>"
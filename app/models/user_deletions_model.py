@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, Integer
+from app.database import Base
+
+class UserDeletions(Base):
+    """
+    A single-row tombstone counter of deleted users, bumped in the same transaction
+    as every delete.
+
+    Together with the latest `users.updated_at`, which inserts and account changes
+    advance, it versions the users table without counting it: a delete leaves no
+    row behind to move the timestamp, so it moves this counter instead.
+    """
+    __tablename__ = "user_deletions"
+
+    ROW_ID = 1
+
+    id = Column(Integer, primary_key=True)
+    deleted = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<UserDeletions {self.deleted}>"
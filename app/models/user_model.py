@@ -1,9 +1,10 @@
-from builtins import bool, int, str
+from builtins import bool, int, setattr, str
 from datetime import datetime, timezone
 from enum import Enum
+from typing import Tuple
 import uuid
 from sqlalchemy import (
-    Column, String, Integer, DateTime, Boolean, func, Enum as SQLAlchemyEnum
+    DDL, Column, String, Integer, DateTime, Boolean, Index, event, func, Enum as SQLAlchemyEnum
 )
 from sqlalchemy.dialects.postgresql import UUID, ENUM
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -16,6 +17,17 @@ class UserRole(Enum):
     MANAGER = "MANAGER"
     ADMIN = "ADMIN"
 
+ANONYMIZED_EMAIL_DOMAIN = "anonymized.example.com"
+
+# Personal columns cleared when a user is anonymized
+ANONYMIZED_NULL_COLUMNS = (
+    "first_name", "last_name", "bio", "profile_picture_url",
+    "linkedin_profile_url", "github_profile_url", "verification_token",
+)
+
+# Credentials never leave the service layer; they are only loaded by queries that ask for them
+SENSITIVE_COLUMNS = ("hashed_password", "verification_token")
+
 class User(Base):
     """
     Represents a user within the application, corresponding to the 'users' table in the database.
@@ -52,13 +64,26 @@ class User(Base):
     """
     __tablename__ = "users"
     __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Supports keyset pagination ordered by (created_at, id)
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Makes max(updated_at), part of the list ETag, an index lookup
+        Index("ix_users_updated_at", "updated_at"),
+        # Trigram indexes serve substring (ILIKE '%term%') search and similarity ranking
+        Index("ix_users_nickname_trgm", "nickname", postgresql_using="gin",
+              postgresql_ops={"nickname": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin",
+              postgresql_ops={"email": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nickname: Mapped[str] = Column(String(50), unique=True, nullable=False, index=True)
     email: Mapped[str] = Column(String(255), unique=True, nullable=False, index=True)
     first_name: Mapped[str] = Column(String(100), nullable=True)
     last_name: Mapped[str] = Column(String(100), nullable=True)
-    bio: Mapped[str] = Column(String(500), nullable=True)
+    # Deferred like the credentials below: left out of a plain select(User) and raising
+    # if read without being loaded, so each query states whether it needs them
+    bio: Mapped[str] = mapped_column(String(500), nullable=True, deferred=True, deferred_raiseload=True)
     profile_picture_url: Mapped[str] = Column(String(255), nullable=True)
     linkedin_profile_url: Mapped[str] = Column(String(255), nullable=True)
     github_profile_url: Mapped[str] = Column(String(255), nullable=True)
@@ -72,11 +97,18 @@ class User(Base):
     )
     failed_login_attempts: Mapped[int] = Column(Integer, default=0)
     is_locked: Mapped[bool] = Column(Boolean, default=False)
-    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    verification_token = Column(String, nullable=True)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
+    # Set in Python so every backend keeps microseconds: the value versions the row for ETags.
+    # Login bookkeeping (failed attempts, lockout, last login, rehash) writes it back unchanged.
+    updated_at: Mapped[datetime] = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now()
+    )
+    verification_token: Mapped[str] = mapped_column(String, nullable=True, deferred=True, deferred_raiseload=True)
     email_verified: Mapped[bool] = Column(Boolean, default=False, nullable=False)
-    hashed_password: Mapped[str] = Column(String(255), nullable=False)
+    hashed_password: Mapped[str] = mapped_column(String(255), nullable=False, deferred=True, deferred_raiseload=True)
 
     analytics = relationship("UserAnalytics", back_populates="user", cascade="all, delete-orphan")
 
@@ -93,6 +125,17 @@ class User(Base):
     def verify_email(self):
         self.email_verified = True
 
+    @staticmethod
+    def anonymized_identity(user_id: uuid.UUID) -> Tuple[str, str]:
+        """Nickname and email that replace a user's own once anonymized; unique per id."""
+        return f"anonymous_{user_id.hex}", f"{user_id.hex}@{ANONYMIZED_EMAIL_DOMAIN}"
+
+    def anonymize(self):
+        """Strips personal data, keeping the account row and its role."""
+        self.nickname, self.email = self.anonymized_identity(self.id)
+        for column in ANONYMIZED_NULL_COLUMNS:
+            setattr(self, column, None)
+
     def has_role(self, role_name: UserRole) -> bool:
         return self.role == role_name
 
@@ -110,3 +153,10 @@ class User(Base):
     def last_login_at(self, value: datetime):
         """Set the last login timestamp."""
         self._last_login_at = value
+
+# The trigram indexes need pg_trgm installed before the users table is created
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
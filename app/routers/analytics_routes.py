@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies import get_db, require_role
 from app.services.analytics_service import AnalyticsService
+from app.services.last_login_buffer import last_login_buffer
 
 router = APIRouter()
 
@@ -23,7 +24,10 @@ async def get_inactive_users(
         raise HTTPException(status_code=400, detail="Invalid period")
         
     inactive_users = await AnalyticsService.get_inactive_users(db, period_map[period])
-    return {"inactive_users": [user.id for user in inactive_users]}
+    return {
+        "inactive_users": [user.id for user in inactive_users],
+        "max_staleness_seconds": last_login_buffer.staleness_bound.total_seconds()
+    }
 
 @router.get("/analytics/conversion-rate", tags=["Analytics"])
 async def get_conversion_rate(
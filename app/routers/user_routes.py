@@ -18,26 +18,155 @@ Key Highlights:
 - Utilizes OAuth2PasswordBearer for securing API endpoints, requiring valid access tokens for operations.
 """
 
-from builtins import dict, int, len, str
-from datetime import timedelta
+from builtins import ValueError, bool, dict, int, len, str, sum
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies import get_current_user, get_db, get_email_service, require_role
 from app.schemas.pagination_schema import EnhancedPagination
-from app.schemas.token_schema import TokenResponse
-from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
-from app.services.user_service import UserService
+from app.schemas.token_schema import RefreshTokenRequest, TokenResponse
+from app.schemas.user_schemas import LoginRequest, UserBase, UserBatchRequest, UserBatchResponse, UserBatchResult, UserBatchStatus, UserCreate, UserImportError, UserImportResponse, UserListResponse, UserResponse, UserUpdate
+from app.models.user_model import UserRole
+from app.services.user_service import LoginOutcome, UserService
 from app.services.jwt_service import create_access_token
-from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.services.refresh_token_service import create_refresh_token, decode_refresh_token, refresh_token_store, rotate_refresh_token
+from app.utils.user_export import EXPORT_COLUMNS, EXPORT_MEDIA_TYPES, csv_chunks, ndjson_chunks
+from app.utils.import_parsing import import_media_type, iter_import_rows
+from app.utils.etag import etag_matches, list_etag, page_etag, user_etag
+from app.utils.cursor import CURSOR_NEXT, CURSOR_PREV, decode_cursor, encode_cursor
+from app.utils.link_generation import UserLinkTemplates, cursor_pagination_hrefs, pagination_hrefs
+from app.utils.user_serializer import UserJSONResponse, parse_fields, user_list_payload, user_payload
 from app.dependencies import get_settings
 from app.services.email_service import EmailService
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 settings = get_settings()
+
+FIELDS_QUERY = Query(None, description="Comma-separated UserResponse fields to return; `id` is always included. Defaults to every field.")
+LINKS_QUERY = Query(True, description="Set to false to omit the per-user HATEOAS links.")
+
+def _response_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def _link_templates(request: Request, links: bool) -> Optional[UserLinkTemplates]:
+    return UserLinkTemplates(request) if links else None
+
+def _etag_variant(request: Request, query: str = "") -> str:
+    """What shapes a representation besides the data: the base URL its links are built on and the query string."""
+    return f"{request.base_url}?{query}"
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A bodiless 304 when the client's If-None-Match already names `etag`."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+@router.get("/users/search", response_model=UserListResponse, name="search_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def search_users(
+    request: Request,
+    q: Optional[str] = None,
+    username: Optional[str] = None,
+    email: Optional[str] = None,
+    role: Optional[UserRole] = None,
+    account_status: Optional[bool] = None,
+    registration_date_start: Optional[datetime] = None,
+    registration_date_end: Optional[datetime] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    fields: Optional[str] = FIELDS_QUERY,
+    links: bool = LINKS_QUERY,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """
+    Search users, ranked by relevance.
+
+    - **q**: Text matched against nickname and email.
+    - **username** / **email**: Text matched against a single field.
+    - **role**, **account_status**, **registration_date_start**/**registration_date_end**: Exact filters.
+    - **fields** / **links**: Sparse fieldset and link suppression, as for `GET /users/`.
+
+    `total` is the number of users matching the filters, not the size of the table.
+    Responses carry an ETag of the page's users; with a matching `If-None-Match`
+    the page is not serialized and 304 Not Modified is returned.
+    """
+    response_fields = _response_fields(fields)
+    filters = {
+        "q": q,
+        "username": username,
+        "email": email,
+        "role": role,
+        "account_status": account_status,
+        "registration_date_start": registration_date_start,
+        "registration_date_end": registration_date_end,
+    }
+    users, total_users = await UserService.search_user_rows(db, filters, skip, limit, response_fields)
+    etag = page_etag(users, total_users, variant=_etag_variant(request, request.url.query))
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    return UserJSONResponse(user_list_payload(
+        users, _link_templates(request, links), pagination_hrefs(request, skip, limit, total_users),
+        total=total_users, page=skip // limit + 1, fields=response_fields,
+    ), headers={"ETag": etag})
+
+@router.get("/users/export", name="export_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def export_users(
+    export_format: str = Query("ndjson", alias="format"),
+    q: Optional[str] = None,
+    username: Optional[str] = None,
+    email: Optional[str] = None,
+    role: Optional[UserRole] = None,
+    account_status: Optional[bool] = None,
+    registration_date_start: Optional[datetime] = None,
+    registration_date_end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """
+    Stream every user matching the filters as NDJSON (default) or CSV.
+
+    Accepts the same filters as `GET /users/search`. Rows are read from a server-side
+    cursor and written as they arrive, so memory use stays flat for any table size.
+    """
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="format must be 'ndjson' or 'csv'")
+    filters = {
+        "q": q,
+        "username": username,
+        "email": email,
+        "role": role,
+        "account_status": account_status,
+        "registration_date_start": registration_date_start,
+        "registration_date_end": registration_date_end,
+    }
+
+    async def body():
+        partitions = UserService.stream_users(db, filters, EXPORT_COLUMNS)
+        chunks = csv_chunks(partitions, EXPORT_COLUMNS) if export_format == "csv" else ndjson_chunks(partitions)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            # The get_db dependency has already exited by the time a streaming body runs,
+            # so release the connection the stream re-acquired here.
+            await db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'}
+    )
+
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, fields: Optional[str] = FIELDS_QUERY, links: bool = LINKS_QUERY, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Endpoint to fetch a user by their unique identifier (UUID).
 
@@ -47,29 +176,25 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
     Args:
         user_id: UUID of the user to fetch.
         request: The request object, used to generate full URLs in the response.
+        fields: Comma-separated fields to return (`id` is always included).
+        links: Whether to include the HATEOAS links.
         db: Dependency that provides an AsyncSession for database access.
         token: The OAuth2 access token obtained through OAuth2PasswordBearer dependency.
+
+    The response carries a strong ETag; sending it back in `If-None-Match` returns
+    304 Not Modified while the user is unchanged.
     """
+    response_fields = _response_fields(fields)
+    # The cached lookup serves whole users, so the fieldset is applied when serializing
     user = await UserService.get_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return UserResponse.model_construct(
-        id=user.id,
-        nickname=user.nickname,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        bio=user.bio,
-        profile_picture_url=user.profile_picture_url,
-        github_profile_url=user.github_profile_url,
-        linkedin_profile_url=user.linkedin_profile_url,
-        role=user.role,
-        email=user.email,
-        last_login_at=user.last_login_at,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        links=create_user_links(user.id, request)  
-    )
+    etag = user_etag(user.id, user.updated_at, _etag_variant(request, request.url.query))
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    return UserJSONResponse(user_payload(user, _link_templates(request, links), response_fields), headers={"ETag": etag})
 
 # Additional endpoints for update, delete, create, and list users follow a similar pattern, using
 # asynchronous database operations, handling security with OAuth2PasswordBearer, and enhancing response
@@ -85,27 +210,34 @@ async def update_user(user_id: UUID, user_update: UserUpdate, request: Request,
 
     - **user_id**: UUID of the user to update.
     - **user_update**: UserUpdate model with updated user information.
+
+    Responds with 409 Conflict if the new nickname or email belongs to another user.
+
+    Send `If-Match` with the ETag of `GET /users/{user_id}` (without query parameters)
+    or of a previous update to apply the change only if nobody has modified the user
+    since; otherwise the response is 412 Precondition Failed.
     """
     user_data = user_update.model_dump(exclude_unset=True)
-    updated_user = await UserService.update(db, user_id, user_data)
+    expected_updated_at = None
+    if_match = request.headers.get("if-match")
+    if if_match is not None:
+        expected_updated_at = await UserService.current_version(db, user_id)
+        if expected_updated_at is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        if not etag_matches(if_match, user_etag(user_id, expected_updated_at, _etag_variant(request)), weak=False):
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User has been modified")
+
+    # The UPDATE is itself conditional on the version checked above, so a write
+    # landing in between also fails the precondition
+    updated_user = await UserService.update(db, user_id, user_data, expected_updated_at)
     if not updated_user:
+        if expected_updated_at is not None:
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User has been modified")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return UserResponse.model_construct(
-        id=updated_user.id,
-        bio=updated_user.bio,
-        first_name=updated_user.first_name,
-        last_name=updated_user.last_name,
-        nickname=updated_user.nickname,
-        email=updated_user.email,
-        role=updated_user.role,
-        last_login_at=updated_user.last_login_at,
-        profile_picture_url=updated_user.profile_picture_url,
-        github_profile_url=updated_user.github_profile_url,
-        linkedin_profile_url=updated_user.linkedin_profile_url,
-        created_at=updated_user.created_at,
-        updated_at=updated_user.updated_at,
-        links=create_user_links(updated_user.id, request)
+    return UserJSONResponse(
+        user_payload(updated_user, UserLinkTemplates(request)),
+        headers={"ETag": user_etag(updated_user.id, updated_user.updated_at, _etag_variant(request))},
     )
 
 
@@ -129,8 +261,9 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
     Create a new user.
 
     This endpoint creates a new user with the provided information. If the email
-    already exists, it returns a 400 error. On successful creation, it returns the
-    newly created user's information along with links to related actions.
+    already exists, it returns a 400 error; if the nickname is taken, a 409. On
+    successful creation, it returns the newly created user's information along with
+    links to related actions.
 
     Parameters:
     - user (UserCreate): The user information to create.
@@ -140,56 +273,137 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
     Returns:
     - UserResponse: The newly created user's information along with navigation links.
     """
-    existing_user = await UserService.get_by_email(db, user.email)
-    if existing_user:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-    
     created_user = await UserService.create(db, user.model_dump(), email_service)
     if not created_user:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
-    
-    
-    return UserResponse.model_construct(
-        id=created_user.id,
-        bio=created_user.bio,
-        first_name=created_user.first_name,
-        last_name=created_user.last_name,
-        profile_picture_url=created_user.profile_picture_url,
-        nickname=created_user.nickname,
-        email=created_user.email,
-        role=created_user.role,
-        last_login_at=created_user.last_login_at,
-        created_at=created_user.created_at,
-        updated_at=created_user.updated_at,
-        links=create_user_links(created_user.id, request)
+
+    return UserJSONResponse(
+        user_payload(created_user, UserLinkTemplates(request)),
+        status_code=status.HTTP_201_CREATED,
+        headers={"ETag": user_etag(created_user.id, created_user.updated_at, _etag_variant(request))},
+    )
+
+
+@router.post("/users/import", response_model=UserImportResponse, name="import_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def import_users(request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Bulk-create users from a streamed upload.
+
+    Send the body as `text/csv` (first row is the header) or `application/x-ndjson`
+    (one JSON object per line), with the same fields as `POST /users/`. Rows are
+    validated and inserted in batches; rows that fail are reported by row number and
+    do not stop the import. Verification emails are queued in the outbox with each batch.
+    """
+    try:
+        media_type = import_media_type(request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    try:
+        created, errors = await UserService.import_users(db, iter_import_rows(request.stream(), media_type), email_service)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return UserImportResponse(
+        created=created,
+        failed=len(errors),
+        errors=[UserImportError(row=row, error=error) for row, error in errors]
+    )
+
+
+@router.post("/users/batch", response_model=UserBatchResponse, name="batch_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def batch_users(batch: UserBatchRequest, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Apply one moderation operation to many users in a single request.
+
+    - **user_ids**: Users to act on (duplicates are applied once).
+    - **operation**: One of lock, unlock, set_role, verify_email, anonymize or delete.
+    - **role**: Target role, required for set_role.
+
+    Each id gets its own outcome: `ok`, `not_found`, or `failed` if its chunk could not be written.
+    """
+    outcomes = await UserService.batch_update(db, batch.user_ids, batch.operation, role=batch.role)
+    return UserBatchResponse(
+        operation=batch.operation,
+        succeeded=sum(1 for outcome in outcomes.values() if outcome is UserBatchStatus.OK),
+        results=[UserBatchResult(user_id=user_id, status=outcome) for user_id, outcome in outcomes.items()]
     )
 
 
 @router.get("/users/", response_model=UserListResponse, tags=["User Management Requires (Admin or Manager Roles)"])
 async def list_users(
     request: Request,
-    skip: int = 0,
-    limit: int = 10,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = FIELDS_QUERY,
+    links: bool = LINKS_QUERY,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
-    total_users = await UserService.count(db)
-    users = await UserService.list_users(db, skip, limit)
+    """
+    List users.
 
-    user_responses = [
-        UserResponse.model_validate(user) for user in users
-    ]
-    
-    pagination_links = generate_pagination_links(request, skip, limit, total_users)
-    
-    # Construct the final response with pagination details
-    return UserListResponse(
-        items=user_responses,
-        total=total_users,
-        page=skip // limit + 1,
-        size=len(user_responses),
-        links=pagination_links  # Ensure you have appropriate logic to create these links
-    )
+    Pages with `skip`/`limit` by default. Passing `cursor` (empty for the first page)
+    switches to keyset pagination ordered by creation time: follow the `next`/`prev`
+    links, whose opaque cursors make deep pages as cheap as the first one.
+
+    `fields` (e.g. `fields=nickname,role`) selects only those columns, and
+    `links=false` leaves out the per-user links; pagination links keep both.
+
+    Offset pages carry an ETag from a cheap table version token (latest update and
+    a deletion counter) and the query string; with a matching `If-None-Match`
+    neither the page nor the total is read and 304 Not Modified is returned. Cursor pages never count the
+    table: their ETag comes from the users on the page, which is then not serialized.
+    """
+    response_fields = _response_fields(fields)
+    link_templates = _link_templates(request, links)
+    if cursor is not None:
+        return await _list_users_by_cursor(request, cursor, limit, db, response_fields, link_templates)
+
+    last_modified, deletions = await UserService.table_version(db)
+    etag = list_etag(last_modified, deletions, _etag_variant(request, request.url.query))
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    # Only a page that is actually sent pays for the count
+    total_users = await UserService.count(db)
+    users = await UserService.list_user_rows(db, skip, limit, response_fields)
+
+    # Rows go straight to JSON; the response_model only documents the shape
+    return UserJSONResponse(user_list_payload(
+        users, link_templates, pagination_hrefs(request, skip, limit, total_users),
+        total=total_users, page=skip // limit + 1, fields=response_fields,
+    ), headers={"ETag": etag})
+
+
+async def _list_users_by_cursor(
+    request: Request, cursor: str, limit: int, db: AsyncSession,
+    fields: Tuple[str, ...], link_templates: Optional[UserLinkTemplates],
+) -> Response:
+    after = before = None
+    if cursor:
+        try:
+            created_at, user_id, direction = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+        if direction == CURSOR_PREV:
+            before = (created_at, user_id)
+        else:
+            after = (created_at, user_id)
+
+    users, has_more = await UserService.list_user_rows_keyset(db, limit, after=after, before=before, fields=fields)
+    has_next = has_more if before is None else True
+    has_prev = has_more if before is not None else after is not None
+    etag = page_etag(users, has_next, has_prev, variant=_etag_variant(request, request.url.query))
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    next_cursor = encode_cursor(users[-1].created_at, users[-1].id, CURSOR_NEXT) if users and has_next else None
+    prev_cursor = encode_cursor(users[0].created_at, users[0].id, CURSOR_PREV) if users and has_prev else None
+    return UserJSONResponse(user_list_payload(
+        users, link_templates, cursor_pagination_hrefs(request, limit, next_cursor, prev_cursor), fields=fields
+    ), headers={"ETag": etag})
 
 
 @router.post("/register/", response_model=UserResponse, tags=["Login and Registration"])
@@ -201,41 +415,74 @@ async def register(user_data: UserCreate, session: AsyncSession = Depends(get_db
 
 @router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    outcome, user = await UserService.attempt_login(session, form_data.username, form_data.password)
+    if outcome is LoginOutcome.LOCKED:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
 
-    user = await UserService.login_user(session, form_data.username, form_data.password)
     if user:
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
 
+        token_data = {"sub": user.email, "role": str(user.role.name)}
         access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
+            data=token_data,
             expires_delta=access_token_expires
         )
+        refresh_token = create_refresh_token(data=token_data)
 
-        return {"access_token": access_token, "token_type": "bearer"}
+        return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
     raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
 @router.post("/login/", include_in_schema=False, response_model=TokenResponse, tags=["Login and Registration"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    outcome, user = await UserService.attempt_login(session, form_data.username, form_data.password)
+    if outcome is LoginOutcome.LOCKED:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
 
-    user = await UserService.login_user(session, form_data.username, form_data.password)
     if user:
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
 
+        token_data = {"sub": user.email, "role": str(user.role.name)}
         access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
+            data=token_data,
             expires_delta=access_token_expires
         )
+        refresh_token = create_refresh_token(data=token_data)
 
-        return {"access_token": access_token, "token_type": "bearer"}
+        return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
     raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
 
+@router.post("/token/refresh", response_model=TokenResponse, tags=["Login and Registration"])
+async def refresh_access_token(body: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and a rotated refresh token.
+
+    No password hashing is needed: the token signature and the in-memory rotation
+    store are checked, plus one indexed lookup of the user, so deleted, locked or
+    anonymized users lose their session and role changes apply to the new tokens.
+    Reusing a refresh token that was already exchanged revokes every token
+    descended from the same login.
+    """
+    invalid = HTTPException(status_code=401, detail="Invalid or expired refresh token.", headers={"WWW-Authenticate": "Bearer"})
+    claims = decode_refresh_token(body.refresh_token)
+    if claims is None:
+        raise invalid
+    auth_state = await UserService.get_auth_state(db, claims["sub"])
+    if auth_state is None or auth_state.is_locked:
+        refresh_token_store.revoke(claims["fam"])
+        raise invalid
+    role = auth_state.role.name
+    refresh_token = rotate_refresh_token(claims, role)
+    if refresh_token is None:
+        raise invalid
+    access_token = create_access_token(
+        data={"sub": claims["sub"], "role": role},
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
 @router.get("/verify-email/{user_id}/{token}", status_code=status.HTTP_200_OK, name="verify_email", tags=["Login and Registration"])
-async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
+async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get_db)):
     """
     Verify user's email with a provided token.
     
@@ -5,6 +5,7 @@ class Link(BaseModel):
     href: HttpUrl = Field(..., description="The URL of the link.")
     action: str = Field(..., description="HTTP method for the action this link represents.")
     type: str = Field(default="application/json", description="Content type of the response for this link.")
+    method: str = Field(default="GET", description="HTTP method to use with this link.")
 
     class Config:
         json_schema_extra = {
@@ -12,6 +13,7 @@ class Link(BaseModel):
                 "rel": "self",
                 "href": "https://api.example.com/qr/123",
                 "action": "GET",
-                "type": "application/json"
+                "type": "application/json",
+                "method": "GET"
             }
         }
@@ -1,4 +1,4 @@
-from builtins import ValueError, any, bool, str
+from builtins import ValueError, any, bool, int, str
 from pydantic import BaseModel, EmailStr, Field, validator, root_validator
 from typing import Optional, List
 from datetime import datetime
@@ -6,6 +6,8 @@ from enum import Enum
 import uuid
 import re
 from app.models.user_model import UserRole
+from app.schemas.link_schema import Link
+from app.schemas.pagination_schema import PaginationLink
 from app.utils.nickname_gen import generate_nickname
 
 
@@ -60,6 +62,7 @@ class UserResponse(UserBase):
     nickname: Optional[str] = Field(None, min_length=3, pattern=r'^[\w-]+$', example=generate_nickname())    
     is_professional: Optional[bool] = Field(default=False, example=True)
     role: UserRole
+    links: List[Link] = Field(default_factory=list, description="Actions available on this user.")
 
 class LoginRequest(BaseModel):
     email: str = Field(..., example="john.doe@example.com")
@@ -78,7 +81,49 @@ class UserListResponse(BaseModel):
         "linkedin_profile_url": "https://linkedin.com/in/johndoe", 
         "github_profile_url": "https://github.com/johndoe"
     }])
-    total: int = Field(..., example=100)
-    page: int = Field(..., example=1)
+    total: Optional[int] = Field(None, example=100, description="Total matching users; omitted in cursor mode.")
+    page: Optional[int] = Field(None, example=1, description="Page number; omitted in cursor mode.")
     size: int = Field(..., example=10)
+    links: List[PaginationLink] = Field(default_factory=list)
 
+class UserImportError(BaseModel):
+    row: int = Field(..., example=3, description="1-based data row number in the uploaded file.")
+    error: str = Field(..., example="Email already exists")
+
+class UserImportResponse(BaseModel):
+    created: int = Field(..., example=998)
+    failed: int = Field(..., example=2)
+    errors: List[UserImportError] = Field(default_factory=list)
+
+class UserBatchOperation(str, Enum):
+    LOCK = "lock"
+    UNLOCK = "unlock"
+    SET_ROLE = "set_role"
+    VERIFY_EMAIL = "verify_email"
+    ANONYMIZE = "anonymize"
+    DELETE = "delete"
+
+class UserBatchStatus(str, Enum):
+    OK = "ok"
+    NOT_FOUND = "not_found"
+    FAILED = "failed"
+
+class UserBatchRequest(BaseModel):
+    user_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=10000, example=[uuid.uuid4()])
+    operation: UserBatchOperation = Field(..., example="lock")
+    role: Optional[UserRole] = Field(None, example="AUTHENTICATED", description="Target role; required for set_role.")
+
+    @root_validator(skip_on_failure=True)
+    def check_role_for_set_role(cls, values):
+        if values.get("operation") == UserBatchOperation.SET_ROLE and values.get("role") is None:
+            raise ValueError("role is required for the set_role operation")
+        return values
+
+class UserBatchResult(BaseModel):
+    user_id: uuid.UUID
+    status: UserBatchStatus
+
+class UserBatchResponse(BaseModel):
+    operation: UserBatchOperation
+    succeeded: int = Field(..., example=98)
+    results: List[UserBatchResult] = Field(default_factory=list)
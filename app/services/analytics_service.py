@@ -4,6 +4,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.analytics_model import UserAnalytics
 from app.models.user_model import User, UserRole
+from app.services.last_login_buffer import last_login_buffer
 import uuid
 
 class AnalyticsService:
@@ -40,7 +41,11 @@ class AnalyticsService:
         cutoff_date = datetime.utcnow() - inactive_period
         query = select(User).where(User._last_login_at < cutoff_date)
         result = await session.execute(query)
-        return result.scalars().all()
+        users = result.scalars().all()
+        # Logins still sitting in the write-behind buffer are newer than the stored
+        # last_login_at; anything older than last_login_buffer.staleness_bound is on disk.
+        recently_active = last_login_buffer.pending_since(cutoff_date)
+        return [user for user in users if user.id not in recently_active]
 
     @staticmethod
     async def get_conversion_rate(session: AsyncSession, start_date: datetime, end_date: datetime) -> Dict:
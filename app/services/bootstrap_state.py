@@ -0,0 +1,78 @@
+from builtins import bool
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_advisory_lock/pg_advisory_unlock
+BOOTSTRAP_LOCK_KEY = 72_190_415
+
+class BootstrapState:
+    """
+    Tracks whether the first user (who becomes the admin) has been created.
+
+    Until then every registration runs under a lock: a session-level advisory lock on
+    PostgreSQL, held on its own pooled connection and released explicitly, which
+    serialises workers across processes, plus an in-process asyncio lock, which is
+    all SQLite needs. Inside the lock the users table is counted
+    once; as soon as a user exists the flag is cached and later registrations skip
+    both the lock and the count. The flag is never cleared, so emptying the table does
+    not hand out a second admin.
+    """
+
+    def __init__(self):
+        self.bootstrapped = False
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def load(self, session: AsyncSession) -> bool:
+        """Sets the flag from the database, e.g. at startup. Returns the flag."""
+        if not self.bootstrapped:
+            count = (await session.execute(select(func.count()).select_from(User))).scalar()
+            self.bootstrapped = bool(count)
+        return self.bootstrapped
+
+    @asynccontextmanager
+    async def first_user_guard(self, session: AsyncSession) -> AsyncIterator[bool]:
+        """
+        Yields whether the user about to be created is the first one.
+
+        Enter the guard before `session` has run any statement and create the user
+        inside the block. On PostgreSQL the advisory lock is taken on a separate pooled
+        connection, so the session's transaction (and its SERIALIZABLE snapshot) starts
+        only once the lock is held and sees any first user committed meanwhile.
+        """
+        if self.bootstrapped:
+            yield False
+            return
+        async with self._get_lock():
+            if session.get_bind().dialect.name == "postgresql":
+                async with session.bind.connect() as lock_connection:
+                    await lock_connection.execute(select(func.pg_advisory_lock(BOOTSTRAP_LOCK_KEY)))
+                    try:
+                        is_first = not await self.load(session)
+                        yield is_first
+                    finally:
+                        await lock_connection.execute(select(func.pg_advisory_unlock(BOOTSTRAP_LOCK_KEY)))
+            else:
+                is_first = not await self.load(session)
+                yield is_first
+        if is_first and await self.load(session):
+            logger.info("First user created; bootstrap complete.")
+
+    def reset(self):
+        self.bootstrapped = False
+
+bootstrap_state = BootstrapState()
@@ -0,0 +1,179 @@
+from builtins import Exception, int, len, list, min, range, str, zip
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.email_outbox_model import EmailOutbox, OutboxStatus
+from app.services.email_service import EmailService
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest delay between two delivery attempts
+MAX_BACKOFF = timedelta(hours=1)
+# Shortest time between two purges of delivered and failed rows
+PURGE_INTERVAL_SECONDS = 60.0
+
+class EmailOutboxWorker:
+    """
+    Delivers queued emails from the `email_outbox` table.
+
+    A pool of `workers` coroutines each claim up to `batch_size` due rows with one
+    UPDATE ... RETURNING that pushes their `next_attempt_at` forward by a lease, send
+    them, then record the outcome. Failed sends are retried with exponential backoff
+    until `max_attempts`, after which the row is marked failed. A row is only marked
+    sent after the SMTP server accepted it, so a crash in between re-sends it when its
+    lease expires: delivery is at-least-once.
+
+    Once a row is sent or has failed for good its payload, which can hold a
+    verification link, is cleared; idle workers delete such rows `retention_seconds`
+    after their last attempt.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        backoff_seconds: float,
+        lease_seconds: float,
+        retention_seconds: float,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff = timedelta(seconds=backoff_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.retention = timedelta(seconds=retention_seconds)
+        self._next_purge = 0.0
+        self._tasks: List[asyncio.Task] = []
+
+    def backoff_for(self, attempts: int) -> timedelta:
+        """Delay before the next attempt after `attempts` failed ones."""
+        return min(self.backoff * (2 ** (attempts - 1)), MAX_BACKOFF)
+
+    async def claim(self, session: AsyncSession) -> List[EmailOutbox]:
+        now = datetime.now(timezone.utc)
+        due = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == OutboxStatus.PENDING.value, EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(EmailOutbox)
+            # Re-checked so a row another worker claimed meanwhile is not taken twice
+            .where(EmailOutbox.id.in_(due.scalar_subquery()), EmailOutbox.next_attempt_at <= now)
+            .values(next_attempt_at=now + self.lease)
+            .returning(EmailOutbox)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        claimed = (await session.execute(query)).scalars().all()
+        await session.commit()
+        return list(claimed)
+
+    async def _record(self, session: AsyncSession, entries: List[EmailOutbox], results: list):
+        now = datetime.now(timezone.utc)
+        sent = [entry.id for entry, result in zip(entries, results) if result is None]
+        if sent:
+            await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(sent))
+                .values(status=OutboxStatus.SENT.value, sent_at=now, attempts=EmailOutbox.attempts + 1, last_error=None, payload={})
+                .execution_options(synchronize_session=False)
+            )
+        for entry, result in zip(entries, results):
+            if result is None:
+                continue
+            attempts = entry.attempts + 1
+            exhausted = attempts >= self.max_attempts
+            logger.warning(f"Email {entry.id} to {entry.recipient} failed (attempt {attempts}): {result}")
+            await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == entry.id)
+                .values(
+                    attempts=attempts,
+                    last_error=str(result)[:500],
+                    status=OutboxStatus.FAILED.value if exhausted else OutboxStatus.PENDING.value,
+                    next_attempt_at=now + self.backoff_for(attempts),
+                    **({"payload": {}} if exhausted else {}),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        await session.commit()
+
+    async def process_batch(self, session: AsyncSession, email_service: EmailService) -> int:
+        """Claims and delivers one batch. Returns the number of emails claimed."""
+        entries = await self.claim(session)
+        if not entries:
+            return 0
+        results = await email_service.send_many_user_emails([(entry.payload, entry.email_type) for entry in entries])
+        await self._record(session, entries, results)
+        return len(entries)
+
+    async def purge(self, session: AsyncSession) -> int:
+        """Deletes sent and failed rows last attempted before the retention window. Returns the number deleted."""
+        cutoff = datetime.now(timezone.utc) - self.retention
+        result = await session.execute(
+            delete(EmailOutbox)
+            .where(
+                EmailOutbox.status.in_([OutboxStatus.SENT.value, OutboxStatus.FAILED.value]),
+                EmailOutbox.next_attempt_at < cutoff,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        return result.rowcount
+
+    async def drain(self, session: AsyncSession, email_service: EmailService) -> int:
+        """Processes batches until nothing is due. Returns the number of emails claimed."""
+        total = 0
+        while True:
+            claimed = await self.process_batch(session, email_service)
+            if not claimed:
+                return total
+            total += claimed
+
+    async def _run(self, session_factory, email_service: EmailService):
+        while True:
+            try:
+                async with session_factory() as session:
+                    claimed = await self.process_batch(session, email_service)
+                    if claimed < self.batch_size and time.monotonic() >= self._next_purge:
+                        # Shared by the worker pool, so one idle worker purges per interval
+                        self._next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+                        await self.purge(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox worker failed: {e}")
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self, session_factory, email_service: EmailService):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run(session_factory, email_service)) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancels the workers; emails they had claimed are retried once their lease expires."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+email_outbox_worker = EmailOutboxWorker(
+    workers=settings.email_outbox_workers,
+    batch_size=settings.email_outbox_batch_size,
+    poll_interval=settings.email_outbox_poll_interval_seconds,
+    max_attempts=settings.email_outbox_max_attempts,
+    backoff_seconds=settings.email_outbox_backoff_seconds,
+    lease_seconds=settings.email_outbox_lease_seconds,
+    retention_seconds=settings.email_outbox_retention_hours * 3600,
+)
@@ -1,37 +1,70 @@
 # email_service.py
-from builtins import ValueError, dict, str
+from builtins import Exception, ValueError, dict, str
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from settings.config import settings
-from app.utils.smtp_connection import SMTPClient
+from app.utils.smtp_transport import AsyncSMTPTransport, build_message, create_smtp_transport
 from app.utils.template_manager import TemplateManager
+from app.models.email_outbox_model import EmailOutbox
 from app.models.user_model import User
 
+SUBJECTS = {
+    'email_verification': "Verify Your Account",
+    'password_reset': "Password Reset Instructions",
+    'account_locked': "Account Locked Notification"
+}
+
 class EmailService:
-    def __init__(self, template_manager: TemplateManager):
-        self.smtp_client = SMTPClient(
-            server=settings.smtp_server,
-            port=settings.smtp_port,
-            username=settings.smtp_username,
-            password=settings.smtp_password
-        )
+    def __init__(self, template_manager: TemplateManager, transport: Optional[AsyncSMTPTransport] = None):
+        self.transport = transport or create_smtp_transport()
         self.template_manager = template_manager
 
-    async def send_user_email(self, user_data: dict, email_type: str):
-        subject_map = {
-            'email_verification': "Verify Your Account",
-            'password_reset': "Password Reset Instructions",
-            'account_locked': "Account Locked Notification"
-        }
-
-        if email_type not in subject_map:
+    def _build(self, user_data: dict, email_type: str):
+        if email_type not in SUBJECTS:
             raise ValueError("Invalid email type")
-
         html_content = self.template_manager.render_template(email_type, **user_data)
-        self.smtp_client.send_email(subject_map[email_type], html_content, user_data['email'])
+        return build_message(SUBJECTS[email_type], html_content, self.transport.sender, user_data['email'])
 
-    async def send_verification_email(self, user: User):
+    async def send_user_email(self, user_data: dict, email_type: str):
+        await self.transport.send(self._build(user_data, email_type))
+
+    async def send_many_user_emails(self, emails: Sequence[Tuple[dict, str]]) -> List[Optional[Exception]]:
+        """
+        Sends `(user_data, email_type)` pairs in bulk over the pooled SMTP sessions.
+        Returns one result per email: None if it was accepted, otherwise the error.
+        """
+        results: List[Optional[Exception]] = []
+        messages = []
+        for user_data, email_type in emails:
+            try:
+                messages.append(self._build(user_data, email_type))
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+        sent = iter(await self.transport.send_many(messages))
+        return [next(sent) if result is None else result for result in results]
+
+    def verification_email_data(self, user: User) -> dict:
         verification_url = f"{settings.server_base_url}verify-email/{user.id}/{user.verification_token}"
-        await self.send_user_email({
+        return {
             "name": user.first_name,
             "verification_url": verification_url,
             "email": user.email
-        }, 'email_verification')
\ No newline at end of file
+        }
+
+    async def send_verification_email(self, user: User):
+        await self.send_user_email(self.verification_email_data(user), 'email_verification')
+
+    def queue_user_email(self, session: AsyncSession, user_data: dict, email_type: str) -> EmailOutbox:
+        """
+        Adds the email to the outbox in the session's transaction; the outbox workers
+        deliver it once that transaction commits.
+        """
+        if email_type not in SUBJECTS:
+            raise ValueError("Invalid email type")
+        entry = EmailOutbox(email_type=email_type, recipient=user_data['email'], payload=user_data)
+        session.add(entry)
+        return entry
+
+    def queue_verification_email(self, session: AsyncSession, user: User) -> EmailOutbox:
+        return self.queue_user_email(session, self.verification_email_data(user), 'email_verification')
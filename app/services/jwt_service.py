@@ -1,5 +1,9 @@
 # app/services/jwt_service.py
-from builtins import dict, str
+from builtins import dict, int, isinstance, len, str
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
 import jwt
 from datetime import datetime, timedelta
 from settings.config import settings
@@ -20,3 +24,67 @@ def decode_token(token: str):
         return decoded
     except jwt.PyJWTError:
         return None
+
+class ClaimsCache:
+    """
+    Bounded LRU cache of verified JWT claims.
+
+    Entries are keyed by a SHA-256 digest of the token, so raw tokens are never held
+    in memory, and each entry is dropped once the token's `exp` has passed.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            claims, expires_at = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, claims: dict):
+        expires_at = claims.get("exp")
+        # Tokens without an expiry are never cached, so no entry can outlive its token
+        if self.max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        key = self._key(token)
+        self._entries[key] = (claims, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+claims_cache = ClaimsCache(settings.jwt_claims_cache_size)
+
+def decode_token_cached(token: str):
+    """Like `decode_token`, but serves repeat tokens from `claims_cache` until they expire."""
+    claims = claims_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        if claims is not None:
+            claims_cache.put(token, claims)
+    return claims
@@ -0,0 +1,115 @@
+from builtins import Exception, dict, int, len, list, max, range
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from uuid import UUID
+from sqlalchemy import case, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+from app.services.user_cache import user_cache
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _as_naive_utc(value: datetime) -> datetime:
+    # Analytics compares against naive utcnow() values, logins are recorded timezone-aware
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for `users.last_login_at`.
+
+    Successful logins record their timestamp here instead of committing a row
+    update each. Timestamps are coalesced per user (latest wins) and written in
+    batched UPDATE statements every `flush_interval` seconds and on shutdown.
+    Until a flush lands, the stored `last_login_at` may lag by up to
+    `staleness_bound`.
+    """
+
+    def __init__(self, enabled: bool = False, flush_interval: float = 5.0, batch_size: int = 500):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: Dict[UUID, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def staleness_bound(self) -> timedelta:
+        """Upper bound on how far a stored last_login_at can trail the real last login."""
+        if not self.enabled:
+            return timedelta(0)
+        return timedelta(seconds=self.flush_interval)
+
+    def record(self, user_id: UUID, logged_in_at: datetime):
+        current = self._pending.get(user_id)
+        self._pending[user_id] = logged_in_at if current is None else max(current, logged_in_at)
+
+    def pending_since(self, cutoff: datetime) -> Dict[UUID, datetime]:
+        """Buffered logins at or after `cutoff` that are not yet in the database."""
+        cutoff = _as_naive_utc(cutoff)
+        return {
+            user_id: logged_in_at for user_id, logged_in_at in self._pending.items()
+            if _as_naive_utc(logged_in_at) >= cutoff
+        }
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Writes all buffered timestamps, one UPDATE per `batch_size` users. Returns the number of users written."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        try:
+            for start in range(0, len(items), self.batch_size):
+                chunk = dict(items[start:start + self.batch_size])
+                query = (
+                    update(User)
+                    .where(User.id.in_(chunk.keys()))
+                    # Keeps updated_at, which versions ETags: a login does not change the user's representation
+                    .values({User._last_login_at: case(chunk, value=User.id), User.updated_at: User.updated_at})
+                    .execution_options(synchronize_session=False)
+                )
+                await session.execute(query)
+            await session.commit()
+            user_cache.invalidate_many(pending.keys())
+        except Exception:
+            await session.rollback()
+            # Put the timestamps back so the next flush retries them
+            for user_id, logged_in_at in pending.items():
+                self.record(user_id, logged_in_at)
+            raise
+        logger.debug(f"Flushed last_login_at for {len(items)} users.")
+        return len(items)
+
+    async def _run(self, session_factory):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                async with session_factory() as session:
+                    await self.flush(session)
+            except Exception as e:
+                logger.error(f"Failed to flush last_login_at buffer: {e}")
+
+    def start(self, session_factory):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self, session_factory):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pending:
+            async with session_factory() as session:
+                await self.flush(session)
+
+last_login_buffer = LastLoginBuffer(
+    enabled=settings.last_login_write_behind,
+    flush_interval=settings.last_login_flush_interval_seconds,
+)
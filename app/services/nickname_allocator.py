@@ -0,0 +1,82 @@
+from builtins import all, bool, bytearray, float, int, max, range, round, str
+import hashlib
+import logging
+import math
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+from app.utils.nickname_gen import generate_nickname
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    `might_contain` never returns False for an added item; it returns True for an
+    absent item with roughly `false_positive_rate` probability at full capacity.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: derive k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def might_contain(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class NicknameAllocator:
+    """
+    Proposes auto-generated nicknames that are very likely free, without querying the database.
+
+    Taken nicknames are tracked in a Bloom filter warmed once from the users table and
+    kept current as users are created. The unique index on `users.nickname` remains
+    the final arbiter: a collision the filter missed surfaces as an IntegrityError and
+    the caller asks for another candidate.
+    """
+
+    def __init__(self, capacity: int, max_attempts: int = 32):
+        self.capacity = capacity
+        self.max_attempts = max_attempts
+        self._filter = BloomFilter(capacity)
+        self.warmed = False
+
+    async def warm(self, session: AsyncSession, batch_size: int = 10000):
+        """Load every existing nickname into the filter, streaming in batches."""
+        self._filter = BloomFilter(self.capacity)
+        result = await session.stream_scalars(select(User.nickname).execution_options(yield_per=batch_size))
+        async for nickname in result:
+            self._filter.add(nickname)
+        self.warmed = True
+        logger.info(f"Nickname filter warmed with {self._filter.count} nicknames.")
+
+    def mark_taken(self, nickname: str):
+        self._filter.add(nickname)
+
+    def candidate(self) -> str:
+        """Return a generated nickname the filter has not seen."""
+        for _ in range(self.max_attempts):
+            nickname = generate_nickname()
+            if not self._filter.might_contain(nickname):
+                return nickname
+        # The filter is saturated; fall back to the database constraint alone
+        logger.warning("Nickname filter saturated; consider raising nickname_bloom_capacity.")
+        return generate_nickname()
+
+nickname_allocator = NicknameAllocator(settings.nickname_bloom_capacity)
@@ -0,0 +1,98 @@
+# app/services/refresh_token_service.py
+from builtins import dict, int, len, str
+import secrets
+import time
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+import jwt
+from settings.config import settings
+
+REFRESH_TOKEN_TYPE = "refresh"
+
+class RefreshTokenStore:
+    """
+    Server-side state for refresh-token rotation.
+
+    Each login starts a token family. Only the family's most recent token id is
+    stored, so the store holds one small entry per active session rather than one
+    per token issued. Presenting any older token from a family is treated as reuse
+    and revokes the whole family.
+    """
+
+    def __init__(self):
+        # family id -> (current token id, family expiry as epoch seconds)
+        self._families: Dict[str, Tuple[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._families)
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [family for family, (_, expires_at) in self._families.items() if expires_at <= now]
+        for family in expired:
+            del self._families[family]
+
+    def start_family(self, jti: str, expires_at: float) -> str:
+        self._purge_expired()
+        family = secrets.token_urlsafe(16)
+        self._families[family] = (jti, expires_at)
+        return family
+
+    def rotate(self, family: str, presented_jti: str, new_jti: str, expires_at: float) -> bool:
+        """
+        Replaces the family's current token id if `presented_jti` is current.
+
+        Returns False, and revokes the family, if the presented token was already
+        rotated out (reuse) or the family is unknown.
+        """
+        entry = self._families.get(family)
+        if entry is None:
+            return False
+        current_jti, _ = entry
+        if not secrets.compare_digest(current_jti, presented_jti):
+            del self._families[family]
+            return False
+        self._families[family] = (new_jti, expires_at)
+        return True
+
+    def revoke(self, family: str):
+        self._families.pop(family, None)
+
+    def clear(self):
+        self._families.clear()
+
+refresh_token_store = RefreshTokenStore()
+
+def _encode_refresh_token(sub: str, role: str, family: str, jti: str, expires_at: float) -> str:
+    payload = {"sub": sub, "role": role.upper(), "type": REFRESH_TOKEN_TYPE, "fam": family, "jti": jti, "exp": int(expires_at)}
+    return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+
+def create_refresh_token(*, data: dict, expires_delta: timedelta = None) -> str:
+    """Issues the first refresh token of a new token family for a fresh login."""
+    expires_at = time.time() + (expires_delta or timedelta(minutes=settings.refresh_token_expire_minutes)).total_seconds()
+    jti = secrets.token_urlsafe(16)
+    family = refresh_token_store.start_family(jti, expires_at)
+    return _encode_refresh_token(data["sub"], data["role"], family, jti, expires_at)
+
+def decode_refresh_token(token: str) -> Optional[dict]:
+    """Verifies a refresh token's signature, expiry and type and returns its claims, or None."""
+    try:
+        claims = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+    except jwt.PyJWTError:
+        return None
+    if claims.get("type") != REFRESH_TOKEN_TYPE or not claims.get("fam") or not claims.get("jti"):
+        return None
+    return claims
+
+def rotate_refresh_token(claims: dict, role: str) -> Optional[str]:
+    """
+    Exchanges a verified refresh token (its `claims`) for its successor, issued
+    with the user's current `role`.
+
+    Returns None if the token was revoked or has already been used.
+    """
+    new_jti = secrets.token_urlsafe(16)
+    expires_at = claims["exp"]
+    if not refresh_token_store.rotate(claims["fam"], claims["jti"], new_jti, expires_at):
+        return None
+    return _encode_refresh_token(claims["sub"], role, claims["fam"], new_jti, expires_at)
@@ -0,0 +1,162 @@
+from builtins import float, getattr, int, len, str, tuple
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+from uuid import UUID
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from app.models.user_model import SENSITIVE_COLUMNS, User
+from settings.config import settings
+
+# A cached user is the `profile` projection: every column except the credentials
+CACHED_COLUMNS = tuple(attr.key for attr in User.__mapper__.column_attrs if attr.key not in SENSITIVE_COLUMNS)
+
+class UserCacheBackend(ABC):
+    """
+    Storage interface for the user entity cache.
+
+    Implementations only need get/set/delete/clear on string keys; values are plain
+    dictionaries, so an out-of-process store (e.g. Redis) can serialise them as-is.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+class InMemoryUserCacheBackend(UserCacheBackend):
+    """Bounded LRU dictionary whose entries expire `ttl_seconds` after being written."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+class UserCache:
+    """
+    Read-through cache of `User` rows keyed by id, email and nickname.
+
+    Row snapshots are stored once under their id; email and nickname keys only
+    point at the id. A lookup through a secondary key is re-checked against the
+    snapshot, so invalidating the id entry is enough to retire every key of a user,
+    including keys for an email or nickname the user no longer has.
+    """
+
+    def __init__(self, backend: Optional[UserCacheBackend], enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled and backend is not None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+    @staticmethod
+    def _snapshot(user: User) -> Optional[Dict[str, Any]]:
+        # Users loaded with a narrower projection (e.g. the auth profile) are never cached
+        if inspect(user).unloaded.intersection(CACHED_COLUMNS):
+            return None
+        return {key: getattr(user, key) for key in CACHED_COLUMNS}
+
+    def lookup(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        user_id = value if field == "id" else self.backend.get(f"{field}:{value}")
+        snapshot = self.backend.get(f"id:{user_id}") if user_id is not None else None
+        if snapshot is not None and (field == "id" or snapshot.get(field) == value):
+            self.hits += 1
+            return snapshot
+        self.misses += 1
+        return None
+
+    def store(self, user: User):
+        if not self.enabled:
+            return
+        snapshot = self._snapshot(user)
+        if snapshot is None:
+            return
+        self.backend.set(f"id:{user.id}", snapshot)
+        self.backend.set(f"email:{user.email}", user.id)
+        self.backend.set(f"nickname:{user.nickname}", user.id)
+
+    def invalidate(self, user_id: UUID):
+        if self.enabled:
+            self.backend.delete(f"id:{user_id}")
+
+    def invalidate_many(self, user_ids: Iterable[UUID]):
+        for user_id in user_ids:
+            self.invalidate(user_id)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def attach(session: AsyncSession, snapshot: Dict[str, Any]) -> User:
+        """
+        Return the session's instance for a cached row, attaching one if needed.
+
+        An instance already in the session's identity map wins, since it reflects
+        anything the session itself has changed. Otherwise a detached instance with
+        clean attribute history is built from the snapshot and added to the session
+        without a round-trip.
+        """
+        existing = session.identity_map.get(identity_key(User, snapshot["id"]))
+        if existing is not None:
+            return existing
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        session.add(user)
+        return user
+
+user_cache = UserCache(
+    InMemoryUserCacheBackend(settings.user_cache_size, settings.user_cache_ttl_seconds),
+    enabled=settings.user_cache_size > 0 and settings.user_cache_ttl_seconds > 0,
+)
@@ -1,19 +1,31 @@
 from fastapi import HTTPException
-from builtins import Exception, bool, classmethod, int, str
+from builtins import Exception, bool, classmethod, dict, getattr, int, isinstance, len, list, map, range, set, str, zip
 from datetime import datetime, timezone
 import secrets
-from typing import Optional, Dict, List
+from typing import AsyncIterator, Optional, Dict, List, Sequence, Union
 from pydantic import ValidationError
-from sqlalchemy import func, null, update, select
-from sqlalchemy.exc import SQLAlchemyError
+from enum import Enum
+from sqlalchemy import case, delete, func, insert, literal, or_, tuple_, update, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dependencies import get_email_service, get_settings
-from app.models.user_model import User
-from app.schemas.user_schemas import UserCreate, UserUpdate
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from app.dependencies import get_settings
+from app.models.user_model import ANONYMIZED_NULL_COLUMNS, SENSITIVE_COLUMNS, User
+from app.models.user_deletions_model import UserDeletions
+from app.schemas.user_schemas import UserBatchOperation, UserBatchStatus, UserCreate, UserUpdate
 from app.utils.nickname_gen import generate_nickname
-from app.utils.security import generate_verification_token, hash_password, verify_password, validate_password
-from uuid import UUID
+from app.utils.user_serializer import USER_RESPONSE_FIELDS
+from app.utils.security import generate_verification_token, hash_password_async, hash_passwords_async, needs_rehash, verify_password_async, validate_password
+from uuid import UUID, uuid4
 from app.services.email_service import EmailService
+from app.services.bootstrap_state import bootstrap_state
+from app.services.last_login_buffer import last_login_buffer
+from app.services.nickname_allocator import nickname_allocator
+from app.services.user_cache import user_cache
 from app.models.user_model import UserRole
 from app.utils.validators import validate_url_safe_username
 from sqlalchemy.exc import IntegrityError
@@ -25,6 +37,40 @@ from typing import List, Tuple
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+def _response_columns(fields: Sequence[str]) -> list:
+    """The table columns behind a (sparse) set of `UserResponse` field names."""
+    return [User.__table__.c[field] for field in fields]
+
+# Table columns behind UserResponse: the read-only listing paths select only these
+USER_RESPONSE_COLUMNS = _response_columns(USER_RESPONSE_FIELDS)
+
+# PostgreSQL's SQLSTATE for unique_violation
+UNIQUE_VIOLATION_SQLSTATE = "23505"
+
+_USER_COLUMNS = [attr.class_attribute for attr in User.__mapper__.column_attrs]
+
+# Named column projections for User queries, applied with `UserService.load_profile`.
+# Columns outside the profile stay unloaded and raise if read.
+LOAD_PROFILES = {
+    # Login and lock checks
+    "auth": (
+        User.id, User.email, User.role, User.hashed_password,
+        User.is_locked, User.email_verified, User.failed_login_attempts,
+    ),
+    # A user as the API and the entity cache see it: everything but the credentials
+    "profile": tuple(column for column in _USER_COLUMNS if column.key not in SENSITIVE_COLUMNS),
+    # The UserResponse fields, plus created_at for keyset cursors
+    "admin_list": tuple(getattr(User, field) for field in USER_RESPONSE_FIELDS) + (User.created_at,),
+    # Every column, for paths that read the credentials
+    "full": tuple(_USER_COLUMNS),
+}
+
+class LoginOutcome(Enum):
+    """Result of a login attempt, used by the route to pick the HTTP response."""
+    SUCCESS = "SUCCESS"
+    INVALID_CREDENTIALS = "INVALID_CREDENTIALS"
+    LOCKED = "LOCKED"
+
 class UserService:
     @classmethod
     async def _execute_query(cls, session: AsyncSession, query, commit: bool = False):
@@ -40,81 +86,96 @@ class UserService:
 
 
     @classmethod
-    async def _fetch_user(cls, session: AsyncSession, **filters) -> Optional[User]:
-        query = select(User).filter_by(**filters)
+    def load_profile(cls, name: str):
+        """Loader option restricting a User query, or DML RETURNING, to a `LOAD_PROFILES` projection."""
+        return load_only(*LOAD_PROFILES[name], raiseload=True)
+
+    @classmethod
+    async def _fetch_user(cls, session: AsyncSession, profile: str = "profile", **filters) -> Optional[User]:
+        query = select(User).options(cls.load_profile(profile)).filter_by(**filters)
         result = await cls._execute_query(session, query, commit=False)  # Explicitly specify commit=False for clarity
         return result.scalars().first() if result else None
 
+    @classmethod
+    async def _fetch_user_cached(cls, session: AsyncSession, field: str, value) -> Optional[User]:
+        """
+        Read-through lookup on a unique key. Every service method that changes a
+        user row invalidates that user's entry after committing.
+        """
+        snapshot = user_cache.lookup(field, value)
+        if snapshot is not None:
+            return user_cache.attach(session, snapshot)
+        user = await cls._fetch_user(session, **{field: value})
+        if user is not None:
+            user_cache.store(user)
+        return user
+
     @classmethod
     async def get_by_id(cls, session: AsyncSession, user_id: UUID) -> Optional[User]:
-        return await cls._fetch_user(session, id=user_id)
+        return await cls._fetch_user_cached(session, "id", user_id)
 
     @classmethod
     async def get_by_nickname(cls, session: AsyncSession, nickname: str) -> Optional[User]:
-        return await cls._fetch_user(session, nickname=nickname)
+        return await cls._fetch_user_cached(session, "nickname", nickname)
 
     @classmethod
     async def get_by_email(cls, session: AsyncSession, email: str) -> Optional[User]:
-        return await cls._fetch_user(session, email=email)
+        return await cls._fetch_user_cached(session, "email", email)
+
+    @classmethod
+    async def get_auth_state(cls, session: AsyncSession, email: str) -> Optional[Row]:
+        """
+        A user's current `role` and `is_locked`, read from the database (not the
+        cache) with one lookup on the unique email index, or None if no user has
+        that email any more.
+        """
+        result = await session.execute(select(User.role, User.is_locked).where(User.email == email))
+        return result.first()
 
     @classmethod
     async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService) -> Optional[User]:
         try:
-           # Check if the user is the first user
-           is_first_user = await cls.is_first_user(session)
-           logger.debug(f"is_first_user: {is_first_user}")  # Debug statement
-           if is_first_user:
-               user_data["role"] = UserRole.ADMIN.name  # Automatically assign ADMIN role
-           else:
-               # Set default role if not provided
-               user_data.setdefault("role", UserRole.AUTHENTICATED.name)
-           logger.debug(f"Assigned role: {user_data['role']}")
-           validated_data = UserCreate(**user_data).model_dump()
-
-           # Check for existing email
-           existing_user = await cls.get_by_email(session, validated_data['email'])
-           if existing_user:
-               logger.error("User with given email already exists.")
-               return None
-
-           # Validate and hash password
-           password = validated_data.pop('password')
-           try:
-               validate_password(password)  # Ensures password meets security criteria
-           except ValueError as e:
-               logger.error(f"Password validation failed: {e}")
-               return None
-           validated_data['hashed_password'] = hash_password(password)
-
-           # Check for existing nickname
-           if validated_data.get("nickname"):
-               existing_nickname = await cls.get_by_nickname(session, validated_data["nickname"])
-               if existing_nickname:
-                   logger.error("User with given nickname already exists.")
+           # Until the first user exists, creation is serialised and counts users once;
+           # afterwards the cached bootstrap flag answers without a query
+           async with bootstrap_state.first_user_guard(session) as is_first_user:
+               if is_first_user:
+                   user_data["role"] = UserRole.ADMIN.name  # Automatically assign ADMIN role
+               else:
+                   # Set default role if not provided
+                   user_data.setdefault("role", UserRole.AUTHENTICATED.name)
+               logger.debug(f"Assigned role: {user_data['role']}")
+               validated_data = UserCreate(**user_data).model_dump()
+
+               # Validate and hash password
+               password = validated_data.pop('password')
+               try:
+                   validate_password(password)  # Ensures password meets security criteria
+               except ValueError as e:
+                   logger.error(f"Password validation failed: {e}")
                    return None
-           else:
-               # Auto-generate a unique nickname if not provided
-               new_nickname = generate_nickname()
-               while await cls.get_by_nickname(session, new_nickname):
-                   new_nickname = generate_nickname()
-               validated_data["nickname"] = new_nickname
-
-           # Prepare new user
-           new_user = User(**validated_data)
-           
-           # Assign role explicitly based on whether it’s the first user
-           new_user.role = UserRole.ADMIN if is_first_user else UserRole.AUTHENTICATED
-
-           # Add and commit new user
-           new_user.verification_token = generate_verification_token()
-           session.add(new_user)
-           await session.commit()
-           await session.refresh(new_user)  # Ensure in-memory reflects database state
-
-           # Send verification email
-           await email_service.send_verification_email(new_user)
-           return new_user
-
+               validated_data['hashed_password'] = await hash_password_async(password)
+
+               generated_nickname = not validated_data.get("nickname")
+               if generated_nickname:
+                   # Auto-generate a nickname the allocator believes is free
+                   if not nickname_allocator.warmed:
+                       await nickname_allocator.warm(session)
+                   validated_data["nickname"] = nickname_allocator.candidate()
+
+               # Assign role explicitly based on whether it’s the first user
+               validated_data["role"] = UserRole.ADMIN if is_first_user else UserRole.AUTHENTICATED
+               validated_data["verification_token"] = generate_verification_token()
+
+               # Email and nickname uniqueness is decided by the unique indexes on insert
+               new_user = await cls._insert_new_user(session, validated_data, generated_nickname)
+               # The verification email is committed with the user and delivered by the outbox workers
+               email_service.queue_verification_email(session, new_user)
+               await session.commit()
+               nickname_allocator.mark_taken(new_user.nickname)
+               return new_user
+
+        except HTTPException:
+            raise
         except ValidationError as e:
             logger.error(f"Validation error during user creation: {e}")
             return None
@@ -122,6 +183,228 @@ class UserService:
             logger.error(f"Unexpected error during user creation: {e}")
             return None
 
+    @staticmethod
+    def _insert_ignoring_conflicts(session: AsyncSession, values: Dict):
+        """INSERT ... ON CONFLICT DO NOTHING RETURNING the new row, or None where the dialect has no such clause."""
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql_insert(User).values(values)
+        elif dialect == "sqlite":
+            statement = sqlite_insert(User).values(values)
+        else:
+            return None
+        return statement.on_conflict_do_nothing().returning(User).options(UserService.load_profile("full"))
+
+    @classmethod
+    async def _conflicting_field(cls, session: AsyncSession, email: str, nickname: str) -> Optional[str]:
+        """Which unique field a rejected insert collided on; only runs after a conflict."""
+        query = select(User.email).where(or_(User.email == email, User.nickname == nickname))
+        taken_emails = (await session.execute(query)).scalars().all()
+        if email in taken_emails:
+            return "email"
+        return "nickname" if taken_emails else None
+
+    @classmethod
+    async def _insert_new_user(cls, session: AsyncSession, values: Dict, generated_nickname: bool, attempts: int = 3) -> User:
+        """
+        Inserts a user in one round-trip, letting the unique indexes arbitrate.
+
+        The row comes back through RETURNING, so no refresh is needed. When the insert
+        is skipped by ON CONFLICT DO NOTHING (or, on other dialects, fails inside a
+        savepoint) the colliding field is looked up: a taken email is a 400, a taken
+        chosen nickname a 409, and a taken generated nickname (the in-memory filter does
+        not see nicknames claimed by other workers) is retried with a fresh candidate.
+        """
+        for attempt in range(attempts):
+            statement = cls._insert_ignoring_conflicts(session, values)
+            if statement is not None:
+                new_user = (await session.execute(statement)).scalars().first()
+            else:
+                new_user = User(**values)
+                try:
+                    async with session.begin_nested():
+                        session.add(new_user)
+                except IntegrityError:
+                    new_user = None
+            if new_user is not None:
+                return new_user
+
+            conflict = await cls._conflicting_field(session, values["email"], values["nickname"])
+            if conflict == "email":
+                logger.error("User with given email already exists.")
+                raise HTTPException(status_code=400, detail="Email already exists")
+            if conflict == "nickname" and not generated_nickname:
+                logger.error("User with given nickname already exists.")
+                raise HTTPException(status_code=409, detail="Nickname already exists")
+            if conflict == "nickname":
+                logger.info(f"Generated nickname {values['nickname']} already taken; retrying.")
+                nickname_allocator.mark_taken(values["nickname"])
+                values["nickname"] = nickname_allocator.candidate()
+        raise SQLAlchemyError(f"User insert was rejected {attempts} times")
+
+    @classmethod
+    async def import_users(
+        cls,
+        session: AsyncSession,
+        rows: AsyncIterator[Tuple[int, Union[Dict[str, str], Exception]]],
+        email_service: EmailService,
+        batch_size: int = 500,
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Bulk-create users from a stream of parsed rows.
+
+        Rows are validated and checked for duplicates a batch at a time (one SELECT per
+        batch), passwords are hashed concurrently in the hashing executor, and each batch
+        is written with a single multi-row INSERT, or COPY on PostgreSQL/asyncpg. The
+        batch's verification emails are queued in the outbox in the same transaction.
+
+        :param rows: `(row_number, data)` pairs; `data` may be an exception for unparseable rows.
+        :return: The number of users created and `(row_number, error)` pairs for rejected rows.
+        """
+        created = 0
+        errors: List[Tuple[int, str]] = []
+        batch = []
+        async for row_number, data in rows:
+            batch.append((row_number, data))
+            if len(batch) >= batch_size:
+                created += await cls._import_batch(session, batch, errors, email_service)
+                batch = []
+        if batch:
+            created += await cls._import_batch(session, batch, errors, email_service)
+        return created, errors
+
+    @classmethod
+    async def _import_batch(cls, session: AsyncSession, batch, errors: List[Tuple[int, str]], email_service: EmailService) -> int:
+        valid = []
+        seen_emails, seen_nicknames = set(), set()
+        for row_number, data in batch:
+            if isinstance(data, Exception):
+                errors.append((row_number, str(data)))
+                continue
+            try:
+                data = dict(data)
+                data.setdefault("role", UserRole.AUTHENTICATED.name)
+                validated = UserCreate(**data).model_dump()
+            except ValidationError as e:
+                errors.append((row_number, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())))
+                continue
+            if not validate_password(validated["password"]):
+                errors.append((row_number, "Password does not meet security requirements"))
+                continue
+            email = validated["email"]
+            if email in seen_emails:
+                errors.append((row_number, "Duplicate email in import"))
+                continue
+            if validated.get("nickname") and validated["nickname"] in seen_nicknames:
+                errors.append((row_number, "Duplicate nickname in import"))
+                continue
+            seen_emails.add(email)
+            if validated.get("nickname"):
+                seen_nicknames.add(validated["nickname"])
+            valid.append((row_number, validated))
+        if not valid:
+            return 0
+
+        # One round-trip to find rows that collide with existing users
+        existing = await session.execute(
+            select(User.email, User.nickname).where(or_(User.email.in_(seen_emails), User.nickname.in_(seen_nicknames)))
+        )
+        taken_emails, taken_nicknames = set(), set()
+        for email, nickname in existing:
+            taken_emails.add(email)
+            taken_nicknames.add(nickname)
+
+        if not nickname_allocator.warmed:
+            await nickname_allocator.warm(session)
+        accepted = []
+        for row_number, validated in valid:
+            if validated["email"] in taken_emails:
+                errors.append((row_number, "Email already exists"))
+            elif validated.get("nickname") and validated["nickname"] in taken_nicknames:
+                errors.append((row_number, "Nickname already exists"))
+            else:
+                if not validated.get("nickname"):
+                    validated["nickname"] = nickname_allocator.candidate()
+                accepted.append((row_number, validated))
+        if not accepted:
+            return 0
+
+        hashes = await hash_passwords_async([validated["password"] for _, validated in accepted])
+        records = []
+        for (row_number, validated), hashed in zip(accepted, hashes):
+            validated.pop("password")
+            records.append({
+                **validated,
+                "id": uuid4(),
+                "role": UserRole[validated["role"]] if isinstance(validated["role"], str) else validated["role"],
+                "hashed_password": hashed,
+                "email_verified": False,
+                "is_locked": False,
+                "failed_login_attempts": 0,
+                "is_professional": False,
+                "verification_token": generate_verification_token(),
+                "created_at": datetime.now(timezone.utc),
+            })
+
+        try:
+            await cls._bulk_insert_users(session, records)
+        except IntegrityError:
+            # Lost a race with a concurrent writer; fall back to row-by-row to isolate the culprits
+            await session.rollback()
+            records = await cls._insert_users_individually(session, accepted, records, errors)
+
+        # The verification emails are committed with their users and delivered by the outbox workers
+        for record in records:
+            email_service.queue_verification_email(session, User(
+                id=record["id"], email=record["email"], first_name=record.get("first_name"),
+                nickname=record["nickname"], verification_token=record["verification_token"],
+            ))
+        await session.commit()
+        for record in records:
+            nickname_allocator.mark_taken(record["nickname"])
+        return len(records)
+
+    @classmethod
+    async def _bulk_insert_users(cls, session: AsyncSession, records: List[Dict]):
+        if session.get_bind().dialect.driver == "asyncpg":
+            try:
+                await cls._copy_users(session, records)
+            except SQLAlchemyError:
+                raise
+            except Exception as e:
+                # COPY goes straight to asyncpg, whose errors SQLAlchemy never wraps; report
+                # unique violations as IntegrityError so the row-by-row fallback runs
+                if getattr(e, "sqlstate", None) == UNIQUE_VIOLATION_SQLSTATE:
+                    raise IntegrityError("COPY users", None, e) from e
+                raise
+        else:
+            await session.execute(insert(User), records)
+
+    @classmethod
+    async def _copy_users(cls, session: AsyncSession, records: List[Dict]):
+        # Import records only use attributes whose names match their column names
+        columns = list(records[0].keys())
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            User.__tablename__,
+            records=[tuple(record[key].name if key == "role" else record[key] for key in columns) for record in records],
+            columns=columns,
+        )
+
+    @classmethod
+    async def _insert_users_individually(cls, session: AsyncSession, accepted, records: List[Dict], errors: List[Tuple[int, str]]) -> List[Dict]:
+        inserted = []
+        for (row_number, _), record in zip(accepted, records):
+            try:
+                async with session.begin_nested():
+                    await session.execute(insert(User), [record])
+                inserted.append(record)
+            except IntegrityError as e:
+                field = "Nickname" if "nickname" in str(e.orig).lower() else "Email"
+                errors.append((row_number, f"{field} already exists"))
+        return inserted
+
     @classmethod
     async def is_first_user(cls, session: AsyncSession) -> bool:
        """Check if the current user is the first user in the database."""
@@ -132,37 +415,69 @@ class UserService:
        return count == 0
 
     @classmethod
-    async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str]) -> Optional[User]:
-        try:
-            validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
+    async def update(
+        cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str], expected_updated_at: Optional[datetime] = None,
+    ) -> Optional[User]:
+        """
+        Applies a partial update in one UPDATE ... RETURNING round-trip.
 
-            # Check for nickname uniqueness if nickname is being updated
-            if "nickname" in validated_data:
-                existing_nickname = await cls.get_by_nickname(session, validated_data["nickname"])
-                if existing_nickname and existing_nickname.id != user_id:
-                    logger.error("User with given nickname already exists.")
-                    return None
+        Nickname and email uniqueness is left to the unique indexes: a violation
+        surfaces as an IntegrityError and is reported as 409 Conflict. Returns None
+        for invalid data or an unknown user.
 
+        :param expected_updated_at: Only update the row while its `updated_at` still
+            has this value (optimistic concurrency); otherwise returns None.
+        """
+        try:
+            validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
             # Hash the password if being updated
             if 'password' in validated_data:
-                validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-
-            # Update the user
-            query = update(User).where(User.id == user_id).values(**validated_data).execution_options(synchronize_session="fetch")
-            await cls._execute_query(session, query)
-
-            updated_user = await cls.get_by_id(session, user_id)
-            if updated_user:
-                session.refresh(updated_user)  # Explicitly refresh the updated user object
-                logger.info(f"User {user_id} updated successfully.")
-                return updated_user
-
-            logger.error(f"User {user_id} not found after update attempt.")
-            return None
-
+                validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
         except Exception as e:
             logger.error(f"Error during user update: {e}")
             return None
+        if not validated_data:
+            return await cls.get_by_id(session, user_id)
+
+        query = update(User).where(User.id == user_id)
+        if expected_updated_at is not None:
+            query = query.where(User.updated_at == expected_updated_at)
+        # updated_at versions ETags. It is set explicitly, and the session synchronised
+        # with "fetch", so a user already in the identity map gets every new value:
+        # RETURNING alone does not refresh it, and "evaluate" cannot match the
+        # version criterion against it in Python
+        query = (
+            query
+            .values(**validated_data, updated_at=datetime.now(timezone.utc))
+            .returning(User)
+            .options(cls.load_profile("profile"))
+            .execution_options(populate_existing=True, synchronize_session="fetch")
+        )
+        try:
+            result = await session.execute(query)
+            updated_user = result.scalars().first()
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            logger.error(f"User update for {user_id} violates a unique constraint: {e.orig}")
+            raise HTTPException(status_code=409, detail="Nickname or email already in use")
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Error during user update: {e}")
+            return None
+
+        user_cache.invalidate(user_id)
+        if updated_user is None:
+            if expected_updated_at is not None:
+                logger.info(f"User {user_id} not updated: missing or modified since {expected_updated_at}.")
+            else:
+                logger.error(f"User {user_id} not found for update.")
+            return None
+        user_cache.store(updated_user)
+        if "nickname" in validated_data:
+            nickname_allocator.mark_taken(updated_user.nickname)
+        logger.info(f"User {user_id} updated successfully.")
+        return updated_user
 
     @classmethod
     async def delete(cls, session: AsyncSession, user_id: UUID) -> bool:
@@ -171,42 +486,207 @@ class UserService:
             logger.info(f"User with ID {user_id} not found.")
             return False
         await session.delete(user)
+        await cls._record_deletions(session, 1)
         await session.commit()
+        user_cache.invalidate(user_id)
         return True
 
     @classmethod
     async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10) -> List[User]:
-        query = select(User).offset(skip).limit(limit)
+        query = select(User).options(cls.load_profile("admin_list")).offset(skip).limit(limit)
         result = await cls._execute_query(session, query)
         return result.scalars().all() if result else []
 
+    @classmethod
+    async def _execute_core(cls, session: AsyncSession, query):
+        """Runs a Core select on the session's connection: plain rows, no ORM entities or identity map."""
+        try:
+            connection = await session.connection()
+            return await connection.execute(query)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error: {e}")
+            await session.rollback()
+            return None
+
+    @classmethod
+    async def list_user_rows(
+        cls, session: AsyncSession, skip: int = 0, limit: int = 10, fields: Sequence[str] = USER_RESPONSE_FIELDS,
+    ) -> List[Row]:
+        """Like `list_users`, as lightweight rows holding only the `UserResponse` columns named in `fields`."""
+        query = select(*_response_columns(fields)).offset(skip).limit(limit)
+        result = await cls._execute_core(session, query)
+        return result.all() if result else []
+
+    @classmethod
+    async def list_users_keyset(
+        cls,
+        session: AsyncSession,
+        limit: int = 10,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        before: Optional[Tuple[datetime, UUID]] = None,
+    ) -> Tuple[List[User], bool]:
+        """
+        List users ordered by `(created_at, id)` starting from a keyset position.
+
+        The position is matched with a row-value comparison against the
+        `(created_at, id)` index, so every page costs the same regardless of depth.
+
+        :param after: Return the users that follow this `(created_at, id)` position.
+        :param before: Return the users that precede this position instead.
+        :return: The page of users in ascending order, and whether more users exist
+            beyond the page in the direction of travel.
+        """
+        result = await cls._execute_query(session, cls._keyset_query(select(User).options(cls.load_profile("admin_list")), limit, after, before))
+        users = list(result.scalars().all()) if result else []
+        return cls._keyset_page(users, limit, before)
+
+    @classmethod
+    async def list_user_rows_keyset(
+        cls,
+        session: AsyncSession,
+        limit: int = 10,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        before: Optional[Tuple[datetime, UUID]] = None,
+        fields: Sequence[str] = USER_RESPONSE_FIELDS,
+    ) -> Tuple[List[Row], bool]:
+        """
+        Like `list_users_keyset`, as rows of the `UserResponse` columns named in
+        `fields` plus `id` and `created_at`, which the cursors are built from, and
+        `updated_at`, which the page's ETag is.
+        """
+        keys = [key for key in ("id", "created_at", "updated_at") if key not in fields]
+        query = cls._keyset_query(select(*_response_columns([*fields, *keys])), limit, after, before)
+        result = await cls._execute_core(session, query)
+        return cls._keyset_page(result.all() if result else [], limit, before)
+
+    @staticmethod
+    def _keyset_query(query, limit: int, after: Optional[Tuple[datetime, UUID]], before: Optional[Tuple[datetime, UUID]]):
+        key = tuple_(User.created_at, User.id)
+        if before is not None:
+            query = query.where(key < tuple_(*before)).order_by(User.created_at.desc(), User.id.desc())
+        else:
+            if after is not None:
+                query = query.where(key > tuple_(*after))
+            query = query.order_by(User.created_at, User.id)
+        return query.limit(limit + 1)
+
+    @staticmethod
+    def _keyset_page(items: list, limit: int, before: Optional[Tuple[datetime, UUID]]) -> Tuple[list, bool]:
+        """Trims the look-ahead row and restores ascending order for backward pages."""
+        items = list(items)
+        has_more = len(items) > limit
+        items = items[:limit]
+        if before is not None:
+            items.reverse()
+        return items, has_more
+
     @classmethod
     async def register_user(cls, session: AsyncSession, user_data: Dict[str, str], get_email_service) -> Optional[User]:
         return await cls.create(session, user_data, get_email_service)
     
 
     @classmethod
-    async def login_user(cls, session: AsyncSession, email: str, password: str) -> Optional[User]:
-        user = await cls.get_by_email(session, email)
-        if user:
-            if user.email_verified is False:
-                return None
-            if user.is_locked:
-                return None
-            if verify_password(password, user.hashed_password):
-                user.failed_login_attempts = 0
-                user.last_login_at = datetime.now(timezone.utc)
-                session.add(user)
-                await session.commit()
-                return user
-            else:
-                user.failed_login_attempts += 1
-                if user.failed_login_attempts >= settings.max_login_attempts:
-                    user.is_locked = True
-                session.add(user)
+    async def _login_update(cls, session: AsyncSession, query, retries: int = 3):
+        """
+        Executes a login counter UPDATE ... RETURNING and commits it.
+
+        Under SERIALIZABLE isolation two concurrent attempts on the same row make one
+        transaction fail with a serialization error (SQLSTATE 40001); that attempt is
+        retried so its increment is applied on top of the committed one.
+        """
+        for attempt in range(retries):
+            try:
+                result = await session.execute(query)
+                row = result.first()
                 await session.commit()
+                return row
+            except DBAPIError as e:
+                await session.rollback()
+                if getattr(e.orig, "sqlstate", None) != "40001" or attempt == retries - 1:
+                    raise
         return None
 
+    @classmethod
+    async def attempt_login(cls, session: AsyncSession, email: str, password: str) -> Tuple[LoginOutcome, Optional[User]]:
+        """
+        Authenticates a user in two database round-trips.
+
+        A single SELECT loads only the columns the checks need. The outcome is then
+        written with one atomic UPDATE ... RETURNING: on success the failure counter is
+        reset and the full user row comes back; on failure the counter is incremented
+        and the lock flag set in the database, so parallel attempts cannot lose counts.
+
+        With the last-login write-behind buffer enabled, a success that has no counter
+        to reset and no hash to upgrade skips the UPDATE and returns the partially
+        loaded user; its `last_login_at` is written by the next buffer flush.
+        """
+        query = select(User).options(cls.load_profile("auth")).where(User.email == email)
+        result = await cls._execute_query(session, query)
+        credentials = result.scalars().first() if result else None
+        if credentials is None:
+            return LoginOutcome.INVALID_CREDENTIALS, None
+        if credentials.is_locked:
+            return LoginOutcome.LOCKED, None
+        if credentials.email_verified is False:
+            return LoginOutcome.INVALID_CREDENTIALS, None
+
+        if await verify_password_async(password, credentials.hashed_password):
+            logged_in_at = datetime.now(timezone.utc)
+            rehash = needs_rehash(credentials.hashed_password)
+            if last_login_buffer.enabled and not credentials.failed_login_attempts and not rehash:
+                last_login_buffer.record(credentials.id, logged_in_at)
+                set_committed_value(credentials, "_last_login_at", logged_in_at)
+                user_cache.invalidate(credentials.id)
+                return LoginOutcome.SUCCESS, credentials
+
+            # Login bookkeeping is not part of the user's representation, so it keeps updated_at
+            values = {User.failed_login_attempts: 0, User.updated_at: User.updated_at}
+            if last_login_buffer.enabled:
+                last_login_buffer.record(credentials.id, logged_in_at)
+            else:
+                values[User._last_login_at] = logged_in_at
+            if rehash:
+                # Move the stored hash to the current cost while we hold the plain password
+                values[User.hashed_password] = await hash_password_async(password)
+            success_query = (
+                update(User)
+                .where(User.id == credentials.id, User.is_locked.is_(False))
+                .values(values)
+                .returning(User)
+                .options(cls.load_profile("profile"))
+                .execution_options(populate_existing=True)
+            )
+            row = await cls._login_update(session, success_query)
+            user_cache.invalidate(credentials.id)
+            if row is None:
+                # Locked by a concurrent failed attempt between the SELECT and the UPDATE
+                return LoginOutcome.LOCKED, None
+            return LoginOutcome.SUCCESS, row[0]
+
+        attempts = func.coalesce(User.failed_login_attempts, 0) + 1
+        failure_query = (
+            update(User)
+            .where(User.id == credentials.id)
+            .values({
+                User.failed_login_attempts: attempts,
+                User.is_locked: case((attempts >= settings.max_login_attempts, True), else_=User.is_locked),
+                User.updated_at: User.updated_at,
+            })
+            .returning(User)
+            .options(cls.load_profile("auth"))
+            .execution_options(populate_existing=True)
+        )
+        row = await cls._login_update(session, failure_query)
+        user_cache.invalidate(credentials.id)
+        if row is not None and row[0].is_locked:
+            logger.info(f"User {credentials.id} locked after {row[0].failed_login_attempts} failed login attempts.")
+        return LoginOutcome.INVALID_CREDENTIALS, None
+
+    @classmethod
+    async def login_user(cls, session: AsyncSession, email: str, password: str) -> Optional[User]:
+        outcome, user = await cls.attempt_login(session, email, password)
+        return user if outcome is LoginOutcome.SUCCESS else None
+
     @classmethod
     async def is_account_locked(cls, session: AsyncSession, email: str) -> bool:
         user = await cls.get_by_email(session, email)
@@ -215,7 +695,7 @@ class UserService:
 
     @classmethod
     async def reset_password(cls, session: AsyncSession, user_id: UUID, new_password: str) -> bool:
-        hashed_password = hash_password(new_password)
+        hashed_password = await hash_password_async(new_password)
         user = await cls.get_by_id(session, user_id)
         if user:
             user.hashed_password = hashed_password
@@ -223,18 +703,21 @@ class UserService:
             user.is_locked = False  # Unlocking the user account, if locked
             session.add(user)
             await session.commit()
+            user_cache.invalidate(user_id)
             return True
         return False
 
     @classmethod
     async def verify_email_with_token(cls, session: AsyncSession, user_id: UUID, token: str) -> bool:
-        user = await cls.get_by_id(session, user_id)
+        # The token is a credential, so this bypasses the cached profile
+        user = await cls._fetch_user(session, "full", id=user_id)
         if user and user.verification_token == token:
             user.email_verified = True
             user.verification_token = None  # Clear the token once used
             user.role = UserRole.AUTHENTICATED
             session.add(user)
             await session.commit()
+            user_cache.invalidate(user_id)
             return True
         return False
 
@@ -251,6 +734,46 @@ class UserService:
         count = result.scalar()
         return count
     
+    @classmethod
+    async def _record_deletions(cls, session: AsyncSession, deleted: int):
+        """Adds `deleted` to the tombstone counter inside the caller's transaction, creating its row if missing."""
+        values = {"id": UserDeletions.ROW_ID, "deleted": deleted}
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql_insert(UserDeletions).values(values)
+        elif dialect == "sqlite":
+            statement = sqlite_insert(UserDeletions).values(values)
+        else:
+            statement = None
+        if statement is not None:
+            await session.execute(statement.on_conflict_do_update(
+                index_elements=[UserDeletions.id], set_={"deleted": UserDeletions.deleted + statement.excluded.deleted}
+            ))
+            return
+        result = await session.execute(
+            update(UserDeletions).where(UserDeletions.id == UserDeletions.ROW_ID).values(deleted=UserDeletions.deleted + deleted)
+        )
+        if result.rowcount == 0:
+            await session.execute(insert(UserDeletions).values(values))
+
+    @classmethod
+    async def table_version(cls, session: AsyncSession) -> Tuple[Optional[datetime], int]:
+        """
+        The users table version token without counting it: the latest `updated_at`,
+        which inserts and account changes advance (an ix_users_updated_at lookup),
+        and the tombstone counter every delete bumps.
+        """
+        latest = select(func.max(User.updated_at)).scalar_subquery()
+        deleted = select(UserDeletions.deleted).where(UserDeletions.id == UserDeletions.ROW_ID).scalar_subquery()
+        last_modified, deletions = (await session.execute(select(latest, deleted))).one()
+        return last_modified, deletions or 0
+
+    @classmethod
+    async def current_version(cls, session: AsyncSession, user_id: UUID) -> Optional[datetime]:
+        """A user's `updated_at` read from the database (not the cache), or None for an unknown user."""
+        result = await session.execute(select(User.updated_at).where(User.id == user_id))
+        return result.scalar_one_or_none()
+
     @classmethod
     async def unlock_user_account(cls, session: AsyncSession, user_id: UUID) -> bool:
         user = await cls.get_by_id(session, user_id)
@@ -259,6 +782,7 @@ class UserService:
             user.failed_login_attempts = 0  # Optionally reset failed login attempts
             session.add(user)
             await session.commit()
+            user_cache.invalidate(user_id)
             return True
         return False
     
@@ -269,9 +793,117 @@ class UserService:
             user.anonymize()
             session.add(user)
             await session.commit()
+            user_cache.invalidate(user_id)
             return user
         return None
 
+    @classmethod
+    def _batch_statement(cls, user_ids: List[UUID], operation: UserBatchOperation, role: Optional[UserRole]):
+        """Builds the single set-based statement applying `operation` to `user_ids`, returning affected ids."""
+        if operation is UserBatchOperation.DELETE:
+            # user_analytics rows go with their user through the ON DELETE CASCADE foreign key
+            return delete(User).where(User.id.in_(user_ids)).returning(User.id)
+        if operation is UserBatchOperation.LOCK:
+            values = {User.is_locked: True}
+        elif operation is UserBatchOperation.UNLOCK:
+            values = {User.is_locked: False, User.failed_login_attempts: 0}
+        elif operation is UserBatchOperation.SET_ROLE:
+            values = {User.role: role}
+        elif operation is UserBatchOperation.VERIFY_EMAIL:
+            values = {
+                User.email_verified: True,
+                User.verification_token: None,
+                User.role: case((User.role == UserRole.ANONYMOUS, literal(UserRole.AUTHENTICATED, User.role.type)), else_=User.role),
+            }
+        else:
+            identities = {user_id: User.anonymized_identity(user_id) for user_id in user_ids}
+            values = {getattr(User, column): None for column in ANONYMIZED_NULL_COLUMNS}
+            values[User.nickname] = case({user_id: nickname for user_id, (nickname, _) in identities.items()}, value=User.id)
+            values[User.email] = case({user_id: email for user_id, (_, email) in identities.items()}, value=User.id)
+        return update(User).where(User.id.in_(user_ids)).values(values).returning(User.id)
+
+    @classmethod
+    async def batch_update(
+        cls, session: AsyncSession, user_ids: List[UUID], operation: UserBatchOperation,
+        role: Optional[UserRole] = None, chunk_size: int = 500
+    ) -> Dict[UUID, UserBatchStatus]:
+        """
+        Applies one moderation operation to many users with set-based SQL.
+
+        Ids are processed in chunks of `chunk_size`, one statement and one transaction
+        per chunk, so a failing chunk does not undo the ones already committed.
+        Returns the outcome for every distinct id, in request order.
+        """
+        outcomes = dict.fromkeys(user_ids, UserBatchStatus.NOT_FOUND)
+        ids = list(outcomes)
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            try:
+                result = await session.execute(cls._batch_statement(chunk, operation, role))
+                affected = result.scalars().all()
+                if operation is UserBatchOperation.DELETE and affected:
+                    await cls._record_deletions(session, len(affected))
+                await session.commit()
+            except SQLAlchemyError as e:
+                await session.rollback()
+                logger.error(f"Batch {operation.value} failed for {len(chunk)} users: {e}")
+                outcomes.update(dict.fromkeys(chunk, UserBatchStatus.FAILED))
+                continue
+            outcomes.update(dict.fromkeys(affected, UserBatchStatus.OK))
+            user_cache.invalidate_many(affected)
+        logger.info(f"Batch {operation.value} applied to {len(ids)} users.")
+        return outcomes
+
+
+    @staticmethod
+    def _search_rank(session: AsyncSession, term: str, *columns):
+        """
+        Relevance of `term` against the given columns, higher is better.
+
+        On PostgreSQL this is the best trigram similarity, computed from the same
+        pg_trgm GIN indexes that serve the ILIKE filter. Other databases fall back to
+        an equivalent tiered score: exact match, then prefix match, then substring.
+        """
+        if session.get_bind().dialect.name == "postgresql":
+            return func.greatest(*(func.similarity(column, term) for column in columns))
+        lowered = term.lower()
+        scores = [
+            case(
+                (func.lower(column) == lowered, 1.0),
+                (func.lower(column).startswith(lowered, autoescape=True), 0.5),
+                else_=0.25,
+            ) for column in columns
+        ]
+        # SQLite's multi-argument max() is a scalar function, not the aggregate
+        return func.max(*scores) if len(scores) > 1 else scores[0]
+
+    @staticmethod
+    def _search_conditions(session: AsyncSession, filters: Dict[str, Optional[str]]) -> Tuple[list, list]:
+        """Translate search criteria into WHERE conditions and relevance expressions."""
+        conditions = []
+        ranks = []
+
+        if filters.get("q"):
+            conditions.append(or_(
+                User.nickname.icontains(filters["q"], autoescape=True),
+                User.email.icontains(filters["q"], autoescape=True),
+            ))
+            ranks.append(UserService._search_rank(session, filters["q"], User.nickname, User.email))
+        if filters.get("username"):
+            conditions.append(User.nickname.icontains(filters["username"], autoescape=True))
+            ranks.append(UserService._search_rank(session, filters["username"], User.nickname))
+        if filters.get("email"):
+            conditions.append(User.email.icontains(filters["email"], autoescape=True))
+            ranks.append(UserService._search_rank(session, filters["email"], User.email))
+        if filters.get("role"):
+            conditions.append(User.role == filters["role"])
+        if filters.get("account_status") is not None:
+            conditions.append(User.email_verified == filters["account_status"])
+        if filters.get("registration_date_start") and filters.get("registration_date_end"):
+            conditions.append(
+                User.created_at.between(filters["registration_date_start"], filters["registration_date_end"])
+            )
+        return conditions, ranks
 
     @staticmethod
     async def search_and_filter_users(
@@ -283,40 +915,90 @@ class UserService:
         """
         Search and filter users based on the given criteria.
 
+        Text criteria (`q` across nickname and email, `username`, `email`) are matched
+        as case-insensitive substrings, which PostgreSQL serves from trigram indexes,
+        and results are ordered by relevance when any are given. The filtered total
+        is computed in the same query with a window function.
+
         :param session: AsyncSession for database access.
         :param filters: Dictionary of search and filter criteria.
         :param skip: Pagination offset.
         :param limit: Number of records to return.
-        :return: A tuple containing the list of users and total count.
+        :return: A tuple containing the list of users and the total number of matches.
         """
-        query = select(User)
+        rows, total = await UserService._search(session, select(User).options(UserService.load_profile("admin_list")), filters, skip, limit, orm=True)
+        return [row[0] for row in rows], total
 
-        # Apply filters
-        if filters.get("username"):
-            query = query.filter(User.nickname.ilike(f"%{filters['username']}%"))
-        if filters.get("email"):
-            query = query.filter(User.email.ilike(f"%{filters['email']}%"))
-        if filters.get("role"):
-            query = query.filter(User.role == filters["role"])
-        if filters.get("account_status") is not None:
-            query = query.filter(User.email_verified == filters["account_status"])
-        if filters.get("registration_date_start") and filters.get("registration_date_end"):
-            query = query.filter(
-                User.created_at.between(filters["registration_date_start"], filters["registration_date_end"])
-            )
+    @staticmethod
+    async def search_user_rows(
+        session: AsyncSession,
+        filters: Dict[str, Optional[str]],
+        skip: int,
+        limit: int,
+        fields: Sequence[str] = USER_RESPONSE_FIELDS,
+    ) -> Tuple[List[Row], int]:
+        """
+        Like `search_and_filter_users`, as rows holding only the `UserResponse` columns
+        named in `fields`, plus `id` and `updated_at` for the page's ETag.
+        """
+        keys = [key for key in ("id", "updated_at") if key not in fields]
+        return await UserService._search(session, select(*_response_columns([*fields, *keys])), filters, skip, limit, orm=False)
+
+    @staticmethod
+    async def _search(session: AsyncSession, query, filters: Dict[str, Optional[str]], skip: int, limit: int, orm: bool) -> Tuple[list, int]:
+        conditions, ranks = UserService._search_conditions(session, filters)
+
+        total = func.count().over().label("total")
+        query = query.add_columns(total).where(*conditions)
+        if ranks:
+            relevance = ranks[0]
+            for rank in ranks[1:]:
+                relevance = relevance + rank
+            query = query.order_by(relevance.desc(), User.created_at, User.id)
+        else:
+            query = query.order_by(User.created_at, User.id)
 
-        # Add pagination
         query = query.offset(skip).limit(limit)
+        result = await session.execute(query) if orm else await (await session.connection()).execute(query)
+        rows = result.all()
+        if rows:
+            return rows, rows[0].total
+        if skip == 0:
+            return [], 0
 
-        # Execute the query and count total users
-        result = await session.execute(query)
-        users = result.scalars().all()
+        # Paged past the end: no row carried the window total, so count separately
+        total_result = await session.execute(select(func.count()).select_from(User).where(*conditions))
+        return [], total_result.scalar()
 
-        total_query = select(func.count()).select_from(User)
-        total_result = await session.execute(total_query)
-        total_users = total_result.scalar()
+    @staticmethod
+    async def stream_users(
+        session: AsyncSession,
+        filters: Dict[str, Optional[str]],
+        columns: List[str],
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Stream users matching `filters` in batches of plain row mappings.
+
+        Only the requested columns are selected, through a server-side cursor
+        (`yield_per`), and no ORM objects are built, so memory use is bounded by
+        `batch_size` no matter how many users match.
 
-        return users, total_users
+        :param columns: `User` attribute names to select.
+        """
+        conditions, _ = UserService._search_conditions(session, filters)
+        query = (
+            select(*((User._last_login_at if name == "last_login_at" else getattr(User, name)).label(name) for name in columns))
+            .where(*conditions)
+            .order_by(User.created_at, User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream(query)
+        try:
+            async for partition in result.mappings().partitions():
+                yield partition
+        finally:
+            await result.close()
 
 def generate_unique_nickname(session) -> str:
     while True:
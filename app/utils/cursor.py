@@ -0,0 +1,34 @@
+from builtins import KeyError, TypeError, ValueError, len, str
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+def encode_cursor(created_at: datetime, user_id: UUID, direction: str = CURSOR_NEXT) -> str:
+    """
+    Encodes a keyset position `(created_at, id)` and the paging direction into an
+    opaque, URL-safe cursor string.
+    """
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(user_id), "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID, str]:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed or was tampered with.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction = payload["d"]
+        if direction not in (CURSOR_NEXT, CURSOR_PREV):
+            raise ValueError("Invalid cursor direction")
+        return datetime.fromisoformat(payload["c"]), UUID(payload["i"]), direction
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
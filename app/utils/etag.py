@@ -0,0 +1,60 @@
+from builtins import int, str
+import hashlib
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from uuid import UUID
+
+def _version(value: Optional[datetime]) -> str:
+    """A timestamp as UTC ISO text; drivers that drop the offset (SQLite) return UTC."""
+    if value is None:
+        return ""
+    value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return value.isoformat()
+
+def _etag(*parts: str) -> str:
+    return '"' + hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+def user_etag(user_id: UUID, updated_at: Optional[datetime], variant: str = "") -> str:
+    """
+    Strong ETag of one user's representation: its id and `updated_at`, which every
+    change to the account advances, plus `variant` (the base URL the links are
+    built on and the query string selecting fields and links) so different
+    representations never share a tag.
+    """
+    return _etag("user", str(user_id), _version(updated_at), variant)
+
+def list_etag(last_modified: Optional[datetime], deletions: int, variant: str = "") -> str:
+    """
+    Strong ETag of a user listing, from the table version token (latest
+    `updated_at` and the deletion counter) and `variant`, which includes the
+    query string that selects the page.
+    """
+    return _etag("users", _version(last_modified), str(deletions), variant)
+
+def page_etag(rows: Iterable, *state, variant: str = "") -> str:
+    """
+    Strong ETag of a page that was read without a table version token: the id and
+    `updated_at` of every row on it, plus `state` (totals, whether neighbouring
+    pages exist) and `variant`.
+    """
+    versions = [f"{row.id}@{_version(row.updated_at)}" for row in rows]
+    return _etag("page", variant, *(str(value) for value in state), *versions)
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """
+    Whether an `If-None-Match` (weak comparison) or `If-Match` (strong comparison,
+    `weak=False`) header value lists `etag` or is `*`.
+    """
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
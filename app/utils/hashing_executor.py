@@ -0,0 +1,87 @@
+from builtins import int, max
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from logging import getLogger
+from typing import Any, Callable, Optional
+from settings.config import settings
+
+logger = getLogger(__name__)
+
+class HashingExecutor:
+    """
+    Runs CPU-bound password hashing off the event loop.
+
+    Jobs are dispatched to a bounded process (or thread) pool. The number of jobs
+    in flight is capped by a semaphore, so once the pool queue is full new callers
+    wait for a free slot instead of piling unbounded work onto the executor.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None, use_processes: bool = True):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hashing")
+            logger.info("Started hashing executor with %d workers", self.max_workers)
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # A semaphore is bound to the loop it is first used on, so recreate it
+        # when the executor is reused from a different event loop (e.g. in tests).
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        return self._semaphore
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs currently submitted to the pool."""
+        return self._in_flight
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `func(*args, **kwargs)` in the pool, waiting for a slot if the queue is full."""
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            self._in_flight += 1
+            try:
+                return await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+            finally:
+                self._in_flight -= 1
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        self._semaphore = None
+        self._loop = None
+
+_hashing_executor: Optional[HashingExecutor] = None
+
+def get_hashing_executor() -> HashingExecutor:
+    """Return the process-wide hashing executor, creating it from settings on first use."""
+    global _hashing_executor
+    if _hashing_executor is None:
+        _hashing_executor = HashingExecutor(
+            max_workers=max(settings.password_hash_workers, 0) or None,
+            max_pending=max(settings.password_hash_max_pending, 0) or None,
+            use_processes=settings.password_hash_use_processes,
+        )
+    return _hashing_executor
+
+def shutdown_hashing_executor(wait: bool = True):
+    global _hashing_executor
+    if _hashing_executor is not None:
+        _hashing_executor.shutdown(wait=wait)
+        _hashing_executor = None
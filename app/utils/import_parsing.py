@@ -0,0 +1,77 @@
+from builtins import Exception, UnicodeDecodeError, ValueError, bytes, dict, int, isinstance, len, next, str, zip
+import csv
+import json
+from typing import AsyncIterator, Tuple, Union
+
+CSV_CONTENT_TYPES = ("text/csv",)
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Re-split a byte stream into lines without buffering more than one chunk."""
+    remainder = b""
+    async for chunk in chunks:
+        remainder += chunk
+        *lines, remainder = remainder.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if remainder:
+        yield remainder.rstrip(b"\r")
+
+def import_media_type(content_type: str) -> str:
+    """
+    Normalise a Content-Type header to a supported import media type.
+
+    Raises:
+        ValueError: If the content type is neither CSV nor NDJSON.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type not in CSV_CONTENT_TYPES + NDJSON_CONTENT_TYPES:
+        raise ValueError(f"Unsupported import content type: {content_type}")
+    return media_type
+
+async def iter_import_rows(chunks: AsyncIterator[bytes], media_type: str) -> AsyncIterator[Tuple[int, Union[dict, Exception]]]:
+    """
+    Parse a streamed CSV (with header row) or NDJSON body into user dictionaries.
+
+    Yields `(row_number, row)` pairs, where `row` is the parsed dictionary or the
+    exception describing why that line could not be parsed, including lines that
+    are not valid UTF-8. Blank lines are skipped. CSV rows are read line by line, so
+    quoted fields must not contain newlines.
+
+    Raises:
+        ValueError: If the CSV header row is not valid UTF-8.
+    """
+    header = None
+    row_number = 0
+    async for raw_line in _iter_lines(chunks):
+        try:
+            line = raw_line.decode("utf-8")
+        except UnicodeDecodeError as e:
+            if media_type in CSV_CONTENT_TYPES and header is None:
+                raise ValueError("CSV header is not valid UTF-8") from e
+            row_number += 1
+            yield row_number, ValueError(f"Line is not valid UTF-8: {e.reason} at byte {e.start}")
+            continue
+        if not line.strip():
+            continue
+        if media_type in CSV_CONTENT_TYPES:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            row_number += 1
+            if len(values) != len(header):
+                yield row_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+                continue
+            yield row_number, {key: value for key, value in zip(header, values) if value != ""}
+        else:
+            row_number += 1
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield row_number, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                yield row_number, ValueError("Each line must be a JSON object")
+                continue
+            yield row_number, row
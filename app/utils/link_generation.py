@@ -1,9 +1,10 @@
-from builtins import dict, int, max, str
-from typing import List, Callable
-from urllib.parse import urlencode
+from builtins import dict, getattr, int, max, str, tuple
+from typing import Dict, List, Callable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
 from uuid import UUID
 
 from fastapi import Request
+from starlette.applications import Starlette
 from app.schemas.link_schema import Link
 from app.schemas.pagination_schema import PaginationLink
 
@@ -11,38 +12,120 @@ from app.schemas.pagination_schema import PaginationLink
 def create_link(rel: str, href: str, method: str = "GET", action: str = None) -> Link:
     return Link(rel=rel, href=href, method=method, action=action)
 
-def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
+def _pagination_href(base_url: str, params: dict) -> str:
     # Ensure parameters are added in a specific order
     query_string = f"skip={params['skip']}&limit={params['limit']}"
-    return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
+    extra = {key: value for key, value in params.items() if key not in ('skip', 'limit')}
+    if extra:
+        query_string = f"{query_string}&{urlencode(extra, doseq=True)}"
+    return f"{base_url}?{query_string}"
+
+def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
+    return PaginationLink(rel=rel, href=_pagination_href(base_url, params))
+
+def _split_request_url(request: Request) -> tuple:
+    """Split the request URL into its base and the query parameters other than skip/limit."""
+    base_url, _, query = str(request.url).partition("?")
+    params = [(key, value) for key, value in parse_qsl(query, keep_blank_values=True) if key not in ('skip', 'limit')]
+    return base_url, params
+
+USER_ACTIONS = [
+    ("self", "get_user", "GET", "view"),
+    ("update", "update_user", "PUT", "update"),
+    ("delete", "delete_user", "DELETE", "delete")
+]
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
     """
     Generate navigation links for user actions.
     """
-    actions = [
-        ("self", "get_user", "GET", "view"),
-        ("update", "update_user", "PUT", "update"),
-        ("delete", "delete_user", "DELETE", "delete")
-    ]
     return [
         create_link(rel, str(request.url_for(action, user_id=str(user_id))), method, action_desc)
-        for rel, action, method, action_desc in actions
+        for rel, action, method, action_desc in USER_ACTIONS
     ]
 
-def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
-    base_url = str(request.url)
+# Placeholder passed to url_path_for; it survives the str path convertor unchanged
+_USER_ID_MARKER = "userid0marker"
+
+def user_link_paths(app: Starlette) -> Tuple[Tuple[str, str, str, str], ...]:
+    """
+    Resolve the path of every user action route once per app, as
+    `(rel, path_template, method, action)` with `{user_id}` left to fill in.
+    """
+    paths = getattr(app.state, "user_link_paths", None)
+    if paths is None:
+        paths = tuple(
+            (rel, app.url_path_for(name, user_id=_USER_ID_MARKER).replace(_USER_ID_MARKER, "{user_id}"), method, action)
+            for rel, name, method, action in USER_ACTIONS
+        )
+        app.state.user_link_paths = paths
+    return paths
+
+class UserLinkTemplates:
+    """
+    Per-user HATEOAS links for one request: the request's base URL joined with the
+    pre-resolved route paths, so each user only costs a string format per link.
+    Produces plain dicts in the shape of `Link` without re-validating the URLs.
+    """
+
+    def __init__(self, request: Request):
+        base_url = str(request.base_url).rstrip("/")
+        self.templates = [
+            (rel, base_url + path, method, action)
+            for rel, path, method, action in user_link_paths(request.app)
+        ]
+
+    def links(self, user_id: UUID) -> List[Dict[str, str]]:
+        user_id = str(user_id)
+        return [
+            {"rel": rel, "href": href.format(user_id=user_id), "action": action, "type": "application/json", "method": method}
+            for rel, href, method, action in self.templates
+        ]
+
+def pagination_hrefs(request: Request, skip: int, limit: int, total_items: int) -> List[Tuple[str, str]]:
+    """`(rel, href)` pairs for offset pagination, keeping any filter parameters on every link."""
+    base_url, filters = _split_request_url(request)
     total_pages = (total_items + limit - 1) // limit
-    links = [
-        create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}),
-        create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}),
-        create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit})
+
+    def page(rel: str, skip_value: int) -> Tuple[str, str]:
+        params = dict(filters)
+        params.update({'skip': skip_value, 'limit': limit})
+        return rel, _pagination_href(base_url, params)
+
+    hrefs = [
+        page("self", skip),
+        page("first", 0),
+        page("last", max(0, (total_pages - 1) * limit)),
     ]
 
     if skip + limit < total_items:
-        links.append(create_pagination_link("next", base_url, {'skip': skip + limit, 'limit': limit}))
+        hrefs.append(page("next", skip + limit))
 
     if skip > 0:
-        links.append(create_pagination_link("prev", base_url, {'skip': max(skip - limit, 0), 'limit': limit}))
+        hrefs.append(page("prev", max(skip - limit, 0)))
+
+    return hrefs
+
+def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
+    return [PaginationLink(rel=rel, href=href) for rel, href in pagination_hrefs(request, skip, limit, total_items)]
+
+def cursor_pagination_hrefs(request: Request, limit: int, next_cursor: Optional[str], prev_cursor: Optional[str]) -> List[Tuple[str, str]]:
+    """
+    `(rel, href)` pairs for keyset (cursor) pagination: self/first/next/prev.
+
+    Cursors are opaque strings from `app.utils.cursor.encode_cursor`; a missing
+    cursor means there is no page in that direction. Other query parameters
+    (such as `fields`) are kept on every link.
+    """
+    base_url, params = _split_request_url(request)
+    extra = [(key, value) for key, value in params if key != 'cursor']
+
+    def page(rel: str, cursor: str) -> Tuple[str, str]:
+        return rel, f"{base_url}?{urlencode([('cursor', cursor), ('limit', limit)] + extra)}"
 
-    return links
+    hrefs = [("self", str(request.url)), page("first", "")]
+    if next_cursor:
+        hrefs.append(page("next", next_cursor))
+    if prev_cursor:
+        hrefs.append(page("prev", prev_cursor))
+    return hrefs
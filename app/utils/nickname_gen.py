@@ -1,10 +1,29 @@
-from builtins import str
+from builtins import len, str
 import random
 
+ADJECTIVES = [
+    "clever", "jolly", "brave", "sly", "gentle", "agile", "bold", "bright", "calm", "cheerful",
+    "curious", "daring", "eager", "fancy", "fearless", "fierce", "friendly", "giddy", "graceful", "happy",
+    "honest", "humble", "keen", "kind", "lively", "loyal", "lucky", "merry", "mighty", "nimble",
+    "noble", "patient", "plucky", "polite", "proud", "quick", "quiet", "rapid", "shy", "silly",
+    "smart", "snappy", "speedy", "steady", "sunny", "swift", "witty", "zesty",
+]
+
+ANIMALS = [
+    "panda", "fox", "raccoon", "koala", "lion", "badger", "beaver", "bison", "camel", "cheetah",
+    "cobra", "crane", "dolphin", "eagle", "falcon", "ferret", "gecko", "giraffe", "gorilla", "hawk",
+    "hedgehog", "heron", "ibis", "jaguar", "kangaroo", "lemur", "leopard", "llama", "lynx", "marmot",
+    "meerkat", "moose", "narwhal", "ocelot", "otter", "owl", "parrot", "penguin", "puffin", "quokka",
+    "rabbit", "seal", "sloth", "squirrel", "tiger", "walrus", "wombat", "zebra",
+]
+
+NICKNAME_NUMBER_RANGE = 100000
+
+# Number of distinct nicknames generate_nickname() can produce
+NICKNAME_SPACE = len(ADJECTIVES) * len(ANIMALS) * NICKNAME_NUMBER_RANGE
+
 
 def generate_nickname() -> str:
     """Generate a URL-safe nickname using adjectives and animal names."""
-    adjectives = ["clever", "jolly", "brave", "sly", "gentle"]
-    animals = ["panda", "fox", "raccoon", "koala", "lion"]
-    number = random.randint(0, 999)
-    return f"{random.choice(adjectives)}_{random.choice(animals)}_{number}"
+    number = random.randrange(NICKNAME_NUMBER_RANGE)
+    return f"{random.choice(ADJECTIVES)}_{random.choice(ANIMALS)}_{number}"
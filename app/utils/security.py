@@ -1,18 +1,88 @@
-from builtins import Exception, ValueError, bool, int, str
+from builtins import Exception, ValueError, bool, int, len, max, min, range, str
+import asyncio
+import math
 import secrets
+import time
 import bcrypt
 from logging import getLogger
+from typing import List, Optional
+from app.utils.hashing_executor import get_hashing_executor
+from settings.config import settings
 
 # Set up logging
 logger = getLogger(__name__)
 
-def hash_password(password: str, rounds: int = 12) -> str:
+MIN_BCRYPT_ROUNDS = 4
+MAX_BCRYPT_ROUNDS = 31
+
+# Cost factor applied to new hashes; replaced by calibrate_password_hash_rounds()
+_password_hash_rounds: int = settings.password_hash_rounds
+
+def get_password_hash_rounds() -> int:
+    """Returns the bcrypt cost factor currently used for new hashes."""
+    return _password_hash_rounds
+
+def set_password_hash_rounds(rounds: int) -> int:
+    """Sets the bcrypt cost factor used for new hashes, clamped to the range bcrypt supports."""
+    global _password_hash_rounds
+    _password_hash_rounds = max(MIN_BCRYPT_ROUNDS, min(MAX_BCRYPT_ROUNDS, rounds))
+    return _password_hash_rounds
+
+def measure_hash_time(rounds: int, samples: int = 1) -> float:
+    """
+    Measures the average wall-clock time in seconds of a single bcrypt hash at the given cost.
+    """
+    salt = bcrypt.gensalt(rounds=rounds)
+    start = time.perf_counter()
+    for _ in range(samples):
+        bcrypt.hashpw(b"calibration-password", salt)
+    return (time.perf_counter() - start) / samples
+
+def calibrate_password_hash_rounds(target_ms: int, min_rounds: Optional[int] = None) -> int:
+    """
+    Picks the highest bcrypt cost whose hash time stays within `target_ms` on this host.
+
+    The hash time is measured once at `min_rounds` and extrapolated, since every
+    extra round doubles the work. The selected cost becomes the active policy.
+
+    Args:
+        target_ms (int): Desired milliseconds per hash.
+        min_rounds (int): Floor for the selected cost; defaults to settings.password_hash_min_rounds.
+
+    Returns:
+        int: The cost factor now in effect.
+    """
+    floor = max(MIN_BCRYPT_ROUNDS, min_rounds if min_rounds is not None else settings.password_hash_min_rounds)
+    elapsed_ms = measure_hash_time(floor) * 1000
+    extra_rounds = int(math.floor(math.log2(target_ms / elapsed_ms))) if target_ms > elapsed_ms else 0
+    rounds = set_password_hash_rounds(floor + extra_rounds)
+    logger.info("Calibrated bcrypt cost to %d (%.1f ms at cost %d, target %d ms)", rounds, elapsed_ms, floor, target_ms)
+    return rounds
+
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Extracts the cost factor from a bcrypt hash such as `$2b$12$...`, or None if it is not one."""
+    parts = hashed_password.split('$') if hashed_password else []
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Returns True if the hash is not bcrypt or was produced with a lower cost than
+    the current policy. Stronger hashes are kept, so a lower calibrated cost after
+    a restart does not rehash every login downwards.
+    """
+    rounds = get_hash_rounds(hashed_password)
+    return rounds is None or rounds < get_password_hash_rounds()
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """
     Hashes a password using bcrypt with a specified cost factor.
     
     Args:
         password (str): The plain text password to hash.
         rounds (int): The cost factor that determines the computational cost of hashing.
+            Defaults to the configured hashing policy.
 
     Returns:
         str: The hashed password.
@@ -21,7 +91,7 @@ def hash_password(password: str, rounds: int = 12) -> str:
         ValueError: If hashing the password fails.
     """
     try:
-        salt = bcrypt.gensalt(rounds=rounds)
+        salt = bcrypt.gensalt(rounds=rounds if rounds is not None else get_password_hash_rounds())
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed_password.decode('utf-8')
     except Exception as e:
@@ -48,6 +118,45 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         logger.error("Error verifying password: %s", e)
         raise ValueError("Authentication process encountered an unexpected error") from e
 
+async def hash_password_async(password: str, rounds: Optional[int] = None) -> str:
+    """
+    Awaitable variant of `hash_password` that runs bcrypt in the hashing executor,
+    keeping the event loop free while the hash is computed.
+
+    Raises:
+        ValueError: If hashing the password fails.
+    """
+    # Resolve the policy here: pool workers do not see a cost calibrated after they started.
+    rounds = rounds if rounds is not None else get_password_hash_rounds()
+    return await get_hashing_executor().run(hash_password, password, rounds)
+
+def hash_passwords(passwords: List[str], rounds: Optional[int] = None) -> List[str]:
+    """Hashes several passwords in one call, so a worker process pays one round of IPC for the lot."""
+    return [hash_password(password, rounds) for password in passwords]
+
+async def hash_passwords_async(passwords: List[str], rounds: Optional[int] = None) -> List[str]:
+    """
+    Hashes many passwords in parallel by splitting them into one chunk per hashing worker.
+
+    Raises:
+        ValueError: If hashing any of the passwords fails.
+    """
+    rounds = rounds if rounds is not None else get_password_hash_rounds()
+    executor = get_hashing_executor()
+    chunk_size = max(1, -(-len(passwords) // executor.max_workers))
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    results = await asyncio.gather(*(executor.run(hash_passwords, chunk, rounds) for chunk in chunks))
+    return [hashed for chunk in results for hashed in chunk]
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Awaitable variant of `verify_password` that runs bcrypt in the hashing executor.
+
+    Raises:
+        ValueError: If the hashed password format is incorrect or the function fails to verify.
+    """
+    return await get_hashing_executor().run(verify_password, plain_password, hashed_password)
+
 def validate_password(password: str) -> bool:
     """
     Validates a password based on certain rules (e.g., length, complexity).
@@ -1,5 +1,5 @@
 # smtp_client.py
-from builtins import Exception, int, str
+from builtins import Exception, bool, int, str
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -7,11 +7,12 @@ from settings.config import settings
 import logging
 
 class SMTPClient:
-    def __init__(self, server: str, port: int, username: str, password: str):
+    def __init__(self, server: str, port: int, username: str, password: str, use_tls: bool = True):
         self.server = server
         self.port = port
         self.username = username
         self.password = password
+        self.use_tls = use_tls
 
     def send_email(self, subject: str, html_content: str, recipient: str):
         try:
@@ -22,7 +23,8 @@ class SMTPClient:
             message.attach(MIMEText(html_content, 'html'))
 
             with smtplib.SMTP(self.server, self.port) as server:
-                server.starttls()  # Use TLS
+                if self.use_tls:
+                    server.starttls()  # Use TLS
                 server.login(self.username, self.password)
                 server.sendmail(self.username, recipient, message.as_string())
             logging.info(f"Email sent to {recipient}")
@@ -0,0 +1,360 @@
+from builtins import Exception, OSError, UnicodeEncodeError, bool, bytes, enumerate, int, isinstance, len, min, range, str
+import asyncio
+import logging
+import re
+import socket
+import time
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import List, Optional, Sequence, Tuple
+import aiosmtplib
+from aiosmtplib.email import extract_recipients, flatten_message, quote_address
+from aiosmtplib.protocol import SMTPProtocol
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+class SMTPResponseError(Exception):
+    """The server answered a command with an unexpected reply code."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.message = message
+
+    @property
+    def transient(self) -> bool:
+        return 400 <= self.code < 500
+
+def _rejection(error: Exception) -> Optional[SMTPResponseError]:
+    """The server's reply for a message it refused, or None if the session itself failed."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        refused = error.recipients[0]
+        return SMTPResponseError(refused.code, refused.message)
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return SMTPResponseError(error.code, error.message)
+    return None
+
+def _data_bytes(flat_message: bytes) -> bytes:
+    """The DATA payload: CRLF line endings, dot-stuffed, terminated by <CRLF>.<CRLF>."""
+    data = re.sub(rb"\r\n|\r|\n", b"\r\n", flat_message)
+    if not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    return re.sub(rb"(?m)^\.", b"..", data) + b".\r\n"
+
+class _PipeliningProtocol(SMTPProtocol):
+    """
+    aiosmtplib's protocol expects one reply per write: bytes arriving while no
+    command is waiting are dropped, and only one reply is parsed per read from the
+    socket. That loses the replies to pipelined commands, which arrive together;
+    this keeps every byte and hands out replies already buffered first.
+    """
+
+    def data_received(self, data: bytes) -> None:
+        if self._response_waiter is None:
+            return
+        self._buffer.extend(data)
+        self._deliver()
+
+    def _deliver(self):
+        if not self._response_pending or self._response_waiter.done():
+            return
+        try:
+            response = self._read_response_from_buffer()
+        except Exception as e:
+            self._set_response_exception(self._response_waiter, e)
+            return
+        if response is not None:
+            self._response_waiter.set_result(response)
+
+    async def read_response(self, timeout: Optional[float] = None):
+        if self._response_waiter is not None:
+            self._response_pending = True
+            self._deliver()
+        return await super().read_response(timeout)
+
+class _PipeliningSMTP(aiosmtplib.SMTP):
+    """`aiosmtplib.SMTP` whose connections can read back pipelined replies."""
+
+    async def _create_connection(self, timeout: Optional[float]):
+        response = await super()._create_connection(timeout)
+        # The subclass adds no state, so the connected protocol can switch to it in place
+        self.protocol.__class__ = _PipeliningProtocol
+        return response
+
+def build_message(subject: str, html_content: str, sender: str, recipient: str) -> Message:
+    message = MIMEMultipart('alternative')
+    message['Subject'] = subject
+    message['From'] = sender
+    message['To'] = recipient
+    message.attach(MIMEText(html_content, 'html'))
+    return message
+
+class SMTPConnection:
+    """
+    One authenticated ESMTP session, spoken by `aiosmtplib`.
+
+    `timeout` bounds every command, reply and write, and EHLO announces
+    `local_hostname`, which defaults to this host's FQDN. When the server offers
+    PIPELINING, batches are sent with the envelope of each message written
+    together with the body of the one before it.
+    """
+
+    def __init__(
+        self, host: str, port: int, username: str, password: str, use_tls: bool, timeout: float,
+        local_hostname: Optional[str] = None,
+    ):
+        self.timeout = timeout
+        self.client = _PipeliningSMTP(
+            hostname=host, port=port, username=username or None, password=password or None,
+            start_tls=use_tls, timeout=timeout, local_hostname=local_hostname,
+        )
+        self.last_used = time.monotonic()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def connect(self):
+        # Logs in as part of connecting when credentials are set
+        self.loop = asyncio.get_running_loop()
+        await self.client.connect()
+        self.last_used = time.monotonic()
+
+    async def noop(self) -> bool:
+        """Health check: True if the session still answers."""
+        try:
+            await self.client.noop()
+            return True
+        except Exception:
+            return False
+
+    @property
+    def pipelining(self) -> bool:
+        return self.client.supports_extension("pipelining")
+
+    def _envelope(self, sender: str, message: Message) -> Tuple[bytes, int]:
+        """MAIL, RCPT and DATA for one message as a single write, and the number of replies it expects."""
+        mail = f"MAIL FROM:{quote_address(sender)}"
+        if self.client.supports_extension("8bitmime"):
+            mail += " BODY=8BITMIME"
+        commands = [mail] + [f"RCPT TO:{quote_address(recipient)}" for recipient in extract_recipients(message)] + ["DATA"]
+        return "".join(f"{command}\r\n" for command in commands).encode("ascii"), len(commands)
+
+    async def _read_envelope(self, replies: int) -> Optional[SMTPResponseError]:
+        """Reads the MAIL/RCPT/DATA replies; returns the error if DATA was not accepted."""
+        error = None
+        for index in range(replies):
+            reply = await self.client.protocol.read_response(timeout=self.timeout)
+            if index == replies - 1 and reply.code == 354:
+                return None
+            if reply.code not in (250, 251, 354) and error is None:
+                error = SMTPResponseError(reply.code, reply.message)
+        return error or SMTPResponseError(503, "DATA not accepted")
+
+    async def _send_pipelined(self, sender: str, messages: Sequence[Message], results: List[Optional[Exception]]):
+        cte_type = "8bit" if self.client.supports_extension("8bitmime") else "7bit"
+        envelopes = [self._envelope(sender, message) for message in messages]
+        protocol = self.client.protocol
+        protocol.write(envelopes[0][0])
+        for index, message in enumerate(messages):
+            following = envelopes[index + 1][0] if index + 1 < len(messages) else b""
+            error = await self._read_envelope(envelopes[index][1])
+            if error is None:
+                protocol.write(_data_bytes(flatten_message(message, cte_type=cte_type)) + following)
+                reply = await protocol.read_response(timeout=self.timeout)
+                results.append(None if reply.code == 250 else SMTPResponseError(reply.code, reply.message))
+            else:
+                # Clear the half-open transaction before the next message
+                protocol.write(b"RSET\r\n" + following)
+                await protocol.read_response(timeout=self.timeout)
+                results.append(error)
+
+    async def _send_each(self, sender: str, messages: Sequence[Message], results: List[Optional[Exception]]):
+        for message in messages:
+            try:
+                await self.client.send_message(message, sender=sender)
+                results.append(None)
+            except aiosmtplib.SMTPException as e:
+                rejection = _rejection(e)
+                if rejection is None:
+                    raise
+                results.append(rejection)
+
+    @staticmethod
+    def _ascii_addresses(sender: str, messages: Sequence[Message]) -> bool:
+        try:
+            sender.encode("ascii")
+            for message in messages:
+                "".join(extract_recipients(message)).encode("ascii")
+        except UnicodeEncodeError:
+            return False
+        return True
+
+    async def send_batch(self, sender: str, messages: Sequence[Message]) -> List[Optional[Exception]]:
+        """
+        Sends `messages` over this session and returns one result per message:
+        None if the server accepted it, otherwise the error. A refused message is
+        reset and the rest still go out; a broken session fails everything left.
+
+        With PIPELINING (and ASCII addresses) each message costs about one
+        round-trip; otherwise every command waits for its reply.
+        """
+        results: List[Optional[Exception]] = []
+        try:
+            if self.pipelining and self._ascii_addresses(sender, messages):
+                await self._send_pipelined(sender, messages, results)
+            else:
+                await self._send_each(sender, messages, results)
+        except Exception as e:
+            # The session is unusable; everything not yet answered failed with it
+            self.close()
+            results.extend([e] * (len(messages) - len(results)))
+        self.last_used = time.monotonic()
+        return results
+
+    @property
+    def is_open(self) -> bool:
+        return self.client.is_connected
+
+    def close(self):
+        """Drops the session without QUIT."""
+        transport = self.client.transport
+        if transport is None:
+            return
+        if self.loop is not None and self.loop.is_closed():
+            # The transport can no longer schedule its own shutdown on its closed loop;
+            # end the TCP session now, the socket is released with the transport
+            sock = transport.get_extra_info("socket")
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            return
+        self.client.close()
+
+    async def quit(self):
+        if self.is_open:
+            try:
+                await self.client.quit()
+            except Exception:
+                pass
+        self.close()
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `max_size` authenticated SMTP sessions for reuse.
+
+    Idle sessions older than `idle_timeout` are closed instead of reused, and a
+    session idle longer than `health_check_after` is probed with NOOP first.
+    """
+
+    def __init__(
+        self, host: str, port: int, username: str, password: str, use_tls: bool = True,
+        max_size: int = 4, idle_timeout: float = 30.0, health_check_after: float = 5.0, timeout: float = 30.0,
+        local_hostname: Optional[str] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self.local_hostname = local_hostname
+        self._idle: List[SMTPConnection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connections_opened = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Sessions and semaphores belong to one event loop; start over on a new one
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_size)
+            self._loop = loop
+            stale, self._idle = self._idle, []
+            for connection in stale:
+                connection.close()
+        return self._semaphore
+
+    async def _checkout(self) -> SMTPConnection:
+        while self._idle:
+            connection = self._idle.pop()
+            idle_for = time.monotonic() - connection.last_used
+            if not connection.is_open:
+                continue
+            if idle_for > self.idle_timeout:
+                await connection.quit()
+                continue
+            if idle_for > self.health_check_after and not await connection.noop():
+                connection.close()
+                continue
+            return connection
+        connection = SMTPConnection(
+            self.host, self.port, self.username, self.password, self.use_tls, self.timeout, self.local_hostname,
+        )
+        await connection.connect()
+        self.connections_opened += 1
+        return connection
+
+    async def send_batch(self, sender: str, messages: Sequence[Message]) -> List[Optional[Exception]]:
+        async with self._get_semaphore():
+            try:
+                connection = await self._checkout()
+            except Exception as e:
+                return [e] * len(messages)
+            results = await connection.send_batch(sender, messages)
+            if connection.is_open:
+                self._idle.append(connection)
+            return results
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            if connection.loop is asyncio.get_running_loop():
+                await connection.quit()
+            else:
+                connection.close()
+
+class AsyncSMTPTransport:
+    """
+    Non-blocking email delivery over a pool of reused SMTP sessions.
+
+    `send_many` splits messages evenly over up to `pool.max_size` sessions and
+    pipelines each share through its session, returning a per-message result.
+    """
+
+    def __init__(self, pool: SMTPConnectionPool, sender: str):
+        self.pool = pool
+        self.sender = sender
+
+    async def send(self, message: Message):
+        result = (await self.send_many([message]))[0]
+        if result is not None:
+            raise result
+
+    async def send_many(self, messages: Sequence[Message]) -> List[Optional[Exception]]:
+        if not messages:
+            return []
+        shares = min(self.pool.max_size, len(messages))
+        chunk = -(-len(messages) // shares)
+        batches = [messages[start:start + chunk] for start in range(0, len(messages), chunk)]
+        batch_results = await asyncio.gather(*(self.pool.send_batch(self.sender, batch) for batch in batches))
+        return [result for results in batch_results for result in results]
+
+    async def close(self):
+        await self.pool.close()
+
+def create_smtp_transport() -> AsyncSMTPTransport:
+    """Build a transport for the relay configured in settings."""
+    pool = SMTPConnectionPool(
+        settings.smtp_server, settings.smtp_port, settings.smtp_username, settings.smtp_password,
+        use_tls=settings.smtp_use_tls,
+        max_size=settings.smtp_pool_size,
+        idle_timeout=settings.smtp_idle_timeout_seconds,
+        health_check_after=settings.smtp_health_check_seconds,
+        timeout=settings.smtp_timeout_seconds,
+    )
+    return AsyncSMTPTransport(pool, sender=settings.smtp_username)
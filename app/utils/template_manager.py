@@ -1,11 +1,35 @@
+from builtins import int, isinstance, len, range, str, tuple
+import os
+import threading
+from dataclasses import dataclass
+from html import escape
+from string import Formatter
+from typing import Dict, Tuple
 import markdown2
 from pathlib import Path
+from settings.config import settings
+
+# Stand-in for a context field while the skeleton goes through markdown; plain
+# letters and digits so markdown leaves it alone in text and in link targets alike
+_FIELD_MARKER = "tmplfield{}x"
+
+@dataclass
+class _CompiledTemplate:
+    # Styled HTML with literal braces doubled and the original `{field}` placeholders kept
+    html: str
+    mtimes: Tuple[int, ...]
+
+# Compiled templates are shared by every TemplateManager, keyed by (templates dir, name)
+_compiled: Dict[Tuple[Path, str], _CompiledTemplate] = {}
+_compile_lock = threading.Lock()
 
 class TemplateManager:
-    def __init__(self):
+    def __init__(self, auto_reload: bool = None):
         # Dynamically determine the root path of the project
         self.root_dir = Path(__file__).resolve().parent.parent.parent  # Adjust this depending on the structure
         self.templates_dir = self.root_dir / 'email_templates'
+        # Re-check file mtimes on every render instead of trusting the cache until clear_cache()
+        self.auto_reload = settings.email_templates_auto_reload if auto_reload is None else auto_reload
 
     def _read_template(self, filename: str) -> str:
         """Private method to read template content."""
@@ -32,15 +56,63 @@ class TemplateManager:
                 styled_html = styled_html.replace(f'<{tag}>', f'<{tag} style="{style}">')
         return styled_html
 
-    def render_template(self, template_name: str, **context) -> str:
-        """Render a markdown template with given context, applying advanced email styles."""
-        header = self._read_template('header.md')
-        footer = self._read_template('footer.md')
+    def _sources(self, template_name: str) -> Tuple[str, ...]:
+        return ('header.md', f'{template_name}.md', 'footer.md')
+
+    def _mtimes(self, template_name: str) -> Tuple[int, ...]:
+        return tuple(os.stat(self.templates_dir / filename).st_mtime_ns for filename in self._sources(template_name))
+
+    def _compile(self, template_name: str) -> _CompiledTemplate:
+        """
+        Render header, template skeleton and footer through markdown and the inline
+        styles once, with each `{field}` swapped for a marker that is turned back
+        into a format placeholder afterwards.
+        """
+        mtimes = self._mtimes(template_name)
+        header, main_template, footer = (self._read_template(filename) for filename in self._sources(template_name))
 
-        # Read main template and format it with provided context
-        main_template = self._read_template(f'{template_name}.md')
-        main_content = main_template.format(**context)
+        skeleton, fields = [], []
+        for literal, field_name, format_spec, conversion in Formatter().parse(main_template):
+            skeleton.append(literal)
+            if field_name is not None:
+                skeleton.append(_FIELD_MARKER.format(len(fields)))
+                conversion = f"!{conversion}" if conversion else ""
+                format_spec = f":{format_spec}" if format_spec else ""
+                fields.append(f"{{{field_name}{conversion}{format_spec}}}")
+        main_content = "".join(skeleton)
 
         full_markdown = f"{header}\n{main_content}\n{footer}"
-        html_content = markdown2.markdown(full_markdown)
-        return self._apply_email_styles(html_content)
+        styled = self._apply_email_styles(markdown2.markdown(full_markdown))
+        styled = styled.replace("{", "{{").replace("}", "}}")
+        # Highest index first so that marker 1 is not replaced inside marker 10
+        for index in range(len(fields) - 1, -1, -1):
+            styled = styled.replace(_FIELD_MARKER.format(index), fields[index])
+        return _CompiledTemplate(styled, mtimes)
+
+    def _get_compiled(self, template_name: str) -> _CompiledTemplate:
+        key = (self.templates_dir, template_name)
+        compiled = _compiled.get(key)
+        if compiled is not None and (not self.auto_reload or compiled.mtimes == self._mtimes(template_name)):
+            return compiled
+        with _compile_lock:
+            compiled = self._compile(template_name)
+            _compiled[key] = compiled
+        return compiled
+
+    def preload(self):
+        """Compile every template up front so the first emails skip the markdown pass."""
+        for path in self.templates_dir.glob('*.md'):
+            if path.name not in ('header.md', 'footer.md'):
+                self._get_compiled(path.stem)
+
+    @staticmethod
+    def clear_cache():
+        """Drop all compiled templates; they are rebuilt from disk on next use."""
+        _compiled.clear()
+
+    def render_template(self, template_name: str, **context) -> str:
+        """Render a markdown template with given context, applying advanced email styles."""
+        compiled = self._get_compiled(template_name)
+        # Values are inserted into finished HTML, so escape them instead of letting markdown see them
+        escaped = {key: escape(value) if isinstance(value, str) else value for key, value in context.items()}
+        return compiled.html.format_map(escaped)
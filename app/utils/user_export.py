@@ -0,0 +1,49 @@
+from builtins import bytes, isinstance, str
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Dict, List
+from uuid import UUID
+
+EXPORT_COLUMNS = [
+    "id", "nickname", "email", "first_name", "last_name", "bio",
+    "profile_picture_url", "linkedin_profile_url", "github_profile_url",
+    "role", "is_professional", "email_verified", "is_locked",
+    "last_login_at", "created_at", "updated_at",
+]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _plain(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.name
+    return value
+
+async def ndjson_chunks(partitions: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    """Encode each partition of row mappings as one chunk of newline-delimited JSON."""
+    async for rows in partitions:
+        yield "".join(
+            json.dumps({key: _plain(value) for key, value in row.items()}, separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+async def csv_chunks(partitions: AsyncIterator[List[Dict]], columns: List[str]) -> AsyncIterator[bytes]:
+    """Encode each partition of row mappings as one CSV chunk, preceded by a header row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(row[column]) for column in columns] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
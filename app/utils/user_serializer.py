@@ -0,0 +1,68 @@
+from builtins import ValueError, bytes, getattr, int, len, sorted, tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import orjson
+from fastapi import Response
+from sqlalchemy.engine import Row
+from app.models.user_model import User
+from app.utils.link_generation import UserLinkTemplates
+
+# The fields of `UserResponse`, in its output order
+USER_RESPONSE_FIELDS = (
+    "email", "nickname", "first_name", "last_name", "bio",
+    "profile_picture_url", "linkedin_profile_url", "github_profile_url",
+    "role", "id", "is_professional",
+)
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Resolve a `?fields=` value (comma-separated `UserResponse` field names) to a
+    sparse fieldset in response order. `id` is always included; no value means
+    every field.
+
+    :raises ValueError: If a name is not a `UserResponse` field.
+    """
+    if not fields:
+        return USER_RESPONSE_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(USER_RESPONSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(field for field in USER_RESPONSE_FIELDS if field in requested)
+
+def user_payload(
+    user: Union[User, Row], links: Optional[UserLinkTemplates] = None, fields: Tuple[str, ...] = USER_RESPONSE_FIELDS,
+) -> Dict:
+    """
+    The `UserResponse` body for an ORM user or a row with the same columns, read
+    straight from its attributes and limited to `fields`.
+
+    Rows come from the database and were validated on the way in, so they are not
+    validated again; orjson encodes the UUID and the role enum (by value) itself.
+    """
+    payload = {field: getattr(user, field) for field in fields}
+    if payload.get("is_professional", False) is None:
+        payload["is_professional"] = False
+    payload["links"] = links.links(user.id) if links is not None else []
+    return payload
+
+def user_list_payload(
+    users: Iterable[Union[User, Row]], links: Optional[UserLinkTemplates], pagination: List[Tuple[str, str]],
+    total: Optional[int] = None, page: Optional[int] = None, fields: Tuple[str, ...] = USER_RESPONSE_FIELDS,
+) -> Dict:
+    """The `UserListResponse` body; `pagination` holds `(rel, href)` pairs."""
+    items = [user_payload(user, links, fields) for user in users]
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "size": len(items),
+        "links": [{"rel": rel, "href": href, "method": "GET"} for rel, href in pagination],
+    }
+
+class UserJSONResponse(Response):
+    """JSON response for payloads built by this module, encoded once with orjson."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
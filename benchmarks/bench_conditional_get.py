@@ -0,0 +1,80 @@
+"""
+Compares a `GET /users/` poll that builds the page (version token, count, page
+rows, links and orjson serialization, as the route does) against one answered with
+304 Not Modified from the version token and a matching If-None-Match, on an
+in-memory SQLite users table. Cursor pages have no version token: they read the
+page and answer 304 from its rows' ETag.
+
+Usage:
+    python -m benchmarks.bench_conditional_get [users] [limit] [polls]
+"""
+from builtins import float, int, len, min, range
+import asyncio
+import sys
+import time
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.services.user_service import UserService
+from app.utils.cursor import CURSOR_NEXT, encode_cursor
+from app.utils.etag import etag_matches, list_etag, page_etag
+from app.utils.link_generation import UserLinkTemplates, cursor_pagination_hrefs, pagination_hrefs
+from app.utils.user_serializer import UserJSONResponse, user_list_payload
+from benchmarks.bench_list_read_path import _seed
+from benchmarks.bench_list_rendering import _request
+
+async def _poll(session: AsyncSession, request, limit: int, if_none_match) -> int:
+    etag = list_etag(*await UserService.table_version(session), request.url.query)
+    if etag_matches(if_none_match, etag):
+        return 0
+    total = await UserService.count(session)
+    rows = await UserService.list_user_rows(session, 0, limit)
+    body = UserJSONResponse(user_list_payload(
+        rows, UserLinkTemplates(request), pagination_hrefs(request, 0, limit, total), total=total, page=1,
+    )).body
+    return len(body)
+
+async def _poll_cursor(session: AsyncSession, request, limit: int, if_none_match) -> int:
+    rows, has_more = await UserService.list_user_rows_keyset(session, limit)
+    etag = page_etag(rows, has_more, False, variant=request.url.query)
+    if etag_matches(if_none_match, etag):
+        return 0
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id, CURSOR_NEXT) if has_more else None
+    body = UserJSONResponse(user_list_payload(
+        rows, UserLinkTemplates(request), cursor_pagination_hrefs(request, limit, next_cursor, None),
+    )).body
+    return len(body)
+
+async def _measure(poll, session: AsyncSession, request, limit: int, polls: int, if_none_match):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(polls):
+            body_bytes = await poll(session, request, limit, if_none_match)
+        best = min(best, time.perf_counter() - start)
+    return polls / best, body_bytes
+
+async def main(count: int, limit: int, polls: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    request = _request()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await _seed(session, count)
+        etag = list_etag(*await UserService.table_version(session), request.url.query)
+        rows, has_more = await UserService.list_user_rows_keyset(session, limit)
+        cursor_etag = page_etag(rows, has_more, False, variant=request.url.query)
+        print(f"{count} users, {limit} per page, best of 3 x {polls} polls")
+        print(f"{'poll':<18} {'polls/sec':>10} {'body bytes':>11}")
+        variants = (
+            ("full page", _poll, None), ("304 (ETag)", _poll, etag),
+            ("cursor page", _poll_cursor, None), ("cursor 304", _poll_cursor, cursor_etag),
+        )
+        for name, poll, if_none_match in variants:
+            per_sec, body_bytes = await _measure(poll, session, request, limit, polls, if_none_match)
+            print(f"{name:<18} {per_sec:>10.0f} {body_bytes:>11}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [10000, 100, 200][len(args):])))
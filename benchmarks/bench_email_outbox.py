@@ -0,0 +1,64 @@
+"""
+Measures email outbox delivery throughput (emails/sec) for different worker
+counts, delivering to the in-process SMTP sink from a file-backed SQLite outbox.
+
+Usage:
+    python -m benchmarks.bench_email_outbox [emails] [batch_size]
+"""
+from builtins import int, len, range
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.database import Base
+from app.models.email_outbox_model import EmailOutbox, OutboxStatus
+from app.services.email_outbox import EmailOutboxWorker
+from app.services.email_service import EmailService
+from tests.smtp_sink import SMTPSink
+from app.utils.smtp_transport import AsyncSMTPTransport, SMTPConnectionPool
+from app.utils.template_manager import TemplateManager
+
+async def _queue(session: AsyncSession, email_service: EmailService, count: int):
+    await session.execute(delete(EmailOutbox))
+    for i in range(count):
+        email_service.queue_user_email(session, {
+            "email": f"bench_{i}@example.com", "name": f"User {i}", "verification_url": f"http://localhost/verify/{i}"
+        }, "email_verification")
+    await session.commit()
+
+async def _sent(session: AsyncSession) -> int:
+    query = select(func.count()).select_from(EmailOutbox).where(EmailOutbox.status == OutboxStatus.SENT.value)
+    return (await session.execute(query)).scalar()
+
+async def main(count: int, batch_size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'outbox.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with SMTPSink() as sink:
+            pool = SMTPConnectionPool("127.0.0.1", sink.port, "bench@example.com", "secret", use_tls=False)
+            email_service = EmailService(template_manager=TemplateManager(), transport=AsyncSMTPTransport(pool, sender="bench@example.com"))
+            print(f"{'workers':>8} {'seconds':>8} {'emails/sec':>11}")
+            for workers in (1, 2, 4):
+                async with session_factory() as session:
+                    await _queue(session, email_service, count)
+                worker = EmailOutboxWorker(workers, batch_size, poll_interval=0.01, max_attempts=3, backoff_seconds=1, lease_seconds=60, retention_seconds=3600)
+                start = time.perf_counter()
+                worker.start(session_factory, email_service)
+                async with session_factory() as session:
+                    while await _sent(session) < count:
+                        await asyncio.sleep(0.02)
+                elapsed = time.perf_counter() - start
+                await worker.stop()
+                print(f"{workers:>8} {elapsed:>8.2f} {count / elapsed:>11.0f}")
+            await email_service.transport.close()
+            print(f"sink received {len(sink.messages)} messages over {sink.sessions} SMTP sessions")
+        await engine.dispose()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [1000, 50][len(args):])))
@@ -0,0 +1,30 @@
+"""
+Reports bcrypt throughput for a range of cost factors on this host, and the cost
+`calibrate_password_hash_rounds` would select for a given target.
+
+Use it to choose `password_hash_rounds` / `password_hash_target_ms`: throughput
+is per core, so multiply by `password_hash_workers` for the node's login capacity.
+
+Usage:
+    python -m benchmarks.bench_hash_cost [min_cost] [max_cost] [target_ms]
+"""
+from builtins import int, len, max, range
+import os
+import sys
+from app.utils.security import calibrate_password_hash_rounds, measure_hash_time
+
+def main(min_cost: int, max_cost: int, target_ms: int):
+    print(f"cpus={os.cpu_count()}")
+    print(f"{'cost':>4} {'ms/hash':>10} {'hashes/s/core':>14}")
+    for cost in range(min_cost, max_cost + 1):
+        # Take more samples for cheap costs so the timing is stable
+        samples = max(1, 2 ** max(0, 10 - cost))
+        seconds = measure_hash_time(cost, samples)
+        print(f"{cost:>4} {seconds * 1000:>10.1f} {1 / seconds:>14.1f}")
+    if target_ms:
+        rounds = calibrate_password_hash_rounds(target_ms, min_rounds=min_cost)
+        print(f"calibrated cost for {target_ms} ms/hash: {rounds}")
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [8, 13, 250][len(args):]))
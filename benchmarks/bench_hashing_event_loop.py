@@ -0,0 +1,60 @@
+"""
+Measures event-loop latency while a burst of logins is verifying passwords.
+
+A ticker coroutine records how late each 10 ms sleep wakes up. With the
+synchronous `verify_password` the loop stalls for the full bcrypt cost on every
+login; with `verify_password_async` the ticker should stay close to flat.
+
+Usage:
+    python -m benchmarks.bench_hashing_event_loop [concurrent_logins]
+"""
+from builtins import len, max, sorted
+import asyncio
+import sys
+import time
+from app.utils.hashing_executor import shutdown_hashing_executor
+from app.utils.security import hash_password, verify_password, verify_password_async
+
+TICK = 0.01
+
+async def _ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+async def _sync_login(password: str, hashed: str):
+    verify_password(password, hashed)
+
+async def _async_login(password: str, hashed: str):
+    await verify_password_async(password, hashed)
+
+async def _run(login, logins: int, hashed: str) -> dict:
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(TICK)
+    start = time.perf_counter()
+    await asyncio.gather(*(login("MySuperPassword$1234", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lags = sorted(lags) or [0.0]
+    return {
+        "elapsed_s": elapsed,
+        "p50_lag_ms": lags[len(lags) // 2] * 1000,
+        "p99_lag_ms": lags[int(len(lags) * 0.99)] * 1000,
+        "max_lag_ms": max(lags) * 1000,
+    }
+
+async def main(logins: int):
+    hashed = hash_password("MySuperPassword$1234")
+    # Warm the pool so process start-up is not attributed to the first login.
+    await verify_password_async("warmup", hashed)
+    for name, login in (("sync", _sync_login), ("async", _async_login)):
+        stats = await _run(login, logins, hashed)
+        print(f"{name:>5}: {logins} logins in {stats['elapsed_s']:.2f}s, "
+              f"loop lag p50={stats['p50_lag_ms']:.1f}ms p99={stats['p99_lag_ms']:.1f}ms max={stats['max_lag_ms']:.1f}ms")
+    shutdown_hashing_executor()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 16))
@@ -0,0 +1,113 @@
+"""
+Compares the read path behind `GET /users/` against an in-memory SQLite users
+table: full `User` ORM entities (with `UserResponse.model_validate`, as the
+route used to do, and with the orjson serializer) against Core rows of only
+the response columns fed to the same serializer, with and without the
+per-user links, and a sparse `fields=nickname,role` page without links.
+
+Reports pages/sec, the peak traced memory while building one page, and the
+size of the page body.
+
+Usage:
+    python -m benchmarks.bench_list_read_path [users] [limit] [pages]
+"""
+from builtins import float, int, len, max, min, range
+import asyncio
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserResponse
+from app.services.user_service import UserService
+from app.utils.link_generation import UserLinkTemplates
+from app.utils.user_serializer import UserJSONResponse, parse_fields, user_list_payload
+from benchmarks.bench_list_rendering import _request
+
+async def _seed(session: AsyncSession, count: int):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [{
+        "id": uuid.uuid4(),
+        "nickname": f"user_{i}",
+        "email": f"user_{i}@example.com",
+        "first_name": "Bench",
+        "last_name": f"User {i}",
+        "bio": "Experienced software developer specializing in web applications. " * 6,
+        "hashed_password": "$2b$12$" + "x" * 53,
+        "verification_token": "t" * 43,
+        "role": UserRole.AUTHENTICATED,
+        "email_verified": True,
+        "created_at": start + timedelta(seconds=i),
+    } for i in range(count)]
+    for offset in range(0, count, 5000):
+        await session.execute(insert(User), rows[offset:offset + 5000])
+    await session.commit()
+
+async def _orm_validated(session: AsyncSession, skip: int, limit: int) -> bytes:
+    users = await UserService.list_users(session, skip, limit)
+    items = [UserResponse.model_validate(user).model_dump(mode="json") for user in users]
+    return UserJSONResponse({"items": items, "size": len(items)}).body
+
+async def _orm_serialized(session: AsyncSession, skip: int, limit: int) -> bytes:
+    users = await UserService.list_users(session, skip, limit)
+    return UserJSONResponse(user_list_payload(users, None, [])).body
+
+async def _core_rows(session: AsyncSession, skip: int, limit: int) -> bytes:
+    rows = await UserService.list_user_rows(session, skip, limit)
+    return UserJSONResponse(user_list_payload(rows, None, [])).body
+
+_links = UserLinkTemplates(_request())
+
+async def _core_rows_linked(session: AsyncSession, skip: int, limit: int) -> bytes:
+    rows = await UserService.list_user_rows(session, skip, limit)
+    return UserJSONResponse(user_list_payload(rows, _links, [])).body
+
+_sparse_fields = parse_fields("nickname,role")
+
+async def _core_rows_sparse(session: AsyncSession, skip: int, limit: int) -> bytes:
+    rows = await UserService.list_user_rows(session, skip, limit, _sparse_fields)
+    return UserJSONResponse(user_list_payload(rows, None, [], fields=_sparse_fields)).body
+
+async def _measure(session: AsyncSession, render, count: int, limit: int, pages: int):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for page in range(pages):
+            await render(session, page * limit % max(count - limit, 1), limit)
+            # A request's session ends with the request; drop what the ORM path kept
+            session.expunge_all()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    body = await render(session, 0, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    session.expunge_all()
+    return pages / best, peak / 1024, len(body) / 1024
+
+async def main(count: int, limit: int, pages: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await _seed(session, count)
+        print(f"{count} users, {limit} per page, best of 3 x {pages} pages")
+        print(f"{'path':<26} {'pages/sec':>10} {'peak KiB':>9} {'body KiB':>9}")
+        for name, render in (
+            ("ORM + model_validate", _orm_validated),
+            ("ORM + serializer", _orm_serialized),
+            ("Core rows + serializer", _core_rows),
+            ("Core rows + links", _core_rows_linked),
+            ("sparse, links=false", _core_rows_sparse),
+        ):
+            pages_per_sec, peak_kib, body_kib = await _measure(session, render, count, limit, pages)
+            print(f"{name:<26} {pages_per_sec:>10.0f} {peak_kib:>9.0f} {body_kib:>9.1f}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [10000, 100, 100][len(args):])))
@@ -0,0 +1,83 @@
+"""
+Measures how fast a `GET /users/` page is turned into JSON bytes, without the
+database: the previous path (`UserResponse.model_validate` per user,
+`request.url_for` links validated as `HttpUrl`, then FastAPI's re-validation
+against `response_model` and `json.dumps`) against the precomputed link
+templates and the orjson serializer.
+
+Usage:
+    python -m benchmarks.bench_list_rendering [page_size] [pages]
+"""
+from builtins import float, int, len, min, range
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserListResponse, UserResponse
+from app.utils.link_generation import UserLinkTemplates, create_user_links, generate_pagination_links, pagination_hrefs
+from app.utils.user_serializer import UserJSONResponse, user_list_payload
+
+def _request() -> Request:
+    return Request({
+        "type": "http", "app": app, "scheme": "http", "server": ("testserver", 80), "root_path": "",
+        "path": "/users/", "query_string": b"skip=0&limit=100", "headers": [(b"host", b"testserver")],
+    })
+
+def _users(count: int):
+    now = datetime.now(timezone.utc)
+    return [
+        User(
+            id=uuid.uuid4(), nickname=f"user_{i}", email=f"user_{i}@example.com", first_name="Bench", last_name=f"User {i}",
+            bio="Benchmark user", github_profile_url=f"https://github.com/user_{i}", role=UserRole.AUTHENTICATED,
+            is_professional=False, created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+_response_adapter = TypeAdapter(UserListResponse)
+
+def _validated_page(request: Request, users, total: int) -> bytes:
+    items = []
+    for user in users:
+        item = UserResponse.model_validate(user)
+        item.links = create_user_links(user.id, request)
+        items.append(item)
+    content = UserListResponse(
+        items=items, total=total, page=1, size=len(items),
+        links=generate_pagination_links(request, 0, len(users), total),
+    )
+    # What FastAPI does with a returned model: validate against response_model, dump, json.dumps
+    validated = _response_adapter.validate_python(content, from_attributes=True)
+    return json.dumps(_response_adapter.dump_python(validated, mode="json"), separators=(",", ":")).encode("utf-8")
+
+def _fast_page(request: Request, users, total: int) -> bytes:
+    payload = user_list_payload(users, UserLinkTemplates(request), pagination_hrefs(request, 0, len(users), total), total=total, page=1)
+    return UserJSONResponse(payload).body
+
+def _best(render, request: Request, users, pages: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(pages):
+            render(request, users, 10000)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(page_size: int, pages: int):
+    request = _request()
+    users = _users(page_size)
+    assert json.loads(_fast_page(request, users, 10000)) == json.loads(_validated_page(request, users, 10000))
+    print(f"{page_size} users per page, best of 3 x {pages} pages")
+    print(f"{'mode':<12} {'ms/page':>8} {'pages/sec':>10}")
+    for name, render in (("validated", _validated_page), ("fast path", _fast_page)):
+        elapsed = _best(render, request, users, pages)
+        print(f"{name:<12} {elapsed / pages * 1000:>8.2f} {pages / elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [100, 200][len(args):]))
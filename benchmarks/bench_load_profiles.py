@@ -0,0 +1,98 @@
+"""
+Compares user lookups by email against an in-memory SQLite users table with
+every column loaded (`select(User)` with deferral undone, as `_fetch_user` used
+to run) and with each `LOAD_PROFILES` projection from `UserService`.
+
+Reports lookups/sec and the bytes per row the driver returned for the
+emitted SELECT.
+
+Usage:
+    python -m benchmarks.bench_load_profiles [users] [lookups]
+"""
+from builtins import bytes, float, int, isinstance, len, list, max, min, range, str, sum
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import undefer
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models.user_model import User, UserRole
+from app.services.user_service import LOAD_PROFILES, UserService
+
+async def _seed(session: AsyncSession, count: int):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [{
+        "id": uuid.uuid4(),
+        "nickname": f"user_{i}",
+        "email": f"user_{i}@example.com",
+        "first_name": "Bench",
+        "last_name": f"User {i}",
+        "bio": "Experienced software developer specializing in web applications. " * 6,
+        "hashed_password": "$2b$12$" + "x" * 53,
+        "verification_token": "t" * 43,
+        "role": UserRole.AUTHENTICATED,
+        "email_verified": True,
+        "created_at": start + timedelta(seconds=i),
+    } for i in range(count)]
+    for offset in range(0, count, 5000):
+        await session.execute(insert(User), rows[offset:offset + 5000])
+    await session.commit()
+
+def _value_bytes(value) -> int:
+    if value is None:
+        return 0
+    return len(value) if isinstance(value, bytes) else len(str(value).encode("utf-8"))
+
+async def _row_bytes(session: AsyncSession, options, email: str) -> int:
+    """Re-runs the statement the ORM emitted and sizes the raw driver row."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await session.execute(select(User).options(*options).filter_by(email=email))
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+    session.expunge_all()
+    statement, parameters = statements[-1]
+    connection = await session.connection()
+    row = (await connection.exec_driver_sql(statement, parameters)).first()
+    return sum(_value_bytes(value) for value in row)
+
+async def _lookups_per_sec(session: AsyncSession, options, emails: list, lookups: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for i in range(lookups):
+            query = select(User).options(*options).filter_by(email=emails[i % len(emails)])
+            (await session.execute(query)).scalars().first()
+            session.expunge_all()
+        best = min(best, time.perf_counter() - start)
+    return lookups / best
+
+async def main(count: int, lookups: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await _seed(session, count)
+        emails = [f"user_{i}@example.com" for i in range(0, count, max(count // 500, 1))]
+        print(f"{count} users, best of 3 x {lookups} lookups by email")
+        print(f"{'profile':<14} {'lookups/sec':>12} {'bytes/row':>10}")
+        variants = [("all columns", [undefer("*")])]
+        variants += [(name, [UserService.load_profile(name)]) for name in LOAD_PROFILES]
+        for name, options in variants:
+            per_sec = await _lookups_per_sec(session, options, emails, lookups)
+            row_bytes = await _row_bytes(session, options, emails[0])
+            print(f"{name:<14} {per_sec:>12.0f} {row_bytes:>10}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [10000, 2000][len(args):])))
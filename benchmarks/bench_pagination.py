@@ -0,0 +1,65 @@
+"""
+Compares deep-page latency of offset (skip/limit) and keyset (cursor) pagination
+for `GET /users/` against an in-memory SQLite users table.
+
+Usage:
+    python -m benchmarks.bench_pagination [users] [limit]
+"""
+from builtins import float, int, len, min, range, tuple
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models.user_model import User, UserRole
+from app.services.user_service import UserService
+
+async def _seed(session: AsyncSession, count: int):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [{
+        "id": uuid.uuid4(),
+        "nickname": f"user_{i}",
+        "email": f"user_{i}@example.com",
+        "hashed_password": "x",
+        "role": UserRole.AUTHENTICATED,
+        "email_verified": True,
+        "created_at": start + timedelta(seconds=i),
+    } for i in range(count)]
+    for offset in range(0, count, 5000):
+        await session.execute(insert(User), rows[offset:offset + 5000])
+    await session.commit()
+
+async def _time(coro_factory, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_factory()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+async def main(count: int, limit: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await _seed(session, count)
+        print(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10}")
+        for page in (1, count // limit // 10, count // limit // 2, count // limit - 1):
+            skip = page * limit
+            # The keyset position is the row just before the page, as a cursor link would carry it
+            anchor = (await session.execute(
+                select(User.created_at, User.id).order_by(User.created_at, User.id).offset(skip - 1).limit(1)
+            )).first()
+            offset_ms = await _time(lambda: UserService.list_users(session, skip, limit))
+            keyset_ms = await _time(lambda: UserService.list_users_keyset(session, limit, after=tuple(anchor)))
+            session.expunge_all()
+            print(f"{page:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [100000, 10][len(args):])))
@@ -0,0 +1,64 @@
+"""
+Compares email delivery throughput (emails/sec) against the in-process SMTP
+sink: the previous one-connection-per-message `SMTPClient` run in threads,
+the pooled transport sending one message at a time, and pooled `send_many`.
+
+The smtplib threads and the pool share the same concurrency, and the sink
+delays every reply by `latency_ms` to stand in for a remote relay.
+
+Usage:
+    python -m benchmarks.bench_smtp_transport [emails] [concurrency] [latency_ms]
+"""
+from builtins import float, int, len, range
+import asyncio
+import sys
+import time
+from app.utils.smtp_connection import SMTPClient
+from tests.smtp_sink import SMTPSink
+from app.utils.smtp_transport import AsyncSMTPTransport, SMTPConnectionPool, build_message
+
+SENDER = "bench@example.com"
+HTML = "<p>Verify your account: <a href='http://localhost/verify'>link</a></p>"
+
+def _messages(count: int):
+    return [build_message("Verify Your Account", HTML, SENDER, f"bench_{i}@example.com") for i in range(count)]
+
+def _transport(sink: SMTPSink, concurrency: int) -> AsyncSMTPTransport:
+    pool = SMTPConnectionPool("127.0.0.1", sink.port, SENDER, "secret", use_tls=False, max_size=concurrency)
+    return AsyncSMTPTransport(pool, SENDER)
+
+async def _smtplib(sink: SMTPSink, count: int, concurrency: int):
+    client = SMTPClient("127.0.0.1", sink.port, SENDER, "secret", use_tls=False)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def send(i: int):
+        async with slots:
+            await asyncio.to_thread(client.send_email, "Verify Your Account", HTML, f"bench_{i}@example.com")
+
+    await asyncio.gather(*(send(i) for i in range(count)))
+
+async def _pooled_send(sink: SMTPSink, count: int, concurrency: int):
+    transport = _transport(sink, concurrency)
+    await asyncio.gather(*(transport.send(message) for message in _messages(count)))
+    await transport.close()
+
+async def _pooled_send_many(sink: SMTPSink, count: int, concurrency: int):
+    transport = _transport(sink, concurrency)
+    await transport.send_many(_messages(count))
+    await transport.close()
+
+async def main(count: int, concurrency: int, latency_ms: float):
+    print(f"{count} emails, concurrency {concurrency}, {latency_ms:g} ms per SMTP reply")
+    print(f"{'mode':<24} {'seconds':>8} {'emails/sec':>11} {'sessions':>9}")
+    for name, run in (("smtplib per message", _smtplib), ("pooled send", _pooled_send), ("pooled send_many", _pooled_send_many)):
+        async with SMTPSink(latency=latency_ms / 1000) as sink:
+            start = time.perf_counter()
+            await run(sink, count, concurrency)
+            elapsed = time.perf_counter() - start
+            assert len(sink.messages) == count
+            print(f"{name:<24} {elapsed:>8.2f} {count / elapsed:>11.0f} {sink.sessions:>9}")
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:]]
+    count, concurrency, latency_ms = args + [1000, 4, 2][len(args):]
+    asyncio.run(main(int(count), int(concurrency), latency_ms))
@@ -0,0 +1,41 @@
+"""
+Measures email template renders/sec: the previous path that read header,
+footer and body from disk and ran markdown and the inline styles on every
+render, against the compiled template cache in `TemplateManager`.
+
+Usage:
+    python -m benchmarks.bench_templates [renders]
+"""
+from builtins import int, len, range
+import sys
+import time
+import markdown2
+from app.utils.template_manager import TemplateManager
+
+def _uncached_render(manager: TemplateManager, template_name: str, **context) -> str:
+    header = manager._read_template('header.md')
+    footer = manager._read_template('footer.md')
+    main_content = manager._read_template(f'{template_name}.md').format(**context)
+    return manager._apply_email_styles(markdown2.markdown(f"{header}\n{main_content}\n{footer}"))
+
+def main(renders: int):
+    manager = TemplateManager(auto_reload=False)
+    contexts = [
+        {"name": f"User {i}", "verification_url": f"http://localhost/verify-email/{i}/token{i}", "email": f"user_{i}@example.com"}
+        for i in range(renders)
+    ]
+    modes = (
+        ("uncached", lambda context: _uncached_render(manager, 'email_verification', **context)),
+        ("compiled", lambda context: manager.render_template('email_verification', **context)),
+        ("compiled, auto_reload", lambda context: TemplateManager(auto_reload=True).render_template('email_verification', **context)),
+    )
+    print(f"{'mode':<24} {'seconds':>8} {'renders/sec':>12}")
+    for name, render in modes:
+        start = time.perf_counter()
+        for context in contexts:
+            render(context)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<24} {elapsed:>8.3f} {renders / elapsed:>12.0f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,72 @@
+"""
+Compares moderating N users one request at a time (`PUT /users/{id}` to change the
+role, `DELETE /users/{id}`) with a single `POST /users/batch` per operation, through
+the ASGI app against an in-memory SQLite database.
+
+Usage:
+    python -m benchmarks.bench_user_batch [users]
+"""
+from builtins import int, len, range, str
+import asyncio
+import sys
+import time
+import uuid
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.dependencies import get_db
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.services.jwt_service import create_access_token
+from app.services.user_cache import user_cache
+
+async def _seed(session: AsyncSession, count: int):
+    ids = [uuid.uuid4() for _ in range(count)]
+    await session.execute(insert(User), [{
+        "id": user_id,
+        "nickname": f"spam_{i}",
+        "email": f"spam_{i}@example.com",
+        "hashed_password": "x",
+        "role": UserRole.AUTHENTICATED,
+        "email_verified": True,
+    } for i, user_id in enumerate(ids)])
+    await session.commit()
+    return ids
+
+async def _per_user(client: AsyncClient, headers, ids) -> float:
+    start = time.perf_counter()
+    for user_id in ids:
+        await client.put(f"/users/{user_id}", json={"role": "ANONYMOUS"}, headers=headers)
+    for user_id in ids:
+        await client.delete(f"/users/{user_id}", headers=headers)
+    return time.perf_counter() - start
+
+async def _batched(client: AsyncClient, headers, ids) -> float:
+    user_ids = [str(user_id) for user_id in ids]
+    start = time.perf_counter()
+    await client.post("/users/batch", json={"user_ids": user_ids, "operation": "set_role", "role": "ANONYMOUS"}, headers=headers)
+    await client.post("/users/batch", json={"user_ids": user_ids, "operation": "delete"}, headers=headers)
+    return time.perf_counter() - start
+
+async def main(count: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': 'bench-admin', 'role': 'ADMIN'})}"}
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        app.dependency_overrides[get_db] = lambda: session
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            for label, run in (("per-user requests", _per_user), ("POST /users/batch", _batched)):
+                ids = await _seed(session, count)
+                user_cache.clear()
+                elapsed = await run(client, headers, ids)
+                session.expunge_all()
+                print(f"{label:>18}: {2 * count} operations in {elapsed:.3f}s -> {2 * count / elapsed:.0f} ops/sec")
+        app.dependency_overrides.clear()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [500][len(args):])))
@@ -0,0 +1,52 @@
+"""
+Measures `GET /users/export` throughput and peak Python memory against an
+in-memory SQLite users table.
+
+Usage:
+    python -m benchmarks.bench_user_export [users] [ndjson|csv]
+"""
+from builtins import int, len, min, range
+import asyncio
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models.user_model import User, UserRole
+from app.services.user_service import UserService
+from app.utils.user_export import EXPORT_COLUMNS, csv_chunks, ndjson_chunks
+
+async def main(count: int, export_format: str):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    async with AsyncSession(engine) as session:
+        for offset in range(0, count, 10000):
+            await session.execute(insert(User), [{
+                "id": uuid.uuid4(), "nickname": f"user_{i}", "email": f"user_{i}@example.com",
+                "hashed_password": "x", "role": UserRole.AUTHENTICATED, "email_verified": True,
+                "created_at": start + timedelta(seconds=i),
+            } for i in range(offset, min(offset + 10000, count))])
+        await session.commit()
+
+        tracemalloc.start()
+        began = time.perf_counter()
+        partitions = UserService.stream_users(session, {}, EXPORT_COLUMNS)
+        chunks = csv_chunks(partitions, EXPORT_COLUMNS) if export_format == "csv" else ndjson_chunks(partitions)
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+        elapsed = time.perf_counter() - began
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"{export_format}: {count} users, {size / 1e6:.1f} MB in {elapsed:.2f}s "
+          f"({count / elapsed:.0f} rows/sec), peak traced memory {peak / 1e6:.1f} MB")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000, sys.argv[2] if len(sys.argv) > 2 else "ndjson"))
@@ -0,0 +1,48 @@
+"""
+Measures bulk import throughput (users/sec) of `UserService.import_users` against
+an in-memory SQLite database.
+
+bcrypt dominates the cost at production settings, so the hash cost is a
+parameter: run once at the production cost to see the hashing ceiling per node,
+and once at cost 4 to see the validation + insert pipeline on its own. Each
+batch also queues its verification emails in the outbox; nothing is sent.
+
+Usage:
+    python -m benchmarks.bench_user_import [users] [bcrypt_cost]
+"""
+from builtins import int, len, range
+import asyncio
+import json
+import sys
+import time
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.services.email_service import EmailService
+from app.services.user_service import UserService
+from app.utils.hashing_executor import shutdown_hashing_executor
+from app.utils.import_parsing import iter_import_rows
+from app.utils.security import set_password_hash_rounds
+from app.utils.template_manager import TemplateManager
+
+async def _body(count: int):
+    for i in range(count):
+        yield (json.dumps({"email": f"bench_{i}@example.com", "password": "BenchPass123!"}) + "\n").encode("utf-8")
+
+async def main(count: int, cost: int):
+    set_password_hash_rounds(cost)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        start = time.perf_counter()
+        rows = iter_import_rows(_body(count), "application/x-ndjson")
+        created, errors = await UserService.import_users(session, rows, EmailService(TemplateManager()))
+        elapsed = time.perf_counter() - start
+    print(f"cost={cost}: imported {created} users ({len(errors)} errors) in {elapsed:.2f}s -> {created / elapsed:.0f} users/sec")
+    await engine.dispose()
+    shutdown_hashing_executor()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [5000, 4][len(args):])))
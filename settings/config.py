@@ -1,4 +1,4 @@
-from builtins import bool, int, str
+from builtins import bool, float, int, str
 from pathlib import Path
 from pydantic import Field, AnyUrl, DirectoryPath
 from pydantic_settings import BaseSettings
@@ -20,6 +20,26 @@ class Settings(BaseSettings):
     jwt_secret_key: str = "a_very_secret_key"
     jwt_algorithm: str = "HS256"
     refresh_token_expire_minutes: int = 1440  # 24 hours for refresh token
+    jwt_claims_cache_size: int = Field(default=4096, description="Maximum verified JWTs kept in the in-process claims cache (0 disables it)")
+
+    # Password hashing executor configuration
+    password_hash_workers: int = Field(default=0, description="Worker processes for bcrypt hashing (0 uses the CPU count)")
+    password_hash_max_pending: int = Field(default=0, description="Maximum in-flight hash jobs before callers wait (0 uses 4x the worker count)")
+    password_hash_use_processes: bool = Field(default=True, description="Run bcrypt in a process pool instead of a thread pool")
+    password_hash_rounds: int = Field(default=12, description="Target bcrypt cost factor for new and rehashed passwords")
+    password_hash_target_ms: int = Field(default=0, description="Calibrate the bcrypt cost at startup to roughly this many ms per hash (0 disables calibration)")
+    password_hash_min_rounds: int = Field(default=10, description="Lowest bcrypt cost calibration may select")
+
+    # Login bookkeeping
+    last_login_write_behind: bool = Field(default=False, description="Buffer last_login_at updates in memory and write them in batches")
+    last_login_flush_interval_seconds: float = Field(default=5.0, description="Seconds between batched last_login_at flushes")
+
+    # Nickname allocation
+    nickname_bloom_capacity: int = Field(default=1000000, description="Expected number of nicknames tracked by the in-memory allocation filter")
+
+    # User entity cache
+    user_cache_size: int = Field(default=10000, description="Maximum users kept in the read-through entity cache (0 disables it)")
+    user_cache_ttl_seconds: float = Field(default=30.0, description="Seconds a cached user may be served before it is re-read (0 disables the cache)")
 
     # Database configuration
     postgres_user: str = Field(default='user', description="PostgreSQL username")
@@ -41,6 +61,21 @@ class Settings(BaseSettings):
     smtp_port: int = Field(default=2525, description="SMTP port for sending emails")
     smtp_username: str = Field(default='your-mailtrap-username', description="Username for SMTP server")
     smtp_password: str = Field(default='your-mailtrap-password', description="Password for SMTP server")
+    smtp_use_tls: bool = Field(default=True, description="Upgrade SMTP connections with STARTTLS")
+    smtp_pool_size: int = Field(default=4, description="Maximum concurrent SMTP sessions kept open for reuse")
+    smtp_idle_timeout_seconds: float = Field(default=30.0, description="Close pooled SMTP sessions idle for longer than this")
+    smtp_health_check_seconds: float = Field(default=5.0, description="Probe a pooled SMTP session with NOOP before reuse once idle this long")
+    smtp_timeout_seconds: float = Field(default=30.0, description="Seconds to wait for the SMTP server to accept a connection, command or message")
+    email_templates_auto_reload: bool = Field(default=False, description="Recompile email templates when their files change instead of only at startup")
+
+    # Email outbox delivery
+    email_outbox_workers: int = Field(default=2, description="Concurrent outbox delivery workers")
+    email_outbox_batch_size: int = Field(default=50, description="Emails claimed by a worker at a time")
+    email_outbox_poll_interval_seconds: float = Field(default=1.0, description="Seconds an idle worker waits before polling the outbox again")
+    email_outbox_max_attempts: int = Field(default=8, description="Delivery attempts before an email is marked failed")
+    email_outbox_backoff_seconds: float = Field(default=5.0, description="Delay before the first retry; doubles with every failed attempt")
+    email_outbox_lease_seconds: float = Field(default=60.0, description="Seconds a claimed email is hidden from other workers before it is retried")
+    email_outbox_retention_hours: float = Field(default=24.0, description="Hours sent and failed emails are kept in the outbox before they are deleted")
 
     @property
     def database_url(self) -> str:
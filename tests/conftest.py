@@ -15,6 +15,7 @@ Fixtures:
 
 # Standard library imports
 from builtins import Exception, range, str
+from contextlib import contextmanager
 from datetime import timedelta
 from unittest.mock import AsyncMock, patch
 from uuid import uuid4
@@ -24,6 +25,7 @@ import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -33,11 +35,13 @@ from faker import Faker
 from app.main import app
 from app.database import Base
 from app.models.user_model import User, UserRole
-from app.dependencies import get_db, get_settings
+from app.dependencies import Services, get_db, get_settings
 from app.utils.security import hash_password
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
 from app.services.jwt_service import create_access_token
+from app.services.bootstrap_state import bootstrap_state
+from app.services.user_cache import user_cache
 
 fake = Faker()
 
@@ -93,6 +97,9 @@ async def session():
         for table in reversed(Base.metadata.sorted_tables):
             await session.execute(table.delete())
         await session.commit()
+        # The table wipe above bypasses the service layer, so drop cached state too
+        user_cache.clear()
+        bootstrap_state.reset()
 
         yield session
 
@@ -102,6 +109,27 @@ async def session():
         await connection.close()
         app.dependency_overrides.clear()
 
+@pytest.fixture
+def statement_recorder(session):
+    """
+    Records the SQL the test engine executes: `with statement_recorder() as statements:`
+    collects the text of every statement run inside the block.
+    """
+    sync_engine = session.bind.engine.sync_engine
+
+    @contextmanager
+    def record():
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(sync_engine, "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", listener)
+    return record
+
 @pytest.fixture
 async def client(session):
     """Create test client"""
@@ -259,9 +287,12 @@ def email_service():
 
 @pytest.fixture(scope="function")
 async def async_client(session):
+    # httpx does not run the lifespan, so install the app-scoped services here
+    app.state.services = Services.create()
     async with AsyncClient(app=app, base_url="http://testserver") as client:
         app.dependency_overrides[get_db] = lambda: session
         try:
             yield client
         finally:
             app.dependency_overrides.clear()
+            await app.state.services.close()
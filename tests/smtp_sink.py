@@ -0,0 +1,163 @@
+from builtins import bytes, float, int, len, list, set, str
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from email import message_from_bytes
+from email.message import Message
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ReceivedMessage:
+    mail_from: str
+    recipients: List[str]
+    data: bytes
+    session_id: int = 0
+
+    @property
+    def message(self) -> Message:
+        return message_from_bytes(self.data)
+
+@dataclass
+class _Envelope:
+    mail_from: Optional[str] = None
+    recipients: List[str] = field(default_factory=list)
+
+class SMTPSink:
+    """
+    Minimal in-process SMTP server that accepts every message and keeps it in memory.
+
+    A stand-in for the real relay in tests and benchmarks: it speaks enough ESMTP for
+    `smtplib` (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT), does not
+    offer STARTTLS, and can be told to reject the next N messages with a transient
+    451 to exercise retries. `latency` delays every reply to mimic a remote relay, and
+    `pipelining=False` stops it advertising PIPELINING.
+
+        sink = SMTPSink()
+        await sink.start()      # listens on 127.0.0.1:<sink.port>
+        ...
+        await sink.stop()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, pipelining: bool = True):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.pipelining = pipelining
+        self.messages: List[ReceivedMessage] = []
+        self.sessions = 0
+        self.ehlo_hostnames: List[str] = []
+        self._failures_left = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: set = set()
+
+    @property
+    def open_sessions(self) -> int:
+        return len(self._clients)
+
+    def fail_next(self, count: int):
+        """Answer the next `count` DATA commands with 451 instead of accepting the message."""
+        self._failures_left = count
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"SMTP sink listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # Clients may keep pooled sessions open; hang up on them
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "SMTPSink":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.sessions += 1
+        session_id = self.sessions
+        self._clients.add(writer)
+        envelope = _Envelope()
+
+        async def reply(line: str):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            writer.write(f"{line}\r\n".encode("ascii"))
+            await writer.drain()
+
+        await reply("220 smtp-sink ESMTP ready")
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                verb = line.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    self.ehlo_hostnames.append(line[5:].strip())
+                    pipelining = "250-PIPELINING\r\n" if self.pipelining else ""
+                    await reply(f"250-smtp-sink\r\n{pipelining}250-8BITMIME\r\n250 AUTH PLAIN LOGIN")
+                elif verb == "HELO":
+                    await reply("250 smtp-sink")
+                elif verb == "AUTH":
+                    if line.upper().startswith("AUTH LOGIN"):
+                        await reply("334 VXNlcm5hbWU6")
+                        await reader.readline()
+                        await reply("334 UGFzc3dvcmQ6")
+                        await reader.readline()
+                    await reply("235 2.7.0 Authentication successful")
+                elif verb == "MAIL":
+                    envelope = _Envelope(mail_from=line.split(":", 1)[1].strip().strip("<>"))
+                    await reply("250 2.1.0 OK")
+                elif verb == "RCPT":
+                    envelope.recipients.append(line.split(":", 1)[1].strip().strip("<>"))
+                    await reply("250 2.1.5 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        data_line = await reader.readline()
+                        if data_line in (b".\r\n", b".\n", b""):
+                            break
+                        # Undo dot-stuffing
+                        lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                    if self._failures_left > 0:
+                        self._failures_left -= 1
+                        await reply("451 4.3.0 Temporary failure, try again later")
+                    else:
+                        self.messages.append(ReceivedMessage(envelope.mail_from, list(envelope.recipients), b"".join(lines), session_id))
+                        await reply("250 2.0.0 Queued")
+                    envelope = _Envelope()
+                elif verb == "RSET":
+                    envelope = _Envelope()
+                    await reply("250 2.0.0 OK")
+                elif verb == "NOOP":
+                    await reply("250 2.0.0 OK")
+                elif verb == "QUIT":
+                    await reply("221 2.0.0 Bye")
+                    break
+                else:
+                    await reply("502 5.5.2 Command not recognized")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+if __name__ == "__main__":
+    async def _serve(port: int):
+        async with SMTPSink(port=port) as sink:
+            print(f"SMTP sink listening on {sink.host}:{sink.port}; Ctrl+C to stop")
+            await asyncio.Event().wait()
+
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve(int(sys.argv[1]) if len(sys.argv) > 1 else 1025))
@@ -1,11 +1,13 @@
-from builtins import str
+from builtins import range, str
 import pytest
 from httpx import AsyncClient
 from app.main import app
 from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserListResponse, UserResponse
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
 from app.services.jwt_service import decode_token  # Import your FastAPI app
+from uuid import uuid4
 
 # Example of a test function using the async_client fixture
 @pytest.mark.asyncio
@@ -52,6 +54,13 @@ async def test_update_user_email_access_allowed(async_client, admin_user, admin_
     assert response.json()["email"] == updated_data["email"]
 
 
+@pytest.mark.asyncio
+async def test_update_user_duplicate_email_conflict(async_client, admin_user, verified_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.put(f"/users/{admin_user.id}", json={"email": verified_user.email}, headers=headers)
+    assert response.status_code == 409
+
+
 @pytest.mark.asyncio
 async def test_delete_user(async_client, admin_user, admin_token):
     headers = {"Authorization": f"Bearer {admin_token}"}
@@ -175,6 +184,21 @@ async def test_list_users_as_admin(async_client, admin_token):
     assert response.status_code == 200
     assert 'items' in response.json()
 
+@pytest.mark.asyncio
+async def test_user_responses_match_response_models(async_client, admin_token, verified_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{verified_user.id}", headers=headers)
+    data = response.json()
+    # The serializer skips validation, so the body must already be what the model would produce
+    assert UserResponse.model_validate(data).model_dump(mode="json") == data
+    assert [link["rel"] for link in data["links"]] == ["self", "update", "delete"]
+    assert data["links"][0]["href"] == f"http://testserver/users/{verified_user.id}"
+
+    response = await async_client.get("/users/", params={"limit": 5}, headers=headers)
+    data = response.json()
+    assert UserListResponse.model_validate(data).model_dump(mode="json") == data
+    assert {item["id"] for item in data["items"]} >= {str(verified_user.id)}
+
 @pytest.mark.asyncio
 async def test_list_users_as_manager(async_client, manager_token):
     response = await async_client.get(
@@ -215,3 +239,381 @@ async def test_update_user_partial_data(async_client, admin_user, admin_token):
     )
     assert response.status_code == 200
     assert response.json()["first_name"] == "NewName"
+
+@pytest.mark.asyncio
+async def test_refresh_token_flow(async_client, verified_user):
+    form_data = {
+        "username": verified_user.email,
+        "password": "MySuperPassword$1234"
+    }
+    login_response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    assert login_response.status_code == 200
+    refresh_token = login_response.json()["refresh_token"]
+
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    data = response.json()
+    assert decode_token(data["access_token"])["sub"] == verified_user.email
+    assert data["refresh_token"] != refresh_token
+
+    # Replaying the rotated-out token is reuse: it fails and revokes the new token too
+    reuse_response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert reuse_response.status_code == 401
+    revoked_response = await async_client.post("/token/refresh", json={"refresh_token": data["refresh_token"]})
+    assert revoked_response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_refresh_token_rechecks_user(async_client, session, verified_user):
+    from app.services.refresh_token_service import create_refresh_token
+    refresh_token = create_refresh_token(data={"sub": verified_user.email, "role": "ADMIN"})
+
+    # The new tokens carry the role the user has now, not the one in the old claims
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    assert decode_token(response.json()["access_token"])["role"] == "AUTHENTICATED"
+
+    verified_user.is_locked = True
+    await session.commit()
+    locked_response = await async_client.post("/token/refresh", json={"refresh_token": response.json()["refresh_token"]})
+    assert locked_response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_refresh_token_rejected_as_bearer(async_client, admin_user):
+    from app.services.refresh_token_service import create_refresh_token
+    refresh_token = create_refresh_token(data={"sub": str(admin_user.id), "role": admin_user.role.name})
+    response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {refresh_token}"})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_refresh_with_access_token_rejected(async_client, admin_token):
+    response = await async_client.post("/token/refresh", json={"refresh_token": admin_token})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_list_users_cursor_pagination(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    seen = []
+    response = await async_client.get("/users/", params={"cursor": "", "limit": 20}, headers=headers)
+    while True:
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(item["id"] for item in data["items"])
+        links = {link["rel"]: link["href"] for link in data["links"]}
+        if "next" not in links:
+            break
+        response = await async_client.get(links["next"], headers=headers)
+    # 50 users plus the admin, each exactly once
+    assert len(seen) == 51
+    assert len(set(seen)) == 51
+
+    prev_response = await async_client.get(links["prev"], headers=headers)
+    assert prev_response.status_code == 200
+    assert [item["id"] for item in prev_response.json()["items"]] == seen[20:40]
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets_and_link_suppression(async_client, admin_token, verified_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    params = {"fields": "nickname,role", "links": "false"}
+    response = await async_client.get(f"/users/{verified_user.id}", params=params, headers=headers)
+    assert response.json() == {"nickname": verified_user.nickname, "role": verified_user.role.name, "id": str(verified_user.id), "links": []}
+
+    response = await async_client.get("/users/", params={**params, "limit": 5}, headers=headers)
+    data = response.json()
+    assert all(set(item) == {"nickname", "role", "id", "links"} and item["links"] == [] for item in data["items"])
+    assert all("fields=nickname%2Crole" in link["href"] for link in data["links"])
+
+    response = await async_client.get("/users/", params={"fields": "email", "cursor": "", "limit": 1}, headers=headers)
+    data = response.json()
+    assert set(data["items"][0]) == {"email", "id", "links"} and len(data["items"][0]["links"]) == 3
+    next_link = next(link["href"] for link in data["links"] if link["rel"] == "next")
+    assert set((await async_client.get(next_link, headers=headers)).json()["items"][0]) == {"email", "id", "links"}
+
+@pytest.mark.asyncio
+async def test_sparse_fieldset_rejects_unknown_fields(async_client, admin_token, verified_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for url in (f"/users/{verified_user.id}", "/users/", "/users/search"):
+        response = await async_client.get(url, params={"fields": "nickname,hashed_password"}, headers=headers)
+        assert response.status_code == 400
+        assert "hashed_password" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_get_user_conditional_requests(async_client, admin_token, verified_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{verified_user.id}", headers=headers)
+    etag = response.headers["ETag"]
+    not_modified = await async_client.get(f"/users/{verified_user.id}", headers={**headers, "If-None-Match": f'"other", W/{etag}'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b"" and not_modified.headers["ETag"] == etag
+
+    sparse = await async_client.get(f"/users/{verified_user.id}", params={"fields": "nickname"}, headers=headers)
+    assert sparse.headers["ETag"] != etag
+
+    await async_client.put(f"/users/{verified_user.id}", json={"first_name": "Changed"}, headers=headers)
+    response = await async_client.get(f"/users/{verified_user.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Changed"
+    assert response.headers["ETag"] != etag
+
+@pytest.mark.asyncio
+async def test_list_users_conditional_requests(async_client, admin_token, verified_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for params in ({"limit": 5}, {"cursor": "", "limit": 5}, {"q": verified_user.nickname}):
+        url = "/users/search" if "q" in params else "/users/"
+        etag = (await async_client.get(url, params=params, headers=headers)).headers["ETag"]
+        response = await async_client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+    etag = (await async_client.get("/users/", params={"limit": 5}, headers=headers)).headers["ETag"]
+    assert (await async_client.get("/users/", params={"limit": 6}, headers=headers)).headers["ETag"] != etag
+    await async_client.put(f"/users/{verified_user.id}", json={"bio": "Changed"}, headers=headers)
+    response = await async_client.get("/users/", params={"limit": 5}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+@pytest.mark.asyncio
+async def test_list_users_304_skips_the_count_and_deletes_change_the_etag(async_client, admin_token, user, verified_user, statement_recorder):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get("/users/", params={"limit": 5}, headers=headers)).headers["ETag"]
+    with statement_recorder() as statements:
+        response = await async_client.get("/users/", params={"limit": 5}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert not [statement for statement in statements if "count(" in statement.lower()]
+
+    await async_client.delete(f"/users/{user.id}", headers=headers)
+    response = await async_client.get("/users/", params={"limit": 5}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    await async_client.post("/users/batch", json={"user_ids": [str(verified_user.id)], "operation": "delete"}, headers=headers)
+    response = await async_client.get("/users/", params={"limit": 5}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+@pytest.mark.asyncio
+async def test_cursor_and_search_etags_skip_the_table_count(async_client, admin_token, verified_user, statement_recorder):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for url, params in (("/users/", {"cursor": "", "limit": 5}), ("/users/search", {"q": verified_user.nickname})):
+        with statement_recorder() as statements:
+            etag = (await async_client.get(url, params=params, headers=headers)).headers["ETag"]
+        assert not [statement for statement in statements if "max(users.updated_at)" in statement.lower()]
+        await async_client.put(f"/users/{verified_user.id}", json={"bio": f"Changed for {url}"}, headers=headers)
+        response = await async_client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+@pytest.mark.asyncio
+async def test_user_etag_survives_login_and_varies_by_host(async_client, admin_token, verified_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get(f"/users/{verified_user.id}", headers=headers)).headers["ETag"]
+    for password in ("WrongPassword$1234", "MySuperPassword$1234"):
+        await async_client.post("/login/", data={"username": verified_user.email, "password": password})
+    response = await async_client.get(f"/users/{verified_user.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    other_host = await async_client.get(f"/users/{verified_user.id}", headers={**headers, "Host": "api.example.com"})
+    assert other_host.json()["links"][0]["href"].startswith("http://api.example.com/")
+    assert other_host.headers["ETag"] != etag
+
+@pytest.mark.asyncio
+async def test_update_user_if_match(async_client, admin_token, verified_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get(f"/users/{verified_user.id}", headers=headers)).headers["ETag"]
+    response = await async_client.put(f"/users/{verified_user.id}", json={"first_name": "First"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+
+    # A writer still holding the old ETag loses
+    stale = await async_client.put(f"/users/{verified_user.id}", json={"first_name": "Stale"}, headers={**headers, "If-Match": etag})
+    assert stale.status_code == 412
+    weak = await async_client.put(f"/users/{verified_user.id}", json={"first_name": "Weak"}, headers={**headers, "If-Match": f"W/{new_etag}"})
+    assert weak.status_code == 412
+    current = await async_client.get(f"/users/{verified_user.id}", headers=headers)
+    assert current.json()["first_name"] == "First"
+    assert current.headers["ETag"] == new_etag
+
+    response = await async_client.put(f"/users/{uuid4()}", json={"first_name": "Nobody"}, headers={**headers, "If-Match": "*"})
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_list_users_invalid_cursor(async_client, admin_token):
+    response = await async_client.get("/users/", params={"cursor": "garbage"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_users_rejects_invalid_paging(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for params in ({"limit": 0}, {"limit": 101}, {"skip": -1}, {"cursor": "", "limit": 0}, {"cursor": "", "limit": 1000}):
+        response = await async_client.get("/users/", params=params, headers=headers)
+        assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_search_users(async_client, admin_token, users_with_same_role_50_users):
+    target = users_with_same_role_50_users[0]
+    response = await async_client.get(
+        "/users/search",
+        params={"q": target.email, "limit": 5},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["items"][0]["id"] == str(target.id)
+    assert data["total"] >= 1
+    assert all("q=" in link["href"] for link in data["links"])
+
+@pytest.mark.asyncio
+async def test_search_users_rejects_invalid_paging(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for params in ({"limit": 0}, {"limit": -1}, {"limit": 101}, {"skip": -1}):
+        response = await async_client.get("/users/search", params={"q": "user", **params}, headers=headers)
+        assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_import_users_ndjson(async_client, admin_token, verified_user, email_service):
+    from app.dependencies import get_email_service
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    body = "\n".join([
+        '{"email": "import_one@example.com", "password": "ImportPass123!", "first_name": "One"}',
+        '{"email": "import_two@example.com", "password": "ImportPass123!", "nickname": "import_two"}',
+        '{"email": "%s", "password": "ImportPass123!"}' % verified_user.email,
+        '{"email": "import_one@example.com", "password": "ImportPass123!"}',
+        '{"email": "weak@example.com", "password": "short"}',
+        'not json',
+    ])
+    response = await async_client.post(
+        "/users/import",
+        content=body,
+        headers={"Authorization": f"Bearer {admin_token}", "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert {error["row"] for error in data["errors"]} == {3, 4, 5, 6}
+    queued = {call.args[1].email for call in email_service.queue_verification_email.call_args_list}
+    assert queued == {"import_one@example.com", "import_two@example.com"}
+    email_service.send_verification_email.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_import_users_csv(async_client, admin_token, email_service):
+    from app.dependencies import get_email_service
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    body = "email,password,first_name\ncsv_one@example.com,ImportPass123!,Csv\ncsv_two@example.com,ImportPass123!,\n"
+    response = await async_client.post(
+        "/users/import",
+        content=body,
+        headers={"Authorization": f"Bearer {admin_token}", "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+
+@pytest.mark.asyncio
+async def test_import_users_reports_invalid_utf8(async_client, admin_token, email_service):
+    from app.dependencies import get_email_service
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    body = b'{"email": "utf8_ok@example.com", "password": "ImportPass123!"}\n{"email": "\xff\xfe"}\n'
+    response = await async_client.post("/users/import", content=body, headers={**headers, "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+    assert [error["row"] for error in response.json()["errors"]] == [2]
+
+    response = await async_client.post("/users/import", content=b"em\xffail,password\n", headers={**headers, "Content-Type": "text/csv"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_import_users_rejects_unknown_content_type(async_client, admin_token):
+    response = await async_client.post(
+        "/users/import",
+        content="<users/>",
+        headers={"Authorization": f"Bearer {admin_token}", "Content-Type": "application/xml"}
+    )
+    assert response.status_code == 415
+
+@pytest.mark.asyncio
+async def test_import_users_requires_admin(async_client, manager_token):
+    response = await async_client.post(
+        "/users/import",
+        content="",
+        headers={"Authorization": f"Bearer {manager_token}", "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_export_users_ndjson(async_client, admin_token, users_with_same_role_50_users):
+    import json
+    response = await async_client.get("/users/export", params={"role": "AUTHENTICATED"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 50
+    assert {row["id"] for row in rows} == {str(user.id) for user in users_with_same_role_50_users}
+    assert "hashed_password" not in rows[0]
+
+@pytest.mark.asyncio
+async def test_export_users_csv(async_client, admin_token, admin_user):
+    import csv, io
+    response = await async_client.get("/users/export", params={"format": "csv"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["email"] == admin_user.email
+    assert rows[0]["role"] == "ADMIN"
+
+@pytest.mark.asyncio
+async def test_export_users_invalid_format(async_client, admin_token):
+    response = await async_client.get("/users/export", params={"format": "xml"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_batch_lock_users(async_client, admin_token, users_with_same_role_50_users):
+    import uuid
+    targets = [str(user.id) for user in users_with_same_role_50_users[:10]]
+    missing = str(uuid.uuid4())
+    response = await async_client.post(
+        "/users/batch",
+        json={"user_ids": targets + [missing], "operation": "lock"},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["succeeded"] == 10
+    statuses = {result["user_id"]: result["status"] for result in body["results"]}
+    assert statuses[missing] == "not_found"
+    assert all(statuses[user_id] == "ok" for user_id in targets)
+
+@pytest.mark.asyncio
+async def test_batch_set_role_requires_role(async_client, admin_token, verified_user):
+    response = await async_client.post(
+        "/users/batch",
+        json={"user_ids": [str(verified_user.id)], "operation": "set_role"},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_batch_users_requires_admin(async_client, manager_token, verified_user):
+    response = await async_client.post(
+        "/users/batch",
+        json={"user_ids": [str(verified_user.id)], "operation": "delete"},
+        headers={"Authorization": f"Bearer {manager_token}"}
+    )
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_register_duplicate_nickname_conflict(async_client, session, verified_user):
+    verified_user.nickname = "taken_nickname"
+    await session.commit()
+    user_data = {"email": "fresh_email@example.com", "nickname": "taken_nickname", "password": "AnotherPassword123!", "role": "AUTHENTICATED"}
+    response = await async_client.post("/register/", json=user_data)
+    assert response.status_code == 409
+
+@pytest.mark.asyncio
+async def test_register_uses_app_scoped_email_service(async_client, monkeypatch):
+    email_service = app.state.services.email_service
+    queued = []
+    monkeypatch.setattr(email_service, "queue_verification_email", lambda session, user: queued.append(user.email))
+    for i in range(2):
+        user_data = {"email": f"scoped_{i}@example.com", "password": "ValidPassword123!", "role": "AUTHENTICATED"}
+        response = await async_client.post("/register/", json=user_data)
+        assert response.status_code == 200
+    assert queued == ["scoped_0@example.com", "scoped_1@example.com"]
+    assert app.state.services.email_service is email_service
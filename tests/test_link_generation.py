@@ -1,4 +1,4 @@
-from builtins import len, max, sorted, str
+from builtins import dict, len, max, sorted, str
 from unittest.mock import MagicMock
 from urllib.parse import parse_qs, urlparse, parse_qsl, urlunparse, urlencode
 from uuid import uuid4
@@ -6,7 +6,7 @@ from uuid import uuid4
 import pytest
 from fastapi import Request
 
-from app.utils.link_generation import create_link, create_pagination_link, create_user_links, generate_pagination_links
+from app.utils.link_generation import UserLinkTemplates, create_link, create_pagination_link, create_user_links, generate_pagination_links, pagination_hrefs
 
 from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
 
@@ -61,3 +61,26 @@ def test_pagination_links_last_page(mock_request):
     links = generate_pagination_links(mock_request, 40, 10, 50)
     assert not any(link.rel == "next" for link in links)
     assert any(link.rel == "prev" for link in links)
+
+def _app_request(url: str = "/users/?skip=10&limit=5&q=a+b"):
+    from app.main import app
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http", "app": app, "scheme": "http", "server": ("testserver", 80), "root_path": "",
+        "path": path, "query_string": query.encode(), "headers": [(b"host", b"testserver")],
+    }
+    return Request(scope)
+
+def test_user_link_templates_match_create_user_links():
+    request = _app_request()
+    user_id = uuid4()
+    fast = UserLinkTemplates(request).links(user_id)
+    assert fast == [link.model_dump(mode="json") for link in create_user_links(user_id, request)]
+    assert fast[0]["href"] == f"http://testserver/users/{user_id}"
+    assert [link["method"] for link in fast] == ["GET", "PUT", "DELETE"]
+
+def test_pagination_hrefs_match_generated_links():
+    request = _app_request()
+    hrefs = pagination_hrefs(request, 10, 5, 50)
+    assert hrefs == [(link.rel, str(link.href)) for link in generate_pagination_links(request, 10, 5, 50)]
+    assert dict(hrefs)["next"] == "http://testserver/users/?skip=15&limit=5&q=a+b"
@@ -98,3 +98,73 @@ def test_verify_password_timing():
     # Use a more lenient threshold for CI environments
     assert abs(avg_correct - avg_wrong) < 0.5, "Password verification timing difference too large"
 
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_password_async():
+    """Test that the async helpers round-trip through the hashing executor."""
+    from app.utils.security import hash_password_async, verify_password_async
+    hashed = await hash_password_async("secure_password", 4)
+    assert hashed.startswith('$2b$04$')
+    assert await verify_password_async("secure_password", hashed) is True
+    assert await verify_password_async("wrong_password", hashed) is False
+
+@pytest.mark.asyncio
+async def test_verify_password_async_invalid_hash():
+    """Test that errors raised in the worker surface as ValueError."""
+    from app.utils.security import verify_password_async
+    with pytest.raises(ValueError):
+        await verify_password_async("secure_password", "invalid_hash_format")
+
+@pytest.mark.asyncio
+async def test_hashing_executor_backpressure():
+    """Test that the executor never has more jobs in flight than max_pending."""
+    import asyncio
+    from app.utils.hashing_executor import HashingExecutor
+    executor = HashingExecutor(max_workers=2, max_pending=2, use_processes=False)
+    observed = []
+
+    def job():
+        observed.append(executor.pending)
+        return hash_password("secure_password", 4)
+
+    try:
+        results = await asyncio.gather(*(executor.run(job) for _ in range(8)))
+    finally:
+        executor.shutdown()
+    assert len(results) == 8
+    assert max(observed) <= 2
+
+def test_hash_password_uses_configured_rounds():
+    """Test that the default cost follows the active hashing policy."""
+    from app.utils.security import get_password_hash_rounds, get_hash_rounds, set_password_hash_rounds
+    original = get_password_hash_rounds()
+    try:
+        set_password_hash_rounds(5)
+        assert get_hash_rounds(hash_password("secure_password")) == 5
+    finally:
+        set_password_hash_rounds(original)
+
+def test_needs_rehash():
+    """Test that only hashes weaker than the policy are flagged for rehashing."""
+    from app.utils.security import get_password_hash_rounds, needs_rehash, set_password_hash_rounds
+    original = get_password_hash_rounds()
+    set_password_hash_rounds(5)
+    try:
+        assert needs_rehash(hash_password("secure_password", 5)) is False
+        assert needs_rehash(hash_password("secure_password", 6)) is False
+        assert needs_rehash(hash_password("secure_password", 4)) is True
+        assert needs_rehash("invalid_hash_format") is True
+    finally:
+        set_password_hash_rounds(original)
+
+def test_calibrate_password_hash_rounds(monkeypatch):
+    """Test that calibration extrapolates from one measurement and respects the floor."""
+    from app.utils import security
+    original = security.get_password_hash_rounds()
+    monkeypatch.setattr(security, "measure_hash_time", lambda rounds, samples=1: 0.025)
+    try:
+        assert security.calibrate_password_hash_rounds(100, min_rounds=10) == 12
+        assert security.calibrate_password_hash_rounds(10, min_rounds=10) == 10
+        assert security.get_password_hash_rounds() == 10
+    finally:
+        security.set_password_hash_rounds(original)
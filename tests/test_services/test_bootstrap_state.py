@@ -0,0 +1,54 @@
+from builtins import len
+import asyncio
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.database import Base
+from app.models.user_model import User, UserRole
+from app.services.bootstrap_state import bootstrap_state
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.asyncio
+
+def _registration(i: int):
+    return {"email": f"bootstrap_{i}@example.com", "password": "ValidPassword123!"}
+
+async def test_first_user_becomes_admin(session, email_service):
+    first = await UserService.create(session, _registration(0), email_service)
+    second = await UserService.create(session, _registration(1), email_service)
+    assert first.role == UserRole.ADMIN
+    assert second.role == UserRole.AUTHENTICATED
+    assert bootstrap_state.bootstrapped
+
+async def test_no_count_query_after_bootstrap(session, email_service, verified_user, statement_recorder):
+    await UserService.create(session, _registration(0), email_service)
+    with statement_recorder() as statements:
+        user = await UserService.create(session, _registration(1), email_service)
+    assert user is not None
+    assert not [statement for statement in statements if "count(" in statement.lower()]
+
+async def test_failed_first_registration_does_not_bootstrap(session, email_service):
+    assert await UserService.create(session, {"email": "bad", "password": "short"}, email_service) is None
+    assert not bootstrap_state.bootstrapped
+    user = await UserService.create(session, _registration(0), email_service)
+    assert user.role == UserRole.ADMIN
+
+async def test_concurrent_first_registrations_create_one_admin(tmp_path, email_service):
+    """Two registrations racing on an empty database: exactly one becomes admin"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bootstrap.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    bootstrap_state.reset()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as first, AsyncSession(engine, expire_on_commit=False) as second:
+            users = await asyncio.gather(
+                UserService.create(first, _registration(0), email_service),
+                UserService.create(second, _registration(1), email_service),
+            )
+        assert all(users)
+        async with AsyncSession(engine) as check:
+            roles = (await check.execute(select(User.role))).scalars().all()
+        assert len(roles) == 2
+        assert roles.count(UserRole.ADMIN) == 1
+    finally:
+        await engine.dispose()
@@ -0,0 +1,113 @@
+from builtins import len, range
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select, update
+from app.models.email_outbox_model import EmailOutbox, OutboxStatus
+from app.services.email_outbox import EmailOutboxWorker
+from app.services.email_service import EmailService
+from app.services.user_service import UserService
+from tests.smtp_sink import SMTPSink
+from app.utils.smtp_transport import AsyncSMTPTransport, SMTPConnectionPool
+from app.utils.template_manager import TemplateManager
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+async def smtp_sink():
+    async with SMTPSink() as sink:
+        yield sink
+
+@pytest.fixture
+def sink_email_service(smtp_sink):
+    pool = SMTPConnectionPool("127.0.0.1", smtp_sink.port, "outbox@example.com", "secret", use_tls=False)
+    return EmailService(template_manager=TemplateManager(), transport=AsyncSMTPTransport(pool, sender="outbox@example.com"))
+
+def _worker(**overrides) -> EmailOutboxWorker:
+    options = dict(workers=1, batch_size=10, poll_interval=0.01, max_attempts=3, backoff_seconds=30, lease_seconds=60, retention_seconds=3600)
+    options.update(overrides)
+    return EmailOutboxWorker(**options)
+
+async def _entries(session):
+    session.expunge_all()
+    return (await session.execute(select(EmailOutbox))).scalars().all()
+
+async def test_registration_queues_email_without_sending(session, sink_email_service, smtp_sink):
+    user = await UserService.create(session, {"email": "outbox_user@example.com", "password": "ValidPassword123!"}, sink_email_service)
+    assert user is not None
+    entries = await _entries(session)
+    assert len(entries) == 1
+    assert entries[0].recipient == "outbox_user@example.com"
+    assert entries[0].status == OutboxStatus.PENDING.value
+    assert str(user.id) in entries[0].payload["verification_url"]
+    assert smtp_sink.messages == []
+
+async def test_failed_registration_queues_nothing(session, sink_email_service, verified_user):
+    from fastapi import HTTPException
+    with pytest.raises(HTTPException):
+        await UserService.create(session, {"email": verified_user.email, "password": "ValidPassword123!"}, sink_email_service)
+    await session.rollback()
+    assert await _entries(session) == []
+
+async def test_drain_delivers_queued_emails(session, sink_email_service, smtp_sink):
+    for i in range(3):
+        sink_email_service.queue_user_email(session, {"email": f"user_{i}@example.com", "name": "User", "verification_url": "http://x"}, "email_verification")
+    await session.commit()
+    assert await _worker(batch_size=2).drain(session, sink_email_service) == 3
+    assert sorted(message.recipients[0] for message in smtp_sink.messages) == [f"user_{i}@example.com" for i in range(3)]
+    entries = await _entries(session)
+    assert {entry.status for entry in entries} == {OutboxStatus.SENT.value}
+    assert all(entry.attempts == 1 and entry.sent_at is not None for entry in entries)
+    # The verification link is not kept once the email is delivered
+    assert all(entry.payload == {} for entry in entries)
+
+async def test_failed_delivery_is_retried_with_backoff(session, sink_email_service, smtp_sink):
+    worker = _worker()
+    sink_email_service.queue_user_email(session, {"email": "retry@example.com", "name": "Retry", "verification_url": "http://x"}, "email_verification")
+    await session.commit()
+    smtp_sink.fail_next(1)
+    assert await worker.drain(session, sink_email_service) == 1
+    entry = (await _entries(session))[0]
+    assert entry.status == OutboxStatus.PENDING.value
+    assert entry.attempts == 1 and entry.last_error
+    # Not due again until the backoff has passed
+    assert await worker.drain(session, sink_email_service) == 0
+
+    await session.execute(update(EmailOutbox).values(next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    await session.commit()
+    assert await worker.drain(session, sink_email_service) == 1
+    entry = (await _entries(session))[0]
+    assert entry.status == OutboxStatus.SENT.value and entry.attempts == 2
+    assert len(smtp_sink.messages) == 1
+
+async def test_delivery_gives_up_after_max_attempts(session, sink_email_service, smtp_sink):
+    worker = _worker(max_attempts=2, backoff_seconds=0)
+    sink_email_service.queue_user_email(session, {"email": "dead@example.com", "name": "Dead", "verification_url": "http://x"}, "email_verification")
+    await session.commit()
+    smtp_sink.fail_next(5)
+    assert await worker.drain(session, sink_email_service) == 2
+    entry = (await _entries(session))[0]
+    assert entry.status == OutboxStatus.FAILED.value and entry.attempts == 2
+    assert entry.payload == {} and entry.last_error
+
+async def test_claimed_email_is_hidden_until_lease_expires(session, sink_email_service):
+    worker = _worker()
+    sink_email_service.queue_user_email(session, {"email": "lease@example.com", "name": "Lease", "verification_url": "http://x"}, "email_verification")
+    await session.commit()
+    assert len(await worker.claim(session)) == 1
+    assert await worker.claim(session) == []
+
+async def test_purge_deletes_finished_emails_past_retention(session, sink_email_service, smtp_sink):
+    worker = _worker(retention_seconds=3600)
+    for i, status in enumerate([OutboxStatus.SENT, OutboxStatus.FAILED, OutboxStatus.PENDING, OutboxStatus.SENT]):
+        entry = sink_email_service.queue_user_email(session, {"email": f"purge_{i}@example.com"}, "email_verification")
+        entry.status = status.value
+        entry.next_attempt_at = datetime.now(timezone.utc) - timedelta(hours=2 if i < 3 else 0)
+    await session.commit()
+    assert await worker.purge(session) == 2
+    remaining = await _entries(session)
+    assert sorted(entry.recipient for entry in remaining) == ["purge_2@example.com", "purge_3@example.com"]
+
+def test_backoff_doubles_and_is_capped():
+    worker = _worker(backoff_seconds=5)
+    assert [worker.backoff_for(n).total_seconds() for n in (1, 2, 3)] == [5, 10, 20]
+    assert worker.backoff_for(30) == timedelta(hours=1)
@@ -0,0 +1,43 @@
+from builtins import range, str
+import time
+from app.services.jwt_service import ClaimsCache, create_access_token, decode_token_cached, claims_cache
+
+def test_decode_token_cached_counts_hits_and_misses():
+    """Test that a repeated token is served from the cache"""
+    claims_cache.clear()
+    token = create_access_token(data={"sub": "user-id", "role": "admin"})
+    first = decode_token_cached(token)
+    second = decode_token_cached(token)
+    assert first == second
+    assert first["role"] == "ADMIN"
+    assert claims_cache.stats()["hits"] == 1
+    assert claims_cache.stats()["misses"] == 1
+
+def test_decode_token_cached_rejects_invalid_token():
+    """Test that invalid tokens are not cached"""
+    claims_cache.clear()
+    assert decode_token_cached("not-a-token") is None
+    assert len(claims_cache) == 0
+
+def test_claims_cache_drops_expired_entries():
+    """Test that an entry never outlives the token's exp claim"""
+    cache = ClaimsCache(max_size=10)
+    cache.put("token", {"sub": "user-id", "exp": time.time() - 1})
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+def test_claims_cache_evicts_least_recently_used():
+    """Test that the cache stays within its size limit"""
+    cache = ClaimsCache(max_size=2)
+    expires = time.time() + 60
+    for i in range(3):
+        cache.put(str(i), {"sub": str(i), "exp": expires})
+    assert len(cache) == 2
+    assert cache.get("0") is None
+    assert cache.get("2")["sub"] == "2"
+
+def test_claims_cache_skips_tokens_without_expiry():
+    """Test that tokens without exp are never cached"""
+    cache = ClaimsCache(max_size=10)
+    cache.put("token", {"sub": "user-id"})
+    assert len(cache) == 0
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select
+from app.models.user_model import User
+from app.services.analytics_service import AnalyticsService
+from app.services.last_login_buffer import LastLoginBuffer, last_login_buffer
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.asyncio
+
+async def test_buffer_coalesces_and_flushes_in_batches(session, users_with_same_role_50_users):
+    buffer = LastLoginBuffer(enabled=True, batch_size=20)
+    now = datetime.now(timezone.utc)
+    for user in users_with_same_role_50_users:
+        buffer.record(user.id, now - timedelta(minutes=5))
+        buffer.record(user.id, now)
+    assert len(buffer) == 50
+    assert await buffer.flush(session) == 50
+    assert len(buffer) == 0
+    result = await session.execute(select(User._last_login_at).where(User._last_login_at.is_not(None)))
+    assert len(result.all()) == 50
+
+async def test_login_with_write_behind_skips_row_update(session, verified_user, monkeypatch):
+    monkeypatch.setattr(last_login_buffer, "enabled", True)
+    try:
+        user = await UserService.login_user(session, verified_user.email, "MySuperPassword$1234")
+        assert user is not None
+        assert verified_user.id in last_login_buffer.pending_since(datetime.utcnow() - timedelta(minutes=1))
+        stored = await session.execute(select(User._last_login_at).where(User.id == verified_user.id).execution_options(populate_existing=True))
+        assert stored.scalar() is None
+        await last_login_buffer.flush(session)
+        stored = await session.execute(select(User._last_login_at).where(User.id == verified_user.id))
+        assert stored.scalar() is not None
+    finally:
+        last_login_buffer._pending.clear()
+
+async def test_inactive_users_accounts_for_buffered_logins(session, verified_user):
+    verified_user.last_login_at = datetime.now(timezone.utc) - timedelta(days=30)
+    await session.commit()
+    assert verified_user.id in [u.id for u in await AnalyticsService.get_inactive_users(session, timedelta(days=7))]
+    last_login_buffer.record(verified_user.id, datetime.now(timezone.utc))
+    try:
+        assert verified_user.id not in [u.id for u in await AnalyticsService.get_inactive_users(session, timedelta(days=7))]
+    finally:
+        last_login_buffer._pending.clear()
@@ -0,0 +1,39 @@
+from builtins import range
+import pytest
+from app.models.user_model import UserRole
+from app.services.nickname_allocator import BloomFilter, NicknameAllocator, nickname_allocator
+from app.services.user_service import UserService
+from app.utils.nickname_gen import NICKNAME_SPACE
+
+def test_nickname_space_is_large():
+    assert NICKNAME_SPACE >= 100_000_000
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000)
+    items = [f"user_{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(bloom.might_contain(item) for item in items)
+    false_positives = sum(bloom.might_contain(f"other_{i}") for i in range(10000))
+    assert false_positives < 100
+
+@pytest.mark.asyncio
+async def test_allocator_warms_from_users_table(session, users_with_same_role_50_users):
+    allocator = NicknameAllocator(capacity=1000)
+    await allocator.warm(session)
+    assert allocator.warmed
+    assert all(allocator._filter.might_contain(user.nickname) for user in users_with_same_role_50_users)
+
+@pytest.mark.asyncio
+async def test_create_retries_taken_generated_nickname(session, verified_user, email_service, monkeypatch):
+    """A generated nickname the filter missed is resolved by the unique index and a retry"""
+    candidates = iter([verified_user.nickname, "fresh_nickname_1"])
+    monkeypatch.setattr(nickname_allocator, "warmed", True)
+    monkeypatch.setattr(nickname_allocator, "candidate", lambda: next(candidates))
+    user = await UserService.create(session, {
+        "email": "generated_nickname@example.com",
+        "password": "ValidPassword123!",
+        "role": UserRole.AUTHENTICATED.name,
+    }, email_service)
+    assert user is not None
+    assert user.nickname == "fresh_nickname_1"
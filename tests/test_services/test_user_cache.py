@@ -0,0 +1,132 @@
+from builtins import range
+import time
+import pytest
+from app.models.user_model import UserRole
+from app.services.user_cache import InMemoryUserCacheBackend, UserCache, UserCacheBackend, user_cache
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.asyncio
+
+async def _warm(session, user):
+    """Cache `user` through a fresh identity map and check the next read is a hit."""
+    session.expunge_all()
+    await UserService.get_by_id(session, user.id)
+    session.expunge_all()
+    hits = user_cache.hits
+    cached = await UserService.get_by_id(session, user.id)
+    assert user_cache.hits == hits + 1
+    session.expunge_all()
+    return cached
+
+def test_in_memory_backend_evicts_least_recently_used():
+    backend = InMemoryUserCacheBackend(max_size=2, ttl_seconds=60)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+    assert backend.get("b") is None
+    assert backend.get("a") == 1 and backend.get("c") == 3
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class GetOnlyBackend(UserCacheBackend):
+        def get(self, key):
+            return None
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
+
+def test_in_memory_backend_expires_entries(monkeypatch):
+    backend = InMemoryUserCacheBackend(max_size=10, ttl_seconds=5)
+    backend.set("a", 1)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert backend.get("a") is None
+    assert len(backend) == 0
+
+async def test_lookups_by_every_key_hit_the_cache(session, verified_user):
+    await _warm(session, verified_user)
+    user_cache.hits = user_cache.misses = 0
+    for _ in range(3):
+        assert (await UserService.get_by_email(session, verified_user.email)).id == verified_user.id
+        assert (await UserService.get_by_nickname(session, verified_user.nickname)).id == verified_user.id
+        session.expunge_all()
+    assert user_cache.stats() == {"hits": 6, "misses": 0, "hit_rate": 1.0}
+
+async def test_cached_read_skips_the_database(session, verified_user, monkeypatch):
+    await _warm(session, verified_user)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("cache hit should not query the database")
+    monkeypatch.setattr(UserService, "_fetch_user", fail)
+    cached = await UserService.get_by_id(session, verified_user.id)
+    assert cached.email == verified_user.email
+    assert cached in session
+
+async def test_disabled_cache_always_misses(verified_user):
+    cache = UserCache(InMemoryUserCacheBackend(10, 60), enabled=False)
+    cache.store(verified_user)
+    assert cache.lookup("id", verified_user.id) is None
+    assert cache.hit_rate == 0.0
+
+async def test_update_invalidates(session, verified_user):
+    await _warm(session, verified_user)
+    await UserService.update(session, verified_user.id, {"first_name": "Changed", "nickname": "changed_nick"})
+    session.expunge_all()
+    fresh = await UserService.get_by_id(session, verified_user.id)
+    assert fresh.first_name == "Changed"
+    assert await UserService.get_by_nickname(session, verified_user.nickname) is None
+    assert (await UserService.get_by_nickname(session, "changed_nick")).id == verified_user.id
+
+async def test_delete_invalidates(session, verified_user):
+    await _warm(session, verified_user)
+    assert await UserService.delete(session, verified_user.id)
+    session.expunge_all()
+    assert await UserService.get_by_id(session, verified_user.id) is None
+    assert await UserService.get_by_email(session, verified_user.email) is None
+
+async def test_failed_login_invalidates(session, verified_user):
+    await _warm(session, verified_user)
+    assert await UserService.login_user(session, verified_user.email, "WrongPassword$123") is None
+    session.expunge_all()
+    fresh = await UserService.get_by_email(session, verified_user.email)
+    assert fresh.failed_login_attempts == 1
+
+async def test_successful_login_invalidates(session, verified_user):
+    await _warm(session, verified_user)
+    assert await UserService.login_user(session, verified_user.email, "MySuperPassword$1234")
+    session.expunge_all()
+    fresh = await UserService.get_by_id(session, verified_user.id)
+    assert fresh.last_login_at is not None
+
+async def test_verify_email_invalidates(session, user):
+    user.verification_token = "token123"
+    await session.commit()
+    await _warm(session, user)
+    assert await UserService.verify_email_with_token(session, user.id, "token123")
+    session.expunge_all()
+    fresh = await UserService.get_by_id(session, user.id)
+    assert fresh.email_verified is True
+    assert fresh.role == UserRole.AUTHENTICATED
+
+async def test_reset_password_invalidates(session, verified_user):
+    old_hash = verified_user.hashed_password
+    await _warm(session, verified_user)
+    assert await UserService.reset_password(session, verified_user.id, "NewPassword$1234")
+    assert user_cache.lookup("id", verified_user.id) is None
+    session.expunge_all()
+    # Credentials are outside the cached profile; read them with the full projection
+    fresh = await UserService._fetch_user(session, "full", id=verified_user.id)
+    assert fresh.hashed_password != old_hash
+
+async def test_cache_holds_no_credentials(session, verified_user):
+    await _warm(session, verified_user)
+    snapshot = user_cache.lookup("id", verified_user.id)
+    assert "hashed_password" not in snapshot and "verification_token" not in snapshot
+    assert "bio" in snapshot
+
+async def test_unlock_invalidates(session, locked_user):
+    await _warm(session, locked_user)
+    assert await UserService.unlock_user_account(session, locked_user.id)
+    session.expunge_all()
+    fresh = await UserService.get_by_email(session, locked_user.email)
+    assert fresh.is_locked is False
+    assert fresh.failed_login_attempts == 0
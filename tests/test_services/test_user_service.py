@@ -73,6 +73,24 @@ async def test_update_user_invalid_data(session, user):
     updated_user = await UserService.update(session, user.id, {"email": "invalidemail"})
     assert updated_user is None
 
+async def test_update_user_uses_one_statement(session, verified_user, statement_recorder):
+    """Test that an update is a single UPDATE ... RETURNING with the row in the same round-trip"""
+    with statement_recorder() as statements:
+        updated_user = await UserService.update(session, verified_user.id, {"nickname": "renamed_user", "first_name": "Renamed"})
+    assert [statement.split()[0].upper() for statement in statements] == ["UPDATE"]
+    assert updated_user.nickname == "renamed_user"
+    assert updated_user.updated_at is not None
+
+async def test_update_user_duplicate_nickname_conflicts(session, user, verified_user):
+    from fastapi import HTTPException
+    with pytest.raises(HTTPException) as exc_info:
+        await UserService.update(session, user.id, {"nickname": verified_user.nickname})
+    assert exc_info.value.status_code == 409
+
+async def test_update_user_not_found(session):
+    from uuid import uuid4
+    assert await UserService.update(session, uuid4(), {"first_name": "Nobody"}) is None
+
 # Test deleting a user who exists
 async def test_delete_user_exists(session, user):
     deletion_success = await UserService.delete(session, user.id)
@@ -170,8 +188,34 @@ async def test_create_user_with_existing_nickname(session, verified_user, email_
         "email": "different@example.com",
         "password": "ValidPassword123!",
     }
-    new_user = await UserService.create(session, user_data, email_service)
-    assert new_user is None
+    from fastapi import HTTPException
+    with pytest.raises(HTTPException) as exc_info:
+        await UserService.create(session, user_data, email_service)
+    assert exc_info.value.status_code == 409
+
+async def test_create_user_with_existing_email(session, verified_user, email_service):
+    from fastapi import HTTPException
+    with pytest.raises(HTTPException) as exc_info:
+        await UserService.create(session, {"email": verified_user.email, "password": "ValidPassword123!"}, email_service)
+    assert exc_info.value.status_code == 400
+
+async def test_create_user_writes_user_and_outbox_row(session, verified_user, statement_recorder):
+    """Test that a registration after bootstrap is the user's INSERT ... RETURNING plus its outbox INSERT"""
+    from app.models.email_outbox_model import EmailOutbox
+    from app.services.bootstrap_state import bootstrap_state
+    from app.services.email_service import EmailService
+    from app.services.nickname_allocator import nickname_allocator
+    from app.utils.template_manager import TemplateManager
+    await bootstrap_state.load(session)
+    await nickname_allocator.warm(session)
+    email_service = EmailService(TemplateManager())
+    with statement_recorder() as statements:
+        user = await UserService.create(session, {"email": "two_writes@example.com", "password": "ValidPassword123!"}, email_service)
+    assert user.created_at is not None and user.updated_at is not None
+    assert [statement.split()[0].upper() for statement in statements] == ["INSERT", "INSERT"]
+    assert "users" in statements[0] and "email_outbox" in statements[1]
+    entry = (await session.execute(select(EmailOutbox))).scalars().one()
+    assert entry.recipient == "two_writes@example.com"
 
 @pytest.mark.asyncio
 async def test_update_user_profile_urls(session, verified_user):
@@ -183,3 +227,179 @@ async def test_update_user_profile_urls(session, verified_user):
     updated_user = await UserService.update(session, verified_user.id, update_data)
     assert updated_user.github_profile_url == update_data["github_profile_url"]
     assert updated_user.linkedin_profile_url == update_data["linkedin_profile_url"]
+
+async def test_login_bookkeeping_keeps_updated_at(session, verified_user):
+    """Failed attempts, the counter reset and last-login writes do not change the user's ETag version"""
+    from app.services.last_login_buffer import last_login_buffer
+    version = await UserService.current_version(session, verified_user.id)
+    assert await UserService.login_user(session, verified_user.email, "WrongPassword$1234") is None
+    assert await UserService.login_user(session, verified_user.email, "MySuperPassword$1234") is not None
+    await last_login_buffer.flush(session)
+    assert await UserService.current_version(session, verified_user.id) == version
+
+async def test_login_user_rehashes_outdated_cost(session, verified_user):
+    """Test that a successful login upgrades a hash made with an outdated cost"""
+    from app.utils.security import get_hash_rounds, get_password_hash_rounds, hash_password
+    verified_user.hashed_password = hash_password("MySuperPassword$1234", 4)
+    await session.commit()
+    logged_in_user = await UserService.login_user(session, verified_user.email, "MySuperPassword$1234")
+    assert logged_in_user is not None
+    assert get_hash_rounds(logged_in_user.hashed_password) == get_password_hash_rounds()
+
+async def test_login_user_uses_two_statements(session, verified_user, statement_recorder):
+    """Test that a login issues one SELECT and one UPDATE ... RETURNING"""
+    with statement_recorder() as statements:
+        user = await UserService.login_user(session, verified_user.email, "MySuperPassword$1234")
+    assert user is not None
+    assert [statement.split()[0].upper() for statement in statements] == ["SELECT", "UPDATE"]
+
+async def test_failed_login_counter_increments_in_database(session, verified_user):
+    """Test that the failure counter builds on the stored value, not a stale in-memory copy"""
+    from sqlalchemy import update
+    max_login_attempts = get_settings().max_login_attempts
+    # Simulate failed attempts committed by other workers
+    await session.execute(
+        update(User).where(User.id == verified_user.id)
+        .values(failed_login_attempts=max_login_attempts - 1)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    await UserService.login_user(session, verified_user.email, "wrongpassword")
+    assert await UserService.is_account_locked(session, verified_user.email)
+
+async def test_search_and_filter_users_filtered_total(session, users_with_same_role_50_users):
+    """Test that the total counts only matching users, and the best match ranks first"""
+    target = users_with_same_role_50_users[7]
+    users, total = await UserService.search_and_filter_users(session, {"username": target.nickname}, 0, 10)
+    assert users[0].id == target.id
+    assert total == len([u for u in users_with_same_role_50_users if target.nickname.lower() in u.nickname.lower()])
+
+    users, total = await UserService.search_and_filter_users(session, {"role": UserRole.AUTHENTICATED}, 40, 20)
+    assert len(users) == 10
+    assert total == 50
+
+async def test_row_read_path_matches_orm_path(session, users_with_same_role_50_users):
+    """The Core read path returns the same users as the ORM path, without loading entities"""
+    from app.services.user_service import USER_RESPONSE_COLUMNS
+    from app.utils.user_serializer import user_payload
+    session.expunge_all()
+
+    rows = await UserService.list_user_rows(session, skip=5, limit=10)
+    assert list(rows[0]._fields) == [column.name for column in USER_RESPONSE_COLUMNS]
+    assert "hashed_password" not in rows[0]._fields
+    assert len(session.identity_map) == 0
+    users = await UserService.list_users(session, skip=5, limit=10)
+    assert [user_payload(row) for row in rows] == [user_payload(user) for user in users]
+
+    target = users_with_same_role_50_users[7]
+    rows, total = await UserService.search_user_rows(session, {"username": target.nickname}, 0, 10)
+    users, orm_total = await UserService.search_and_filter_users(session, {"username": target.nickname}, 0, 10)
+    assert [row.id for row in rows] == [user.id for user in users]
+    assert total == orm_total
+
+    first_rows, has_more = await UserService.list_user_rows_keyset(session, 20)
+    first_users, _ = await UserService.list_users_keyset(session, 20)
+    assert has_more
+    assert [row.id for row in first_rows] == [user.id for user in first_users]
+    back_rows, _ = await UserService.list_user_rows_keyset(session, 5, before=(first_rows[-1].created_at, first_rows[-1].id))
+    assert [row.id for row in back_rows] == [row.id for row in first_rows[14:19]]
+
+async def test_row_read_path_selects_only_requested_fields(session, users_with_same_role_50_users):
+    rows = await UserService.list_user_rows(session, 0, 5, ("nickname", "id"))
+    assert list(rows[0]._fields) == ["nickname", "id"]
+    rows, _ = await UserService.search_user_rows(session, {"role": UserRole.AUTHENTICATED}, 0, 5, ("role", "id"))
+    assert list(rows[0]._fields) == ["role", "id", "updated_at", "total"]
+    rows, _ = await UserService.list_user_rows_keyset(session, 5, fields=("email",))
+    assert list(rows[0]._fields) == ["email", "id", "created_at", "updated_at"]
+
+async def test_search_and_filter_users_escapes_wildcards(session, users_with_same_role_50_users):
+    """Test that LIKE wildcards in the search term are matched literally"""
+    users, total = await UserService.search_and_filter_users(session, {"q": "%"}, 0, 10)
+    assert users == []
+    assert total == 0
+
+async def test_batch_update_operations(session, users_with_same_role_50_users):
+    from app.schemas.user_schemas import UserBatchOperation, UserBatchStatus
+    users = users_with_same_role_50_users
+    ids = [user.id for user in users[:5]]
+    outcomes = await UserService.batch_update(session, ids + ids[:1], UserBatchOperation.LOCK, chunk_size=2)
+    assert list(outcomes) == ids
+    assert set(outcomes.values()) == {UserBatchStatus.OK}
+    assert all([(await UserService.get_by_id(session, user_id)).is_locked for user_id in ids])
+
+    await UserService.batch_update(session, ids, UserBatchOperation.SET_ROLE, role=UserRole.MANAGER)
+    assert all([(await UserService.get_by_id(session, user_id)).role == UserRole.MANAGER for user_id in ids])
+
+    outcomes = await UserService.batch_update(session, ids[:2], UserBatchOperation.DELETE)
+    assert set(outcomes.values()) == {UserBatchStatus.OK}
+    assert await UserService.get_by_id(session, ids[0]) is None
+    outcomes = await UserService.batch_update(session, ids[:2], UserBatchOperation.UNLOCK)
+    assert set(outcomes.values()) == {UserBatchStatus.NOT_FOUND}
+
+async def test_batch_verify_email_keeps_elevated_roles(session, unverified_user, admin_user):
+    from app.schemas.user_schemas import UserBatchOperation
+    unverified_user.role = UserRole.ANONYMOUS
+    await session.commit()
+    await UserService.batch_update(session, [unverified_user.id, admin_user.id], UserBatchOperation.VERIFY_EMAIL)
+    verified = await UserService._fetch_user(session, "full", id=unverified_user.id)
+    assert verified.email_verified is True
+    assert verified.verification_token is None
+    assert verified.role == UserRole.AUTHENTICATED
+    assert (await UserService.get_by_id(session, admin_user.id)).role == UserRole.ADMIN
+
+async def test_batch_anonymize_matches_single_user_anonymize(session, user, verified_user):
+    from app.schemas.user_schemas import UserBatchOperation
+    await UserService.batch_update(session, [user.id], UserBatchOperation.ANONYMIZE)
+    single = await UserService.anonymize_user(session, verified_user.id)
+    batched = await UserService.get_by_id(session, user.id)
+    for anonymized in (batched, single):
+        nickname, email = User.anonymized_identity(anonymized.id)
+        assert (anonymized.nickname, anonymized.email) == (nickname, email)
+        assert anonymized.first_name is None and anonymized.last_name is None
+
+async def test_import_queues_verification_emails_with_each_batch(session, verified_user):
+    from app.models.email_outbox_model import EmailOutbox
+    from app.services.email_service import EmailService
+    from app.utils.template_manager import TemplateManager
+
+    async def rows():
+        yield 1, {"email": "queued_one@example.com", "password": "ImportPass123!"}
+        yield 2, {"email": verified_user.email, "password": "ImportPass123!"}
+        yield 3, {"email": "queued_two@example.com", "password": "ImportPass123!"}
+    created, errors = await UserService.import_users(session, rows(), EmailService(TemplateManager()), batch_size=2)
+    assert created == 2 and [row for row, _ in errors] == [2]
+    entries = (await session.execute(select(EmailOutbox))).scalars().all()
+    assert {entry.recipient for entry in entries} == {"queued_one@example.com", "queued_two@example.com"}
+    assert all(entry.email_type == "email_verification" for entry in entries)
+
+async def test_import_falls_back_to_row_inserts_when_copy_hits_unique_violation(session, monkeypatch, email_service):
+    """asyncpg raises its own UniqueViolationError from COPY; the import must still isolate the rows"""
+    class DriverUniqueViolation(Exception):
+        sqlstate = "23505"
+
+    async def copy_users(session, records):
+        raise DriverUniqueViolation("duplicate key value violates unique constraint")
+    monkeypatch.setattr(UserService, "_copy_users", copy_users)
+    monkeypatch.setattr(session.get_bind().dialect, "driver", "asyncpg")
+
+    async def rows():
+        for i in range(2):
+            yield i + 1, {"email": f"copy_{i}@example.com", "password": "ImportPass123!"}
+    created, errors = await UserService.import_users(session, rows(), email_service)
+    assert created == 2 and errors == []
+    queued = {call.args[1].email for call in email_service.queue_verification_email.call_args_list}
+    assert queued == {"copy_0@example.com", "copy_1@example.com"}
+
+async def test_import_reraises_other_copy_errors(session, monkeypatch, email_service):
+    class DriverError(Exception):
+        sqlstate = "53100"
+
+    async def copy_users(session, records):
+        raise DriverError("disk full")
+    monkeypatch.setattr(UserService, "_copy_users", copy_users)
+    monkeypatch.setattr(session.get_bind().dialect, "driver", "asyncpg")
+
+    async def rows():
+        yield 1, {"email": "copy_error@example.com", "password": "ImportPass123!"}
+    with pytest.raises(DriverError):
+        await UserService.import_users(session, rows(), email_service)
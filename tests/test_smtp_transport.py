@@ -0,0 +1,145 @@
+from builtins import OSError, TimeoutError, all, isinstance, len, range, sorted, type
+import asyncio
+import socket
+import time
+import pytest
+from tests.smtp_sink import SMTPSink
+from app.utils.smtp_transport import AsyncSMTPTransport, SMTPConnectionPool, SMTPResponseError, _PipeliningProtocol, build_message
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+async def smtp_sink():
+    async with SMTPSink() as sink:
+        yield sink
+
+def _transport(sink: SMTPSink, **options) -> AsyncSMTPTransport:
+    pool = SMTPConnectionPool("127.0.0.1", sink.port, "pool@example.com", "secret", use_tls=False, **options)
+    return AsyncSMTPTransport(pool, sender="pool@example.com")
+
+def _message(i: int):
+    return build_message("Hello", f"<p>Message {i}</p>\n.\n", "pool@example.com", f"user_{i}@example.com")
+
+async def test_send_reuses_one_session(smtp_sink):
+    transport = _transport(smtp_sink)
+    for i in range(5):
+        await transport.send(_message(i))
+    assert [m.recipients for m in smtp_sink.messages] == [[f"user_{i}@example.com"] for i in range(5)]
+    assert smtp_sink.sessions == 1
+    assert transport.pool.connections_opened == 1
+    await transport.close()
+
+async def test_send_many_spreads_over_pool_and_preserves_bodies(smtp_sink):
+    transport = _transport(smtp_sink, max_size=3)
+    results = await transport.send_many([_message(i) for i in range(30)])
+    assert results == [None] * 30
+    assert smtp_sink.sessions == 3
+    assert sorted(m.recipients[0] for m in smtp_sink.messages) == sorted(f"user_{i}@example.com" for i in range(30))
+    # Dot-stuffing survives the round trip
+    assert smtp_sink.messages[0].message.get_payload()[0].get_payload().splitlines()[1] == "."
+    await transport.close()
+
+async def test_send_many_reports_per_message_failures(smtp_sink):
+    transport = _transport(smtp_sink, max_size=1)
+    smtp_sink.fail_next(2)
+    results = await transport.send_many([_message(i) for i in range(5)])
+    assert [type(r) for r in results[:2]] == [SMTPResponseError, SMTPResponseError]
+    assert results[0].transient
+    assert results[2:] == [None, None, None]
+    assert len(smtp_sink.messages) == 3
+    assert smtp_sink.sessions == 1
+    await transport.close()
+
+async def test_send_raises_on_rejection(smtp_sink):
+    transport = _transport(smtp_sink)
+    smtp_sink.fail_next(1)
+    with pytest.raises(SMTPResponseError):
+        await transport.send(_message(0))
+    await transport.close()
+
+async def test_idle_session_is_replaced(smtp_sink):
+    transport = _transport(smtp_sink, idle_timeout=0)
+    await transport.send(_message(0))
+    await transport.send(_message(1))
+    assert smtp_sink.sessions == 2
+    await transport.close()
+
+async def test_dead_session_is_detected_by_health_check(smtp_sink):
+    transport = _transport(smtp_sink, health_check_after=0)
+    await transport.send(_message(0))
+    # Drop the session behind the pool's back; the NOOP probe notices
+    transport.pool._idle[0].client.transport.abort()
+    await transport.send(_message(1))
+    assert len(smtp_sink.messages) == 2
+    assert transport.pool.connections_opened == 2
+    await transport.close()
+
+async def test_unreachable_server_fails_every_message():
+    pool = SMTPConnectionPool("127.0.0.1", 1, "pool@example.com", "secret", use_tls=False, timeout=1)
+    results = await AsyncSMTPTransport(pool, sender="pool@example.com").send_many([_message(i) for i in range(3)])
+    assert len(results) == 3
+    assert all(isinstance(r, OSError) for r in results)
+
+async def test_ehlo_announces_local_fqdn(smtp_sink):
+    transport = _transport(smtp_sink)
+    await transport.send(_message(0))
+    assert smtp_sink.ehlo_hostnames == [socket.getfqdn()]
+    await transport.close()
+
+async def test_silent_server_times_out():
+    async def never_greet(reader, writer):
+        await reader.read()
+    server = await asyncio.start_server(never_greet, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    pool = SMTPConnectionPool("127.0.0.1", port, "pool@example.com", "secret", use_tls=False, timeout=0.2)
+    start = time.monotonic()
+    results = await AsyncSMTPTransport(pool, sender="pool@example.com").send_many([_message(0)])
+    assert isinstance(results[0], TimeoutError)
+    assert time.monotonic() - start < 2
+    server.close()
+
+async def test_sessions_from_a_previous_loop_are_closed(smtp_sink):
+    transport = _transport(smtp_sink)
+    # Send from another event loop, which is closed once the send returns
+    await asyncio.to_thread(asyncio.run, transport.send(_message(0)))
+    assert smtp_sink.open_sessions == 1
+    await transport.send(_message(1))
+    for _ in range(50):
+        if smtp_sink.open_sessions == 1:
+            break
+        await asyncio.sleep(0.01)
+    assert smtp_sink.sessions == 2 and smtp_sink.open_sessions == 1
+    await transport.close()
+
+def _record_writes(monkeypatch) -> list:
+    writes = []
+    original = _PipeliningProtocol.write
+
+    def write(protocol, data):
+        writes.append(data)
+        original(protocol, data)
+    monkeypatch.setattr(_PipeliningProtocol, "write", write)
+    return writes
+
+async def test_send_many_pipelines_envelopes(smtp_sink, monkeypatch):
+    transport = _transport(smtp_sink, max_size=1)
+    await transport.send(_message(0))
+    writes = _record_writes(monkeypatch)
+    smtp_sink.fail_next(1)
+    results = await transport.send_many([_message(i) for i in range(1, 6)])
+    assert isinstance(results[0], SMTPResponseError) and results[1:] == [None] * 4
+    assert sorted(m.recipients[0] for m in smtp_sink.messages) == [f"user_{i}@example.com" for i in range(6) if i != 1]
+    # One write for the first envelope, then one per message carrying its body and the next envelope
+    assert len(writes) == 6
+    assert all(b"MAIL FROM:" in write and b"RCPT TO:" in write for write in writes[:-1])
+    await transport.close()
+
+async def test_send_many_without_pipelining_waits_for_each_reply(monkeypatch):
+    async with SMTPSink(pipelining=False) as sink:
+        transport = _transport(sink, max_size=1)
+        await transport.send(_message(0))
+        writes = _record_writes(monkeypatch)
+        assert await transport.send_many([_message(i) for i in range(1, 4)]) == [None] * 3
+        assert len(sink.messages) == 4
+        assert not [write for write in writes if b"MAIL FROM:" in write and b"RCPT TO:" in write]
+        await transport.close()
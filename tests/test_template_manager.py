@@ -0,0 +1,64 @@
+from builtins import KeyError
+import os
+import shutil
+import pytest
+from app.utils.template_manager import TemplateManager
+
+@pytest.fixture
+def template_manager(tmp_path):
+    manager = TemplateManager(auto_reload=True)
+    for name in ('header.md', 'footer.md', 'email_verification.md'):
+        shutil.copy(manager.templates_dir / name, tmp_path / name)
+    manager.templates_dir = tmp_path
+    yield manager
+    TemplateManager.clear_cache()
+
+def _context(**overrides):
+    context = {"name": "Jane", "verification_url": "http://localhost/verify-email/1/abc", "email": "jane@example.com"}
+    context.update(overrides)
+    return context
+
+def test_render_inlines_styles_and_fills_fields(template_manager):
+    html = template_manager.render_template('email_verification', **_context())
+    assert html.startswith('<div style="font-family: Arial')
+    assert '<p style="font-size: 16px; color: #666666; margin: 10px 0; line-height: 1.6;">Hello Jane,</p>' in html
+    assert '<a href="http://localhost/verify-email/1/abc">Verify Email</a>' in html
+    assert 'tmplfield' not in html
+
+def test_render_reads_templates_once(template_manager, monkeypatch):
+    template_manager.auto_reload = False
+    template_manager.render_template('email_verification', **_context())
+    reads = []
+    monkeypatch.setattr(template_manager, '_read_template', lambda filename: reads.append(filename))
+    first = template_manager.render_template('email_verification', **_context(name="Ann"))
+    second = template_manager.render_template('email_verification', **_context(name="Bob"))
+    assert reads == []
+    assert "Hello Ann," in first and "Hello Bob," in second
+
+def test_render_escapes_context_values(template_manager):
+    html = template_manager.render_template('email_verification', **_context(name="<b>{x}</b> *me*", verification_url="http://x/?a=1&b=2"))
+    assert "Hello &lt;b&gt;{x}&lt;/b&gt; *me*," in html
+    assert 'href="http://x/?a=1&amp;b=2"' in html
+
+def test_literal_braces_and_missing_fields(template_manager):
+    path = template_manager.templates_dir / 'email_verification.md'
+    path.write_text("Code: {{not a field}} for {name}\n", encoding='utf-8')
+    assert "Code: {not a field} for Jane" in template_manager.render_template('email_verification', name="Jane")
+    with pytest.raises(KeyError):
+        template_manager.render_template('email_verification')
+
+def test_changed_file_is_recompiled(template_manager):
+    template_manager.render_template('email_verification', **_context())
+    path = template_manager.templates_dir / 'footer.md'
+    path.write_text("Updated footer\n", encoding='utf-8')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert "Updated footer" in template_manager.render_template('email_verification', **_context())
+
+def test_without_auto_reload_cache_holds_until_cleared(template_manager):
+    template_manager.auto_reload = False
+    template_manager.render_template('email_verification', **_context())
+    (template_manager.templates_dir / 'footer.md').write_text("Updated footer\n", encoding='utf-8')
+    assert "Updated footer" not in template_manager.render_template('email_verification', **_context())
+    TemplateManager.clear_cache()
+    assert "Updated footer" in template_manager.render_template('email_verification', **_context())